@@ -1,7 +1,7 @@
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, jsonify
 from flask_cors import CORS
-from pymongo import MongoClient
 import os
+import time
 
 # Importar configuración
 from config import Config
@@ -9,6 +9,17 @@ from config import Config
 # Importar modelos
 from models.user import User
 from models.product import Product
+from models.stats import Stats
+from models.indexes import sync_indexes
+
+# Importar utilidades
+from utils.static_files import serve_upload, AssetManifest
+from utils.json_provider import init_json_provider
+from utils.compression import init_compression
+from utils.db import MongoConnection, LazyDatabase
+from utils.metrics import init_metrics, mongo_listeners
+from utils.invalidation import InvalidationBus
+from middleware.auth_middleware import token_cache
 
 # Importar rutas
 from routes.dashboard import init_routes as init_dashboard_routes
@@ -16,119 +27,177 @@ from routes.auth import init_routes as init_auth_routes
 from routes.products import init_routes as init_products_routes
 from routes.users import init_routes as init_users_routes
 
-# Crear aplicación Flask
-app = Flask(__name__)
-app.config.from_object(Config)
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../frontend')
 
-# Configurar CORS
-CORS(app, resources={
-    r"/api/*": {
-        "origins": "*",
-        "methods": ["GET", "POST", "PUT", "DELETE"],
-        "allow_headers": ["Content-Type", "Authorization"]
-    }
-})
-
-# Inicializar carpetas
-Config.init_app()
-
-# Mostrar información de debug
-print(f"📁 Directorio de trabajo: {os.getcwd()}")
-print(f"📁 Carpeta de uploads: {os.path.abspath(Config.UPLOAD_FOLDER)}")
-print(f"📁 Existe: {os.path.exists(Config.UPLOAD_FOLDER)}")
-print("")
-
-# Conectar a MongoDB
-try:
-    client = MongoClient(Config.MONGODB_URI)
-    db = client[Config.DB_NAME]
-    
-    # Verificar conexión
-    client.admin.command('ping')
-    print(f"✅ Conectado a MongoDB: {Config.DB_NAME}")
-    
-except Exception as e:
-    print(f"❌ Error al conectar a MongoDB: {e}")
-    exit(1)
-
-# Inicializar modelos
-user_model = User(db)
-product_model = Product(db)
 
-# Registrar blueprints (rutas)
-dashboard_bp = init_dashboard_routes(db, product_model, user_model)
-auth_bp = init_auth_routes(db, user_model)
-products_bp = init_products_routes(db, product_model, user_model)
-users_bp = init_users_routes(db, user_model)
-
-app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(products_bp, url_prefix='/api/products')
-app.register_blueprint(users_bp, url_prefix='/api/users')
-
-# Ruta para servir archivos estáticos (imágenes)
-@app.route('/uploads/products/<filename>')
-def serve_uploads(filename):
-    """Servir archivos subidos"""
-    upload_dir = os.path.abspath(Config.UPLOAD_FOLDER)
-    print(f"📁 Intentando servir: {filename}")
-    print(f"📁 Desde carpeta: {upload_dir}")
-    print(f"📁 Archivo completo: {os.path.join(upload_dir, filename)}")
-    print(f"📁 Existe: {os.path.exists(os.path.join(upload_dir, filename))}")
+def create_app(config=Config):
+    """
+    Crear la aplicación Flask.
+    No abre conexiones: el MongoClient se crea en el primer uso y por proceso,
+    así la app se puede crear en el master de gunicorn (--preload) y cada
+    worker conecta después del fork. Los índices faltantes se crean aquí solo
+    si CREATE_INDEXES_ON_STARTUP está activo; eliminar o reemplazar índices
+    queda para manage_indexes.py sync.
+    """
+    started = time.perf_counter()
     
-    try:
-        return send_from_directory(upload_dir, filename)
-    except Exception as e:
-        print(f"❌ Error al servir archivo: {e}")
-        return jsonify({'error': 'Archivo no encontrado'}), 404
-
-# Servir frontend (HTML, CSS, JS)
-@app.route('/')
-def index():
-    """Servir página principal"""
-    return send_from_directory('../frontend', 'index.html')
-
-@app.route('/<path:path>')
-def serve_frontend(path):
-    """Servir archivos del frontend"""
-    # Si el archivo existe en frontend, servirlo
-    frontend_dir = os.path.join(os.path.dirname(__file__), '../frontend')
-    if os.path.exists(os.path.join(frontend_dir, path)):
-        return send_from_directory(frontend_dir, path)
-    # Si no existe, devolver 404
-    return jsonify({
-        'success': False,
-        'message': 'Ruta no encontrada'
-    }), 404
-
-# Ruta de prueba
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    """Verificar que la API está funcionando"""
-    return jsonify({
-        'success': True,
-        'message': 'API TRADEco funcionando correctamente',
-        'version': '1.0.0'
-    }), 200
+    app = Flask(__name__)
+    app.config.from_object(config)
+    
+    # Serialización JSON rápida y compresión de respuestas
+    init_json_provider(app, config.JSON_PROVIDER)
+    init_compression(app)
+    
+    # Configurar CORS
+    CORS(app, resources={
+        r"/api/*": {
+            "origins": "*",
+            "methods": ["GET", "POST", "PUT", "PATCH", "DELETE"],
+            "allow_headers": ["Content-Type", "Authorization"]
+        }
+    })
+    
+    # Inicializar carpetas
+    config.init_app()
+    
+    # Conexión perezosa a MongoDB (se abre en el primer uso del proceso),
+    # con latencia de comandos y estado del pool para /api/metrics
+    connection = MongoConnection(config.MONGODB_URI, config.DB_NAME,
+                                 event_listeners=mongo_listeners())
+    db = LazyDatabase(connection)
+    
+    # Inicializar modelos
+    stats_model = Stats(db)
+    user_model = User(db, stats_model)
+    product_model = Product(db, stats_model)
+    
+    if config.CREATE_INDEXES_ON_STARTUP:
+        try:
+            sync_indexes(db, log=lambda message: None)
+        except Exception as e:
+            print(f"⚠️ No se pudieron crear los índices: {e}")
+        # No dejar un cliente abierto que un fork posterior heredaría
+        connection.close()
+    
+    # Invalidación de caches entre workers (change stream; requiere replica set).
+    # El hilo arranca en el primer request de cada proceso, después del fork.
+    invalidation_bus = None
+    if config.INVALIDATION_BUS:
+        invalidation_bus = InvalidationBus(db)
+        invalidation_bus.register('products', product_model.invalidate_cached)
+        invalidation_bus.register('users', user_model.invalidate_cached)
+        invalidation_bus.register('stats', stats_model.invalidate_cached)
+        app.before_request(invalidation_bus.ensure_started)
+    
+    # Latencia por ruta de todos los blueprints y GET /api/metrics
+    init_metrics(app, {
+        'products': product_model.cache,
+        'users': user_model.cache,
+        'suggest': product_model._suggest_cache,
+        'facets': product_model._facets_cache,
+        'counts': product_model._count_cache,
+        'tokens': token_cache
+    })
+    
+    # Registrar blueprints (rutas)
+    dashboard_bp = init_dashboard_routes(db, product_model, user_model, stats_model)
+    auth_bp = init_auth_routes(db, user_model)
+    products_bp = init_products_routes(db, product_model, user_model)
+    users_bp = init_users_routes(db, user_model)
+    
+    app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(products_bp, url_prefix='/api/products')
+    app.register_blueprint(users_bp, url_prefix='/api/users')
+    
+    # Ruta para servir archivos estáticos (imágenes)
+    upload_dir = os.path.abspath(config.UPLOAD_FOLDER)
+    
+    @app.route('/uploads/products/<filename>')
+    def serve_uploads(filename):
+        """Servir archivos subidos (con cache HTTP y soporte de Range)"""
+        return serve_upload(upload_dir, filename)
+    
+    # Servir frontend (HTML, CSS, JS) precomprimido y con nombres con huella
+    asset_manifest = AssetManifest(FRONTEND_DIR, auto_reload=config.ASSETS_AUTO_RELOAD)
+    
+    @app.route('/')
+    def index():
+        """Servir página principal"""
+        return asset_manifest.serve('index.html')
+    
+    @app.route('/<path:path>')
+    def serve_frontend(path):
+        """Servir archivos del frontend"""
+        response = asset_manifest.serve(path)
+        if response is not None:
+            return response
+        # Si no existe, devolver 404
+        return jsonify({
+            'success': False,
+            'message': 'Ruta no encontrada'
+        }), 404
+    
+    # Ruta de prueba
+    @app.route('/api/health', methods=['GET'])
+    def health_check():
+        """Verificar que la API está funcionando"""
+        return jsonify({
+            'success': True,
+            'message': 'API TRADEco funcionando correctamente',
+            'version': '1.0.0'
+        }), 200
+    
+    # Manejador de errores 404
+    @app.errorhandler(404)
+    def not_found(error):
+        return jsonify({
+            'success': False,
+            'message': 'Ruta no encontrada'
+        }), 404
+    
+    # Manejador de errores 500
+    @app.errorhandler(500)
+    def internal_error(error):
+        return jsonify({
+            'success': False,
+            'message': 'Error interno del servidor'
+        }), 500
+    
+    # Lo que necesitan otros puntos de entrada (asgi.py, scripts)
+    app.extensions['tradeco'] = {
+        'connection': connection,
+        'db': db,
+        'stats_model': stats_model,
+        'user_model': user_model,
+        'product_model': product_model,
+        'invalidation_bus': invalidation_bus
+    }
+    
+    app.config['BOOT_TIME_MS'] = round((time.perf_counter() - started) * 1000, 1)
+    print(f"⏱️ App creada en {app.config['BOOT_TIME_MS']} ms (pid {os.getpid()})")
+    return app
 
-# Manejador de errores 404
-@app.errorhandler(404)
-def not_found(error):
-    return jsonify({
-        'success': False,
-        'message': 'Ruta no encontrada'
-    }), 404
 
-# Manejador de errores 500
-@app.errorhandler(500)
-def internal_error(error):
-    return jsonify({
-        'success': False,
-        'message': 'Error interno del servidor'
-    }), 500
+# Instancia para gunicorn app:app, uvicorn asgi:app y python app.py
+app = create_app()
 
 # Ejecutar aplicación
 if __name__ == '__main__':
+    # Mostrar información de debug
+    print(f"📁 Directorio de trabajo: {os.getcwd()}")
+    print(f"📁 Carpeta de uploads: {os.path.abspath(Config.UPLOAD_FOLDER)}")
+    print(f"📁 Existe: {os.path.exists(Config.UPLOAD_FOLDER)}")
+    print("")
+    
+    # Verificar conexión antes de atender peticiones
+    try:
+        app.extensions['tradeco']['connection'].ping()
+        print(f"✅ Conectado a MongoDB: {Config.DB_NAME}")
+    except Exception as e:
+        print(f"❌ Error al conectar a MongoDB: {e}")
+        exit(1)
+    
     print(f"🚀 Servidor iniciando en http://localhost:{Config.PORT}")
     print(f"📁 Carpeta de uploads: {Config.UPLOAD_FOLDER}")
     print(f"🔐 JWT expira en: {Config.JWT_EXPIRATION_HOURS} horas")
@@ -0,0 +1,75 @@
+"""
+Modo de servicio ASGI: uvicorn asgi:app --port 8000 --workers 4
+
+Las lecturas más pedidas (listado, detalle, facetas, sugerencias, perfil
+público) se atienden de forma nativa con motor, sin bloquear un hilo por
+petición. Todo lo demás (escrituras, auth, dashboard, archivos y frontend)
+pasa a la misma app Flask de app.py, que corre en un pool de hilos.
+Los modelos async reutilizan los de Flask, así que ambos caminos comparten
+consultas, caches y formato de respuesta.
+"""
+import contextlib
+from a2wsgi import WSGIMiddleware
+from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.routing import Router
+from config import Config
+from models.async_models import AsyncProduct, AsyncUser
+from routes.async_api import init_routes as init_async_routes
+from utils.metrics import mongo_listeners
+
+# La app Flask (y sus modelos con pymongo) se crea al importar app.py
+from app import app as flask_app
+
+ASYNC_METHODS = ('GET', 'HEAD')
+
+
+def create_asgi_app(flask_app, product_model, user_model, invalidation_bus=None):
+    """Armar la app ASGI: rutas async de lectura con Flask como respaldo"""
+    fallback = WSGIMiddleware(flask_app, workers=Config.WSGI_FALLBACK_THREADS)
+    
+    # motor se asocia al event loop en la primera operación (uno por proceso)
+    client = AsyncIOMotorClient(Config.MONGODB_URI, maxPoolSize=Config.ASYNC_MAX_POOL_SIZE,
+                                event_listeners=mongo_listeners())
+    db = client[Config.DB_NAME]
+    
+    @contextlib.asynccontextmanager
+    async def lifespan(router):
+        # Las lecturas async no pasan por before_request de Flask
+        if invalidation_bus is not None:
+            invalidation_bus.ensure_started()
+        yield
+        if invalidation_bus is not None:
+            invalidation_bus.stop()
+        client.close()
+    
+    router = Router(
+        routes=init_async_routes(AsyncProduct(product_model, db), AsyncUser(user_model, db), fallback),
+        default=fallback,
+        lifespan=lifespan
+    )
+    
+    async def dispatch(scope, receive, send):
+        # Solo las lecturas pasan por el router async; el resto va directo a
+        # Flask (así un PUT a /api/products/<id> no choca con la ruta GET)
+        if scope['type'] == 'http' and scope['method'] in ASYNC_METHODS:
+            await router(scope, receive, send)
+        elif scope['type'] == 'http':
+            await fallback(scope, receive, send)
+        else:
+            await router(scope, receive, send)
+    
+    return dispatch
+
+
+app = create_asgi_app(
+    flask_app,
+    flask_app.extensions['tradeco']['product_model'],
+    flask_app.extensions['tradeco']['user_model'],
+    flask_app.extensions['tradeco']['invalidation_bus']
+)
+
+if __name__ == '__main__':
+    import uvicorn
+    
+    print(f"🚀 Servidor ASGI iniciando en http://localhost:{Config.PORT}")
+    uvicorn.run('asgi:app', host='0.0.0.0', port=Config.PORT)
@@ -0,0 +1,13 @@
+from pymongo import MongoClient
+from config import Config
+from models.indexes import sync_indexes
+from models.product import Product
+
+client = MongoClient(Config.MONGODB_URI)
+db = client[Config.DB_NAME]
+
+# Recrear el índice de texto en español y completar los prefijos de autocompletado
+product_model = Product(db)
+sync_indexes(db, replace_text=True)
+updated = product_model.backfill_search_prefixes()
+print(f"✅ Productos actualizados para autocompletado: {updated}")
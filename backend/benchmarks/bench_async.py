@@ -0,0 +1,172 @@
+"""
+Prueba de carga: modo síncrono (Flask) contra modo ASGI (motor + uvicorn).
+
+Abre N conexiones concurrentes contra cada servidor durante un tiempo fijo
+con una mezcla de lecturas (listado, filtros, detalle, facetas, sugerencias)
+y reporta peticiones por segundo, p50/p95/p99 y errores de cada modo.
+
+Los dos modos se comparan con la misma cantidad de workers y el mismo
+código; solo cambia el servidor. Con --workers el benchmark los levanta él
+mismo (primero uno y después el otro, para que no compitan por la CPU):
+    python -m benchmarks.bench_async --workers 4 --connections 1000 --duration 30
+
+Sin --workers mide servidores ya levantados, que tienen que estar en las
+mismas condiciones (nunca python app.py, que es el servidor de desarrollo):
+    gunicorn app:app --workers 4 --worker-class gthread --threads 8 --bind :5000
+    uvicorn asgi:app --workers 4 --port 8000
+    python -m benchmarks.bench_async --sync http://localhost:5000 \\
+        --async http://localhost:8000 --connections 1000 --duration 30
+
+El generador de carga también es un solo proceso asyncio: con 1000
+conexiones conviene correrlo en otra máquina o núcleo que los servidores.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.bench_search import percentiles
+
+LIST_PATHS = [
+    '/api/products/?limit=20',
+    '/api/products/?limit=20&sort=price_asc',
+    '/api/products/?limit=20&categoria=Remeras',
+    '/api/products/?limit=20&categoria=Abrigos&talla=M&sort=price_desc',
+    '/api/products/?limit=20&min_precio=1000&max_precio=20000&approx_total=1',
+    '/api/products/facets',
+    '/api/products/suggest?q=cam',
+    '/api/products/categories',
+]
+
+
+# Servidor de cada modo; workers, threads y port se completan al levantarlo
+SERVERS = {
+    'sync': ['-m', 'gunicorn', 'app:app', '--workers', '{workers}', '--worker-class', 'gthread',
+             '--threads', '{threads}', '--bind', '127.0.0.1:{port}'],
+    'async': ['-m', 'uvicorn', 'asgi:app', '--workers', '{workers}', '--host', '127.0.0.1',
+              '--port', '{port}', '--no-access-log'],
+}
+
+
+def wait_ready(base_url, process, timeout=60):
+    """Esperar a que el servidor responda /api/health"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"El servidor terminó al iniciar (código {process.returncode})")
+        try:
+            if httpx.get(f'{base_url}/api/health', timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"El servidor no respondió en {timeout} s")
+
+
+@contextlib.contextmanager
+def spawned_server(mode, workers, threads, port):
+    """Levantar el servidor de un modo (sin debug ni índices al iniciar) y apagarlo al final"""
+    command = [sys.executable] + [
+        part.format(workers=workers, threads=threads, port=port) for part in SERVERS[mode]
+    ]
+    env = dict(os.environ, FLASK_DEBUG='False', CREATE_INDEXES_ON_STARTUP='False')
+    process = subprocess.Popen(command, env=env)
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        wait_ready(base_url, process)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+async def product_paths(client, base_url):
+    """Rutas de detalle para productos existentes"""
+    response = await client.get(f'{base_url}/api/products/?limit=50')
+    products = response.json()['data']['products']
+    return [f"/api/products/{p['id']}" for p in products]
+
+
+async def run_load(base_url, connections, duration):
+    """Mantener `connections` clientes pidiendo rutas durante `duration` segundos"""
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    timeout = httpx.Timeout(30.0)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        paths = LIST_PATHS + await product_paths(client, base_url)
+        samples = []
+        errors = 0
+        deadline = time.perf_counter() + duration
+        
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                path = random.choice(paths)
+                start = time.perf_counter()
+                try:
+                    response = await client.get(base_url + path)
+                    if response.status_code >= 500:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                samples.append((time.perf_counter() - start) * 1000)
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(connections)))
+        elapsed = time.perf_counter() - start
+    
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'rps': len(samples) / elapsed,
+        **(percentiles(samples) if samples else {})
+    }
+
+
+def report(name, result):
+    latencies = '  '.join(f"{k}={result[k]:.1f}" for k in ('p50', 'p95', 'p99') if k in result)
+    print(f"{name:6s} {result['rps']:9.1f} req/s  {result['requests']:8d} ok  "
+          f"{result['errors']:6d} errores  {latencies} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Carga sync (Flask) vs async (ASGI)')
+    parser.add_argument('--sync', dest='sync_url', default='http://localhost:5000')
+    parser.add_argument('--async', dest='async_url', default='http://localhost:8000')
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--only', choices=['sync', 'async'], help='Medir un solo modo')
+    parser.add_argument('--workers', type=int,
+                        help='Levantar gunicorn y uvicorn con esta cantidad de workers cada uno')
+    parser.add_argument('--threads', type=int, default=8, help='Hilos por worker de gunicorn')
+    parser.add_argument('--port', type=int, default=5099, help='Puerto de los servidores levantados')
+    args = parser.parse_args()
+    
+    random.seed(42)
+    targets = [('sync', args.sync_url), ('async', args.async_url)]
+    if args.only:
+        targets = [t for t in targets if t[0] == args.only]
+    
+    print(f"{args.connections} conexiones concurrentes, {args.duration:.0f} s por modo")
+    if args.workers:
+        print(f"{args.workers} workers por modo (gunicorn con {args.threads} hilos cada uno)")
+    print()
+    
+    for name, url in targets:
+        if args.workers:
+            with spawned_server(name, args.workers, args.threads, args.port) as base_url:
+                result = asyncio.run(run_load(base_url, args.connections, args.duration))
+        else:
+            result = asyncio.run(run_load(url.rstrip('/'), args.connections, args.duration))
+        report(name, result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Micro-benchmark del middleware de autenticación.
+
+Mide el costo por petición de token_required con y sin el cache de tokens
+verificados. No necesita MongoDB.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_auth --requests 20000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import jwt
+from flask import Flask
+
+from config import Config
+from middleware.auth_middleware import token_required, token_cache
+
+
+def build_app():
+    app = Flask(__name__)
+    
+    @app.route('/ping')
+    @token_required
+    def ping(current_user_id, current_user_role):
+        return 'ok'
+    
+    return app
+
+
+def run(app, token, requests, use_cache):
+    """Ejecutar n peticiones y devolver microsegundos por petición"""
+    headers = {'Authorization': f'Bearer {token}'}
+    client = app.test_client()
+    token_cache.clear()
+    
+    # Calentamiento
+    for _ in range(200):
+        client.get('/ping', headers=headers)
+    
+    start = time.perf_counter()
+    for _ in range(requests):
+        if not use_cache:
+            token_cache.clear()
+        client.get('/ping', headers=headers)
+    elapsed = time.perf_counter() - start
+    return elapsed / requests * 1e6
+
+
+def run_decode(token, iterations, use_cache):
+    """Costo aislado de verificar el token (sin Flask)"""
+    from middleware.auth_middleware import decode_token
+    token_cache.clear()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if not use_cache:
+            token_cache.clear()
+        decode_token(token)
+    elapsed = time.perf_counter() - start
+    return elapsed / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de autenticación JWT')
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+    
+    token = jwt.encode({
+        'user_id': '64b000000000000000000001',
+        'role': 'usuario',
+        'exp': datetime.utcnow() + timedelta(hours=Config.JWT_EXPIRATION_HOURS)
+    }, Config.JWT_SECRET_KEY, algorithm='HS256')
+    
+    app = build_app()
+    
+    decode_before = run_decode(token, args.requests, use_cache=False)
+    decode_after = run_decode(token, args.requests, use_cache=True)
+    request_before = run(app, token, args.requests, use_cache=False)
+    request_after = run(app, token, args.requests, use_cache=True)
+    
+    print(f"Verificación del token:  {decode_before:8.2f} µs -> {decode_after:8.2f} µs")
+    print(f"Petición completa:       {request_before:8.2f} µs -> {request_after:8.2f} µs")
+    print(f"Ahorro por petición:     {request_before - request_after:8.2f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Tiempo de arranque de un worker.
+
+Mide, en procesos nuevos, cuánto tarda `import app` (que llama a
+create_app) con y sin creación de índices al iniciar. Sin índices no se
+abre ninguna conexión, así que no necesita MongoDB; --with-indexes sí.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_boot --runs 10 --with-indexes
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+from benchmarks.bench_search import percentiles
+
+BOOT_SNIPPET = (
+    "import time; start = time.perf_counter(); import app; "
+    "print((time.perf_counter() - start) * 1000)"
+)
+
+
+def boot_times(runs, create_indexes):
+    env = dict(os.environ, CREATE_INDEXES_ON_STARTUP=str(create_indexes))
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', BOOT_SNIPPET],
+            env=env, capture_output=True, text=True, check=True
+        )
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiempo de arranque de la app')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--with-indexes', action='store_true',
+                        help='Medir también CREATE_INDEXES_ON_STARTUP=True (requiere MongoDB)')
+    args = parser.parse_args()
+    
+    modes = [False, True] if args.with_indexes else [False]
+    for create_indexes in modes:
+        stats = percentiles(boot_times(args.runs, create_indexes))
+        label = 'con índices' if create_indexes else 'sin índices'
+        print(f"{label:12s} (ms): " + '  '.join(f"{k}={v:.1f}" for k, v in stats.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+"""
+Benchmark de todos los endpoints de la API.
+
+Crea la app con create_app() contra una base aparte de un MongoDB local,
+carga un volumen configurable de usuarios y productos (seed_data.py) y
+recorre cada ruta de routes/*.py (listados, búsqueda, detalle, alta con imagen, edición,
+cargas masivas, login, registro, perfil y todo el dashboard) con el
+cliente de pruebas de Flask, sin red de por medio. Reporta peticiones por
+segundo y p50/p95/p99 de cada endpoint y guarda el resultado en JSON para
+compararlo entre commits.
+
+Requiere un MongoDB accesible (MONGODB_URI). Uso (desde backend/):
+    python -m benchmarks.bench_endpoints --products 100000 --users 10000 \\
+        --output bench-$(git rev-parse --short HEAD).json
+    python -m benchmarks.bench_endpoints --reuse --compare bench-base.json
+    python -m benchmarks.bench_endpoints --compare bench-a.json --against bench-b.json
+
+Con --compare termina con código 1 si algún endpoint empeoró su p95 más que
+--threshold, así sirve como chequeo de regresiones.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from PIL import Image
+
+from config import Config
+from benchmarks.bench_search import percentiles
+from seed_data import ADMIN_EMAIL, PASSWORD, random_product, seed, user_email
+
+# Escenarios que borran productos creados por los anteriores: (nombre, productos por petición)
+CONSUMERS = {'DELETE /api/products/<id>': 1, 'POST /api/products/bulk/delete': 10}
+
+
+def png_bytes():
+    """Imagen de prueba para el alta con imagen"""
+    buffer = io.BytesIO()
+    Image.new('RGB', (1200, 900), (120, 160, 90)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class Session:
+    """Estado compartido entre escenarios (tokens, ids existentes y creados)"""
+    
+    def __init__(self, client, db):
+        self.client = client
+        self.run_id = f'{int(time.time()) % 100000}'
+        self.image = png_bytes()
+        # usuario1 es de los vendedores con más productos
+        self.user_token = self.login(user_email(1))
+        self.admin_token = self.login(ADMIN_EMAIL)
+        self.user_id = str(db.users.find_one({'username': 'usuario1'})['_id'])
+        self.product_ids = [str(p['_id']) for p in db.products.find({}, {'_id': 1}).limit(500)]
+        self.own_ids = [str(p['_id']) for p in db.products.find({'user_id': self.user_id}, {'_id': 1}).limit(50)]
+        self.created = []
+        first_page = self.client.get('/api/products/?limit=20').get_json()['data']
+        self.cursor = first_page['pagination']['next_cursor']
+    
+    def login(self, email):
+        response = self.client.post('/api/auth/login', json={'email': email, 'password': PASSWORD})
+        return response.get_json()['data']['token']
+    
+    def user(self):
+        return {'Authorization': f'Bearer {self.user_token}'}
+    
+    def admin(self):
+        return {'Authorization': f'Bearer {self.admin_token}'}
+    
+    def product_id(self):
+        return random.choice(self.product_ids)
+
+
+def product_form(session, i, with_image=True):
+    data = dict(random_product())
+    if with_image:
+        # Nombre único: la app solo agrega un timestamp con segundos
+        data['imagen'] = (io.BytesIO(session.image), f'bench{session.run_id}_{i}.png')
+    return data
+
+
+def scenarios():
+    """(nombre, función(session, i) -> response) de cada endpoint"""
+    get = lambda path, headers=None: lambda s, i: s.client.get(path, headers=headers(s) if headers else None)
+    return [
+        # Lecturas públicas
+        ('GET /api/health', get('/api/health')),
+        ('GET /api/products/', get('/api/products/?limit=20')),
+        ('GET /api/products/ categoria', get('/api/products/?limit=20&categoria=Remeras')),
+        ('GET /api/products/ categoria+talla+precio', get('/api/products/?limit=20&categoria=Abrigos&talla=M&sort=price_asc')),
+        ('GET /api/products/ rango de precio', get('/api/products/?limit=20&min_precio=1000&max_precio=20000')),
+        ('GET /api/products/ página 50', get('/api/products/?limit=20&page=50')),
+        ('GET /api/products/ cursor', lambda s, i: s.client.get(f'/api/products/?limit=20&cursor={s.cursor}')),
+        ('GET /api/products/ búsqueda', get('/api/products/?limit=20&search=campera cuero')),
+        ('GET /api/products/facets', get('/api/products/facets')),
+        ('GET /api/products/facets categoria', get('/api/products/facets?categoria=Calzado')),
+        ('GET /api/products/suggest', lambda s, i: s.client.get(f"/api/products/suggest?q={random.choice(['ca', 'cam', 'rem', 'pant'])}")),
+        ('GET /api/products/categories', get('/api/products/categories')),
+        ('GET /api/products/<id>', lambda s, i: s.client.get(f'/api/products/{s.product_id()}')),
+        ('GET /api/products/user/<id>', lambda s, i: s.client.get(f'/api/products/user/{s.user_id}')),
+        ('GET /api/users/<id>', lambda s, i: s.client.get(f'/api/users/{s.user_id}')),
+        # Usuario autenticado
+        ('GET /api/users/profile', get('/api/users/profile', Session.user)),
+        ('PUT /api/users/profile', lambda s, i: s.client.put(
+            '/api/users/profile', json={'nombre': f'Usuario {i}'}, headers=s.user())),
+        ('POST /api/products/ con imagen', lambda s, i: _create(s, i, with_image=True)),
+        ('POST /api/products/', lambda s, i: _create(s, i, with_image=False)),
+        ('PUT /api/products/<id>', lambda s, i: s.client.put(
+            f'/api/products/{random.choice(s.created)}', data=product_form(s, i, with_image=False),
+            headers=s.user(), content_type='multipart/form-data')),
+        ('PATCH /api/products/<id>/status', lambda s, i: s.client.patch(
+            f'/api/products/{random.choice(s.created)}/status',
+            json={'estado': random.choice(['reservado', 'disponible'])}, headers=s.user())),
+        ('POST /api/products/bulk (100)', lambda s, i: s.client.post(
+            '/api/products/bulk', json=[random_product() for _ in range(100)], headers=s.user())),
+        ('POST /api/products/bulk/status', lambda s, i: s.client.post(
+            '/api/products/bulk/status', json={'ids': s.own_ids, 'estado': random.choice(['reservado', 'disponible'])},
+            headers=s.user())),
+        ('DELETE /api/products/<id>', lambda s, i: s.client.delete(
+            f'/api/products/{s.created.pop()}', headers=s.user())),
+        ('POST /api/products/bulk/delete', lambda s, i: s.client.post(
+            '/api/products/bulk/delete', json={'ids': [s.created.pop() for _ in range(10)]},
+            headers=s.user())),
+        # Autenticación (dominada por el costo de bcrypt)
+        ('POST /api/auth/login', lambda s, i: s.client.post(
+            '/api/auth/login', json={'email': user_email(1), 'password': PASSWORD})),
+        ('POST /api/auth/register', lambda s, i: s.client.post('/api/auth/register', json={
+            'username': f'r{s.run_id}_{i}', 'email': f'r{s.run_id}_{i}@bench.tradeco',
+            'password': PASSWORD, 'nombre': 'Registro'})),
+        # Dashboard (admin)
+        ('GET /api/dashboard/stats', get('/api/dashboard/stats', Session.admin)),
+        ('GET /api/dashboard/products-by-category', get('/api/dashboard/products-by-category', Session.admin)),
+        ('GET /api/dashboard/recent-activity', get('/api/dashboard/recent-activity', Session.admin)),
+        ('GET /api/dashboard/users-growth', get('/api/dashboard/users-growth', Session.admin)),
+        ('GET /api/dashboard/top-sellers', get('/api/dashboard/top-sellers', Session.admin)),
+        ('GET /api/dashboard/price-stats', get('/api/dashboard/price-stats', Session.admin)),
+        ('GET /api/dashboard/system', get('/api/dashboard/system', Session.admin)),
+        ('GET /api/users/ (admin)', get('/api/users/?limit=20&page=5', Session.admin)),
+    ]
+
+
+def _create(session, i, with_image):
+    response = session.client.post('/api/products/', data=product_form(session, i, with_image),
+                                   headers=session.user(), content_type='multipart/form-data')
+    if response.status_code == 201:
+        session.created.append(response.get_json()['data']['id'])
+    return response
+
+
+def run_scenario(session, fn, requests, warmup):
+    """Ejecutar un escenario y devolver latencias (ms), errores y segundos totales"""
+    for i in range(warmup):
+        fn(session, i)
+    
+    samples = []
+    errors = 0
+    started = time.perf_counter()
+    for i in range(requests):
+        start = time.perf_counter()
+        response = fn(session, warmup + i)
+        samples.append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+    return samples, errors, time.perf_counter() - started
+
+
+def run(args):
+    # La app apunta a la base del benchmark y guarda las imágenes en un temporal
+    Config.DB_NAME = args.db
+    Config.UPLOAD_FOLDER = tempfile.mkdtemp(prefix='tradeco-bench-')
+    Config.CREATE_INDEXES_ON_STARTUP = False
+    Config.DEBUG = False
+    from app import create_app
+    
+    app = create_app(Config)
+    models = app.extensions['tradeco']
+    db = models['db']
+    
+    if not args.reuse:
+        db.client.drop_database(args.db)
+        seed(db, args.users, args.products, workers=args.workers, log=lambda message: None)
+        print(f"Datos: {args.users} usuarios y {args.products} productos\n")
+    
+    session = Session(app.test_client(), db)
+    results = {}
+    for name, fn in scenarios():
+        if args.only and args.only not in name:
+            continue
+        # Las altas crean los productos que después se editan y borran
+        requests, warmup = args.requests, args.warmup
+        if name in CONSUMERS:
+            requests, warmup = min(requests, len(session.created) // CONSUMERS[name]), 0
+            if requests == 0:
+                continue
+        samples, errors, seconds = run_scenario(session, fn, requests, warmup)
+        stats = percentiles(samples)
+        results[name] = {
+            **{key: round(value, 3) for key, value in stats.items()},
+            'rps': round(len(samples) / seconds, 1),
+            'requests': len(samples),
+            'errors': errors
+        }
+        print(f"{name:45s} {results[name]['rps']:8.1f} req/s  "
+              f"p50={stats['p50']:.2f}  p95={stats['p95']:.2f}  p99={stats['p99']:.2f} ms"
+              + (f"  errores={errors}" if errors else ''))
+    
+    if not args.keep and not args.reuse:
+        db.client.drop_database(args.db)
+    
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.utcnow().isoformat(),
+            'products': args.products,
+            'users': args.users,
+            'requests': args.requests,
+            'python': platform.python_version(),
+            'json_provider': Config.JSON_PROVIDER,
+            'bcrypt_rounds': Config.BCRYPT_ROUNDS
+        },
+        'endpoints': results
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current, threshold, min_ms=1.0):
+    """
+    Comparar dos resultados. Devuelve los endpoints cuyo p95 empeoró más que
+    threshold (fracción) y más de min_ms, para no marcar ruido en rutas de 1 ms.
+    """
+    regressions = []
+    print(f"\n{'endpoint':45s} {'p95 antes':>10s} {'p95 ahora':>10s} {'cambio':>8s} {'req/s':>16s}")
+    for name, now in current['endpoints'].items():
+        before = baseline['endpoints'].get(name)
+        if before is None:
+            continue
+        change = (now['p95'] - before['p95']) / before['p95'] if before['p95'] else 0.0
+        regressed = change > threshold and now['p95'] - before['p95'] > min_ms
+        if regressed:
+            regressions.append(name)
+        print(f"{name:45s} {before['p95']:10.2f} {now['p95']:10.2f} {change:+8.1%} "
+              f"{before['rps']:7.1f} → {now['rps']:7.1f}" + ('  ⚠️' if regressed else ''))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de todos los endpoints')
+    parser.add_argument('--products', type=int, default=10000, help='10000, 100000, 1000000...')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Procesos para cargar los datos')
+    parser.add_argument('--requests', type=int, default=200, help='Peticiones medidas por endpoint')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--db', default='tradeco_bench_endpoints')
+    parser.add_argument('--reuse', action='store_true', help='Usar los datos de una corrida anterior (--keep)')
+    parser.add_argument('--keep', action='store_true', help='No borrar la base al terminar')
+    parser.add_argument('--only', help='Solo los endpoints cuyo nombre contiene este texto')
+    parser.add_argument('--output', help='Archivo JSON con el resultado')
+    parser.add_argument('--compare', help='Resultado JSON de referencia')
+    parser.add_argument('--against', help='Comparar con este JSON en vez de correr el benchmark')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Aumento de p95 tolerado (0.10 = 10%%)')
+    args = parser.parse_args()
+    
+    random.seed(42)
+    if args.against:
+        with open(args.against) as f:
+            current = json.load(f)
+    else:
+        current = run(args)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(current, f, indent=2, ensure_ascii=False)
+            print(f"\nResultado guardado en {args.output}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} endpoints empeoraron más de {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ Sin regresiones")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark de relevancia y latencia de la búsqueda y el autocompletado.
+
+Carga un catálogo sintético (seed_data.py) en una base de datos aparte,
+ejecuta consultas con y sin tildes, en singular y plural, y reporta
+precision@10 junto con p50/p95/p99 de Product.search y Product.suggest.
+
+Requiere un MongoDB accesible (MONGODB_URI). Uso (desde backend/):
+    python -m benchmarks.bench_search --products 20000
+"""
+import argparse
+import statistics
+import time
+
+from pymongo import MongoClient
+
+from config import Config
+from models.indexes import sync_indexes
+from models.product import Product
+from seed_data import seed_products
+from utils.text import fold, tokenize
+
+# (consulta, palabras que un resultado relevante debe tener en el nombre)
+QUERIES = [
+    ('campera de cuero', ['campera', 'cuero']),
+    ('pantalon jean', ['pantalon', 'jean']),
+    ('camperas negras', ['campera', 'negr']),
+    ('remera algodon blanca', ['remera', 'algodon', 'blanc']),
+    ('vestido seda', ['vestido', 'seda']),
+    ('zapatillas deportivas', ['zapatilla', 'deportiv']),
+    ('buzo lana gris', ['buzo', 'lana', 'gris']),
+    ('pollera vintage', ['pollera', 'vintage']),
+]
+
+SUGGEST_PREFIXES = ['ca', 'cam', 'camp', 'pant', 'rem', 'zapa', 'vest cu', 'campera cu', 'bu']
+
+
+def is_relevant(product, required):
+    words = tokenize(product.get('nombre'))
+    return all(any(word.startswith(fold(stem)) for word in words) for stem in required)
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda p: ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+    return {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99), 'mean': statistics.mean(ordered)}
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de búsqueda y autocompletado')
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--db', default='tradeco_bench_search')
+    parser.add_argument('--keep', action='store_true', help='No borrar la base al terminar')
+    args = parser.parse_args()
+    
+    client = MongoClient(Config.MONGODB_URI)
+    client.drop_database(args.db)
+    db = client[args.db]
+    sync_indexes(db, replace_text=True, log=lambda message: None)
+    product_model = Product(db)
+    
+    start = time.perf_counter()
+    seed_products(db, args.products, [('bench', 'bench')], log=lambda message: None)
+    print(f"Catálogo: {args.products} productos cargados en {time.perf_counter() - start:.1f} s\n")
+    
+    print("Relevancia (precision@10) y latencia de búsqueda:")
+    search_samples = []
+    precisions = []
+    for query, required in QUERIES:
+        results = product_model.search(query, 0, 10)
+        precision = sum(is_relevant(p, required) for p in results) / max(len(results), 1)
+        precisions.append(precision)
+        search_samples += timed(lambda: product_model.search(query, 0, 20), args.repeat)
+        print(f"  {query:28s} p@10={precision:.2f}  top={results[0]['nombre'] if results else '-'}")
+    
+    suggest_samples = []
+    for prefix in SUGGEST_PREFIXES:
+        product_model._suggest_cache.clear()
+        suggest_samples += timed(lambda: (product_model._suggest_cache.clear(),
+                                          product_model.suggest(prefix)), args.repeat)
+    
+    search_stats = percentiles(search_samples)
+    suggest_stats = percentiles(suggest_samples)
+    print(f"\nprecision@10 media: {statistics.mean(precisions):.2f}")
+    print("search  (ms): " + '  '.join(f"{k}={v:.2f}" for k, v in search_stats.items()))
+    print("suggest (ms): " + '  '.join(f"{k}={v:.2f}" for k, v in suggest_stats.items()))
+    
+    if not args.keep:
+        client.drop_database(args.db)
+
+
+if __name__ == '__main__':
+    main()
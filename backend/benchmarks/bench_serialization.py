@@ -0,0 +1,89 @@
+"""
+Benchmark de serialización de GET /api/products/?limit=100.
+
+Compara el proveedor JSON estándar con orjson y mide los bytes enviados sin
+compresión, con gzip y con brotli. No necesita MongoDB: genera documentos
+con la misma forma que devuelve la colección products.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_serialization --iterations 500
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from flask import Flask, jsonify
+
+from models.product import Product
+from utils.compression import compress_response
+from utils.json_provider import init_json_provider, orjson
+
+
+def fake_products(n):
+    now = datetime.utcnow()
+    return [{
+        "_id": ObjectId(),
+        "nombre": f"Remera de algodón orgánico #{i}",
+        "descripcion": "Prenda en muy buen estado, usada pocas veces. " * 4,
+        "precio": round(random.uniform(1000, 50000), 2),
+        "talla": random.choice(["XS", "S", "M", "L", "XL"]),
+        "categoria": random.choice(Product.CATEGORIES),
+        "imagen_url": f"/uploads/products/20240101_120000_foto_{i}.jpg",
+        "user_id": str(ObjectId()),
+        "username": f"usuario_{i % 37}",
+        "estado": "disponible",
+        "created_at": (now - timedelta(minutes=i)).replace(microsecond=i * 1000),
+        "updated_at": now
+    } for i in range(n)]
+
+
+def measure(provider, products, iterations):
+    """Tiempo medio por respuesta (to_dict + jsonify) y tamaños en bytes"""
+    app = Flask(__name__)
+    init_json_provider(app, provider)
+    # to_dict no usa la conexión, así que no hace falta una base de datos
+    model = Product.__new__(Product)
+    
+    def build():
+        return jsonify({
+            'success': True,
+            'data': {'products': [model.to_dict(p) for p in products]}
+        })
+    
+    with app.test_request_context('/api/products/?limit=100'):
+        build()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            response = build()
+        elapsed = (time.perf_counter() - start) / iterations * 1000
+        identity = len(response.get_data())
+    
+    sizes = {'identity': identity}
+    for encoding in ('gzip', 'br'):
+        with app.test_request_context('/api/products/?limit=100',
+                                      headers={'Accept-Encoding': encoding}):
+            response = compress_response(build())
+            if response.headers.get('Content-Encoding') == encoding:
+                sizes[encoding] = len(response.get_data())
+    
+    return elapsed, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de serialización JSON')
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--limit', type=int, default=100)
+    args = parser.parse_args()
+    
+    products = fake_products(args.limit)
+    providers = ['default'] + (['orjson'] if orjson else [])
+    for provider in providers:
+        elapsed, sizes = measure(provider, products, args.iterations)
+        sizes_text = ', '.join(f"{k}={v} B" for k, v in sizes.items())
+        print(f"{provider:8s} {elapsed:8.3f} ms/respuesta   {sizes_text}")
+
+
+if __name__ == '__main__':
+    main()
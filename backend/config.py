@@ -8,20 +8,92 @@ class Config:
     # MongoDB
     MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
     DB_NAME = os.getenv('DB_NAME', 'tradeco_db')
+    # Crear los índices faltantes al iniciar la app (solo crea, nunca elimina ni
+    # reemplaza). Por defecto, solo en desarrollo (FLASK_DEBUG): en producción
+    # cada worker lo haría, y se corre python manage_indexes.py sync por despliegue.
+    CREATE_INDEXES_ON_STARTUP = os.getenv(
+        'CREATE_INDEXES_ON_STARTUP', os.getenv('FLASK_DEBUG', 'True')
+    ) == 'True'
     
     # JWT
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'change-this-secret-key')
     JWT_EXPIRATION_HOURS = int(os.getenv('JWT_EXPIRATION_HOURS', 24))
+    TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', 10000))  # tokens verificados en memoria
+    
+    # Contraseñas (bcrypt)
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))  # costo; al cambiarlo se rehashea en el login
+    BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS', 2))  # hilos dedicados a bcrypt
+    BCRYPT_MAX_QUEUE = int(os.getenv('BCRYPT_MAX_QUEUE', 16))  # pendientes antes de responder 503
     
     # Flask
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
     DEBUG = os.getenv('FLASK_DEBUG', 'True') == 'True'
     PORT = int(os.getenv('PORT', 5000))
     
+    # Modo ASGI (uvicorn asgi:app): lecturas con motor, el resto por Flask
+    ASYNC_MAX_POOL_SIZE = int(os.getenv('ASYNC_MAX_POOL_SIZE', 100))  # conexiones de motor por proceso
+    WSGI_FALLBACK_THREADS = int(os.getenv('WSGI_FALLBACK_THREADS', 10))  # hilos para las rutas Flask
+    
+    # Respuestas JSON
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson')  # orjson o default
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # bytes
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))
+    # Revisar el frontend en cada petición de un asset y recalcular el manifiesto
+    # si cambió (para editar HTML/CSS/JS con el servidor corriendo). Recorre todo
+    # el directorio, así que por defecto no, ni siquiera con DEBUG.
+    ASSETS_AUTO_RELOAD = os.getenv('ASSETS_AUTO_RELOAD', 'False') == 'True'
+    
     # Archivos
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads/products')
     MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE', 5242880))  # 5MB
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+    UPLOADS_MAX_AGE = int(os.getenv('UPLOADS_MAX_AGE', 3600))  # archivos sin timestamp
+    # Detrás de nginx: prefijo de la location interna (ej. /protected-uploads/)
+    UPLOADS_ACCEL_REDIRECT = os.getenv('UPLOADS_ACCEL_REDIRECT', '')
+    # Detrás de Apache/lighttpd: delegar el envío con X-Sendfile
+    USE_X_SENDFILE = os.getenv('USE_X_SENDFILE', 'False') == 'True'
+    
+    # Carga masiva de productos
+    BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 5000))  # productos por petición
+    BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', 500))  # documentos por insert_many
+    
+    # Procesamiento de imágenes (variantes en segundo plano)
+    IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', 2))  # procesos del pool
+    IMAGE_THUMB_SIZE = int(os.getenv('IMAGE_THUMB_SIZE', 200))  # px (lado mayor)
+    IMAGE_MEDIUM_SIZE = int(os.getenv('IMAGE_MEDIUM_SIZE', 800))  # px (lado mayor)
+    IMAGE_QUALITY = int(os.getenv('IMAGE_QUALITY', 80))
+    
+    # Listados
+    COUNT_CACHE_TTL = int(os.getenv('COUNT_CACHE_TTL', 60))  # segundos
+    COUNT_CACHE_SIZE = int(os.getenv('COUNT_CACHE_SIZE', 2000))  # filtros distintos en memoria
+    COUNT_CACHE_MAX_STALE = int(os.getenv('COUNT_CACHE_MAX_STALE', 600))  # segundos sin refrescar antes de descartar
+    
+    # Cache de lectura (documentos por ID)
+    PRODUCT_CACHE_SIZE = int(os.getenv('PRODUCT_CACHE_SIZE', 1000))
+    PRODUCT_CACHE_TTL = int(os.getenv('PRODUCT_CACHE_TTL', 60))  # segundos
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 1000))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 300))  # segundos
+    
+    # Facetas del catálogo (rangos de precio y cache de la vista sin filtros)
+    PRICE_BUCKETS = [int(b) for b in os.getenv('PRICE_BUCKETS', '0,5000,10000,20000,50000,100000').split(',')]
+    FACETS_CACHE_TTL = int(os.getenv('FACETS_CACHE_TTL', 30))  # segundos
+    
+    # Autocompletado de búsqueda
+    SUGGEST_CACHE_SIZE = int(os.getenv('SUGGEST_CACHE_SIZE', 5000))
+    SUGGEST_CACHE_TTL = int(os.getenv('SUGGEST_CACHE_TTL', 30))  # segundos
+    
+    # Cache HTTP de lecturas públicas (ETag/Last-Modified y Cache-Control)
+    CATALOG_VERSION_TTL = int(os.getenv('CATALOG_VERSION_TTL', 2))  # segundos que se reusa la versión leída
+    CATALOG_MAX_AGE = int(os.getenv('CATALOG_MAX_AGE', 0))  # navegador: 0 = revalidar siempre con ETag
+    CATALOG_SHARED_MAX_AGE = int(os.getenv('CATALOG_SHARED_MAX_AGE', 10))  # proxy inverso (s-maxage)
+    CATEGORIES_MAX_AGE = int(os.getenv('CATEGORIES_MAX_AGE', 86400))  # cambian solo con un deploy
+    
+    # Invalidación de caches entre workers con un change stream (requiere replica set)
+    INVALIDATION_BUS = os.getenv('INVALIDATION_BUS', 'False') == 'True'
+    INVALIDATION_CONSUMER = os.getenv('INVALIDATION_CONSUMER', '')  # id del resume token, único por proceso (por defecto, hostname:pid)
+    INVALIDATION_TOKEN_INTERVAL = int(os.getenv('INVALIDATION_TOKEN_INTERVAL', 5))  # segundos entre guardados del token
+    INVALIDATION_RETRY_SECONDS = int(os.getenv('INVALIDATION_RETRY_SECONDS', 5))  # espera antes de reconectar
     
     @staticmethod
     def init_app():
@@ -1,21 +1,19 @@
 from pymongo import MongoClient
 from config import Config
-import bcrypt
+from models.stats import Stats
+from models.user import User
 
 client = MongoClient(Config.MONGODB_URI)
 db = client[Config.DB_NAME]
 
-# Crear admin
-admin_data = {
+# Crear admin con el modelo: contraseña hasheada, fechas y contadores del dashboard
+user_model = User(db, Stats(db))
+admin = user_model.create({
     "username": "admin",
     "email": "admin@tradeco.com",
-    "password": bcrypt.hashpw("Admin123".encode('utf-8'), bcrypt.gensalt()),
+    "password": "Admin123",
     "nombre": "Administrador",
-    "telefono": "",
-    "direccion": "",
-    "role": "admin",
-    "active": True
-}
+    "role": "admin"
+})
 
-result = db.users.insert_one(admin_data)
-print(f"✅ Admin creado: {result.inserted_id}")
\ No newline at end of file
+print(f"✅ Admin creado: {admin['_id']}")
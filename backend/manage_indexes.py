@@ -0,0 +1,94 @@
+"""
+Administración de índices y verificación de planes de consulta.
+
+    python manage_indexes.py status                 # faltantes y sobrantes
+    python manage_indexes.py sync [--drop-stale]    # crear faltantes (y borrar sobrantes)
+    python manage_indexes.py sync --dry-run         # mostrar qué haría
+    python manage_indexes.py explain                # explain de todas las consultas
+
+La especificación está en models/indexes.py. explain termina con código 1
+si alguna consulta recorre la colección (COLLSCAN) u ordena en memoria (SORT).
+"""
+import argparse
+import sys
+from pymongo import MongoClient
+from config import Config
+from models.indexes import INDEXES, index_status, sync_indexes
+from models.product import Product
+from models.stats import Stats
+from models.user import User
+from routes.dashboard import query_shapes as dashboard_query_shapes
+from utils.query_plans import check_shapes
+
+
+def status(db):
+    pending = 0
+    for collection_name in INDEXES:
+        missing, stale = index_status(db, collection_name)
+        pending += len(missing)
+        print(f"{collection_name}: {len(INDEXES[collection_name])} en la especificación, "
+              f"{len(missing)} faltantes, {len(stale)} sobrantes")
+        for spec in missing:
+            print(f"  ➕ {spec.get('name') or spec['keys']}")
+        for name in stale:
+            print(f"  🗑️  {name}")
+    return 1 if pending else 0
+
+
+def sync(db, drop_stale, dry_run):
+    # Un índice de texto anterior se reemplaza siempre: solo puede haber uno
+    report = sync_indexes(db, drop_stale=drop_stale, replace_text=True, dry_run=dry_run)
+    for collection_name, result in report.items():
+        print(f"✅ {collection_name}: {len(result['created'])} creados, "
+              f"{len(result['dropped'])} eliminados")
+        for name in result["stale"]:
+            print(f"  ⚠️ sobrante: {name} (usar --drop-stale para eliminarlo)")
+    return 0
+
+
+def explain(db):
+    shapes = (
+        Product(db).query_shapes()
+        + User(db).query_shapes()
+        + Stats(db).query_shapes()
+        + dashboard_query_shapes()
+    )
+    failures = 0
+    for shape, problems in check_shapes(db, shapes):
+        label = f"{shape['collection']}: {shape['name']}"
+        if problems:
+            failures += 1
+            print(f"❌ {label}: {', '.join(problems)}")
+        else:
+            print(f"✅ {label}")
+    
+    if failures:
+        print(f"\n❌ {failures} de {len(shapes)} consultas sin índice adecuado")
+        return 1
+    print(f"\n✅ Las {len(shapes)} consultas usan índices")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Índices de MongoDB de TRADEco')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('status', help='Comparar la especificación con la base')
+    sync_parser = commands.add_parser('sync', help='Crear índices faltantes')
+    sync_parser.add_argument('--drop-stale', action='store_true',
+                             help='Eliminar índices que no están en la especificación')
+    sync_parser.add_argument('--dry-run', action='store_true', help='Solo mostrar los cambios')
+    commands.add_parser('explain', help='Verificar los planes de todas las consultas')
+    args = parser.parse_args()
+    
+    client = MongoClient(Config.MONGODB_URI)
+    db = client[Config.DB_NAME]
+    
+    if args.command == 'status':
+        return status(db)
+    if args.command == 'sync':
+        return sync(db, args.drop_stale, args.dry_run)
+    return explain(db)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,45 +1,78 @@
 from functools import wraps
 from flask import request, jsonify
+import hashlib
+import time
 import jwt
 from config import Config
+from utils.cache import LRUCache
+
+# Tokens ya verificados: sha256(token) -> (user_id, role)
+# Cada entrada vence junto con el 'exp' del token
+token_cache = LRUCache(Config.TOKEN_CACHE_SIZE, Config.JWT_EXPIRATION_HOURS * 3600)
+
+def decode_token(token):
+    """
+    Verificar un JWT y devolver (user_id, role).
+    Los tokens ya verificados se sirven desde el cache sin repetir la firma.
+    Lanza jwt.InvalidTokenError (o ExpiredSignatureError) si no es válido.
+    """
+    key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+    claims = token_cache.get(key)
+    if claims is not None:
+        return claims
+    
+    data = jwt.decode(token, Config.JWT_SECRET_KEY, algorithms=["HS256"])
+    if 'user_id' not in data:
+        raise jwt.InvalidTokenError('Token sin user_id')
+    
+    claims = (data['user_id'], data.get('role', 'usuario'))
+    
+    # Cachear solo hasta que el token expire
+    ttl = data['exp'] - time.time() if 'exp' in data else None
+    if ttl is None or ttl > 0:
+        token_cache.set(key, claims, ttl=ttl)
+    
+    return claims
+
+def _error(message, status):
+    return jsonify({
+        'success': False,
+        'message': message
+    }), status
+
+def authenticate():
+    """
+    Leer y verificar el token del header Authorization.
+    Devuelve (user_id, role, None) o (None, None, respuesta_de_error).
+    """
+    token = None
+    
+    # Buscar token en el header Authorization
+    auth_header = request.headers.get('Authorization')
+    if auth_header is not None:
+        try:
+            token = auth_header.split(" ")[1]  # Bearer <token>
+        except IndexError:
+            return None, None, _error('Formato de token inválido', 401)
+    
+    if not token:
+        return None, None, _error('Token no proporcionado', 401)
+    
+    try:
+        current_user_id, current_user_role = decode_token(token)
+    except jwt.ExpiredSignatureError:
+        return None, None, _error('Token expirado', 401)
+    except jwt.InvalidTokenError:
+        return None, None, _error('Token inválido', 401)
+    
+    return current_user_id, current_user_role, None
 
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        
-        # Buscar token en el header Authorization
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            try:
-                token = auth_header.split(" ")[1]  # Bearer <token>
-            except IndexError:
-                return jsonify({
-                    'success': False,
-                    'message': 'Formato de token inválido'
-                }), 401
-        
-        if not token:
-            return jsonify({
-                'success': False,
-                'message': 'Token no proporcionado'
-            }), 401
-        
-        try:
-            # Decodificar el token
-            data = jwt.decode(token, Config.JWT_SECRET_KEY, algorithms=["HS256"])
-            current_user_id = data['user_id']
-            current_user_role = data.get('role', 'usuario')
-        except jwt.ExpiredSignatureError:
-            return jsonify({
-                'success': False,
-                'message': 'Token expirado'
-            }), 401
-        except jwt.InvalidTokenError:
-            return jsonify({
-                'success': False,
-                'message': 'Token inválido'
-            }), 401
+        current_user_id, current_user_role, error = authenticate()
+        if error:
+            return error
         
         # Pasar el ID del usuario a la función
         return f(current_user_id, current_user_role, *args, **kwargs)
@@ -49,47 +82,14 @@ def token_required(f):
 def admin_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            try:
-                token = auth_header.split(" ")[1]
-            except IndexError:
-                return jsonify({
-                    'success': False,
-                    'message': 'Formato de token inválido'
-                }), 401
+        current_user_id, current_user_role, error = authenticate()
+        if error:
+            return error
         
-        if not token:
-            return jsonify({
-                'success': False,
-                'message': 'Token no proporcionado'
-            }), 401
-        
-        try:
-            data = jwt.decode(token, Config.JWT_SECRET_KEY, algorithms=["HS256"])
-            current_user_id = data['user_id']
-            current_user_role = data.get('role', 'usuario')
-            
-            # Verificar que sea admin
-            if current_user_role != 'admin':
-                return jsonify({
-                    'success': False,
-                    'message': 'Acceso denegado. Se requiere rol de administrador'
-                }), 403
-            
-        except jwt.ExpiredSignatureError:
-            return jsonify({
-                'success': False,
-                'message': 'Token expirado'
-            }), 401
-        except jwt.InvalidTokenError:
-            return jsonify({
-                'success': False,
-                'message': 'Token inválido'
-            }), 401
+        # Verificar que sea admin
+        if current_user_role != 'admin':
+            return _error('Acceso denegado. Se requiere rol de administrador', 403)
         
         return f(current_user_id, current_user_role, *args, **kwargs)
     
-    return decorated
\ No newline at end of file
+    return decorated
@@ -0,0 +1,182 @@
+import copy
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+from utils.pagination import cursor_query, sort_spec
+from utils.query_plans import missing_hint
+from utils.text import query_prefixes
+
+
+class AsyncProduct:
+    """
+    Lecturas de productos con el driver async (motor).
+    Envuelve al modelo Product: comparte sus caches y arma las consultas con
+    los mismos métodos, así el modo ASGI devuelve exactamente lo mismo. Las
+    escrituras siguen pasando por Product (rutas WSGI) e invalidan esos caches.
+    """
+    
+    def __init__(self, product_model, db):
+        self.model = product_model
+        self.collection = db.products
+        self.stats_collection = db.stats
+    
+    def to_dict(self, product, fields=None):
+        return self.model.to_dict(product, fields)
+    
+    async def catalog_version(self):
+        """Igual que Product.catalog_version (comparte el cache de Stats)"""
+        stats = self.model.stats
+        if stats is None:
+            return None
+        
+        version = stats._catalog_cache.get(stats.CATALOG_ID)
+        if version is None:
+            document = await self.stats_collection.find_one({"_id": stats.CATALOG_ID})
+            version = stats._catalog_value(document)
+            stats._catalog_cache.set(stats.CATALOG_ID, version)
+        return version
+    
+    async def find_by_id(self, product_id):
+        """Buscar producto por ID (con el cache de lectura de Product)"""
+        key = str(product_id)
+        product = self.model.cache.get(key)
+        if product is None:
+            try:
+                product = await self.collection.find_one({"_id": ObjectId(product_id)})
+            except:
+                return None
+            if product is None:
+                return None
+            self.model.cache.set(key, product)
+        
+        return copy.deepcopy(product)
+    
+    async def list_page(self, filters=None, search=None, skip=0, limit=20, cursor=None,
+                        approximate_total=False, sort=None, fields=None):
+        """Igual que Product.list_page"""
+        model = self.model
+        if sort is None and not search:
+            sort = "newest"
+        query = model._listing_query(filters, search)
+        hint = model._listing_hint(filters, search, sort)
+        projection = model._projection(fields, sort)
+        
+        if cursor or approximate_total:
+            if sort is None:
+                products = await self._ranked(query, skip, limit, projection)
+            else:
+                products = await self._paginate(query, skip, limit, cursor, sort, hint, projection)
+            return products, await self._approximate_count(query)
+        
+        pipeline = model._listing_pipeline(query, sort, skip, limit, projection)
+        
+        async def run(hint):
+            options = {"hint": hint} if hint else {}
+            return await self.collection.aggregate(pipeline, **options).to_list(1)
+        
+        results = await self._run_hinted(run, hint)
+        result = results[0] if results else {}
+        total = result["total"][0]["n"] if result.get("total") else 0
+        return result.get("items", []), total
+    
+    async def _paginate(self, query, skip, limit, cursor, sort="newest", hint=None, projection=None):
+        if cursor:
+            query = {"$and": [query, cursor_query(cursor, sort)]}
+            skip = 0
+        
+        async def run(hint):
+            products = self.collection.find(query, projection).sort(sort_spec(sort))
+            if hint:
+                products = products.hint(hint)
+            return await products.skip(skip).limit(limit).to_list(None)
+        
+        return await self._run_hinted(run, hint)
+    
+    async def _run_hinted(self, run, hint):
+        """Igual que Product._run_hinted"""
+        try:
+            return await run(hint)
+        except OperationFailure as e:
+            if hint is None or not missing_hint(e):
+                raise
+            self.model._warn_missing_hint(hint)
+            return await run(None)
+    
+    async def _ranked(self, query, skip, limit, projection=None):
+        score = {**(projection or {}), "score": {"$meta": "textScore"}}
+        products = self.collection.find(query, score)\
+            .sort([("score", {"$meta": "textScore"})])\
+            .skip(skip)\
+            .limit(limit)
+        return await products.to_list(None)
+    
+    async def _approximate_count(self, query):
+        """
+        Conteo desde el CountCache de Product. Solo la primera vez (sin valor
+        previo) se cuenta con motor; los refrescos siguen en segundo plano.
+        """
+        key = self.model._count_key(query)
+        if self.model._count_cache.peek(key) is None:
+            self.model._count_cache.put(key, await self.collection.count_documents(query))
+        return self.model._approximate_count(query)
+    
+    async def facets(self, filters=None, search=None):
+        """Igual que Product.facets (comparte el cache de la vista sin filtros)"""
+        model = self.model
+        unfiltered = not filters and not search
+        if unfiltered:
+            key = model._facets_key(await self.catalog_version())
+            cached = model._facets_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        pipeline = model._facets_pipeline(model._listing_query(filters, search))
+        results = await self.collection.aggregate(pipeline).to_list(1)
+        data = model._facets_result(results[0] if results else {})
+        if unfiltered:
+            model._facets_cache.set(key, data)
+        return data
+    
+    async def suggest(self, prefix, limit=8):
+        """Igual que Product.suggest"""
+        model = self.model
+        prefixes = query_prefixes(prefix)
+        if not prefixes:
+            return []
+        
+        key = model._suggest_key(prefixes, limit, await self.catalog_version())
+        cached = model._suggest_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        query, projection = model._suggest_query(prefixes)
+        products = await self.collection.find(query, projection).to_list(limit * 3)
+        
+        suggestions = model._collect_suggestions(products, limit)
+        model._suggest_cache.set(key, suggestions)
+        return suggestions
+
+
+class AsyncUser:
+    """Lecturas de usuarios con motor, compartiendo el cache de User"""
+    
+    def __init__(self, user_model, db):
+        self.model = user_model
+        self.collection = db.users
+    
+    def public_dict(self, user):
+        return self.model.public_dict(user)
+    
+    async def find_by_id(self, user_id):
+        """Buscar usuario por ID (con el cache de lectura de User)"""
+        key = str(user_id)
+        user = self.model.cache.get(key)
+        if user is None:
+            try:
+                user = await self.collection.find_one({"_id": ObjectId(user_id)})
+            except:
+                return None
+            if user is None:
+                return None
+            self.model.cache.set(key, user)
+        
+        return copy.deepcopy(user)
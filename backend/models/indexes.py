@@ -0,0 +1,160 @@
+"""
+Especificación única de los índices de MongoDB.
+
+Es la única fuente: manage_indexes.py la aplica con sync_indexes (y la app
+crea los faltantes si CREATE_INDEXES_ON_STARTUP está activo). Cada índice se
+identifica por sus claves y opciones, no por el nombre, así que los creados
+antes con otro nombre se reconocen como presentes.
+"""
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+from models.product import Product
+
+TEXT_INDEX = {
+    "keys": [("nombre", "text"), ("descripcion", "text")],
+    # Español: stemming y sin distinguir tildes. El nombre pesa más en el ranking.
+    "name": "busqueda_texto",
+    "default_language": "spanish",
+    "weights": {"nombre": 10, "descripcion": 2}
+}
+
+INDEXES = {
+    "users": [
+        {"keys": [("email", 1)], "unique": True},
+        {"keys": [("username", 1)], "unique": True},
+        # Actividad reciente, crecimiento mensual y altas por día del dashboard
+        {"keys": [("created_at", -1)]},
+        # Conteo de usuarios activos al reconstruir las estadísticas
+        {"keys": [("active", 1)]},
+    ],
+    "products": [
+        # Productos de un usuario (también sirve para user_id solo)
+        {"keys": [("user_id", 1), ("created_at", -1), ("_id", -1)]},
+        # Productos por categoría del dashboard (cubierto)
+        {"keys": [("categoria", 1), ("estado", 1)]},
+        # Actividad reciente y altas por día
+        {"keys": [("created_at", -1)]},
+        # Listado: (estado, [categoria], [talla], campo de orden, _id) para cada
+        # combinación de filtros y orden. El de precio con categoría y talla
+        # también cubre la agregación de facetas.
+        *({"keys": keys} for keys in Product.listing_indexes()),
+        # Autocompletado por prefijos de palabras
+        {"keys": [("estado", 1), ("search_prefixes", 1)]},
+        TEXT_INDEX,
+    ],
+    "stats": [
+        # Top sellers del dashboard (documentos por vendedor)
+        {"keys": [("total_products", -1)]},
+    ],
+    "invalidation_tokens": [
+        # Resume tokens de procesos que ya no existen (hostname:pid)
+        {"keys": [("updated_at", 1)], "expireAfterSeconds": 7 * 24 * 3600},
+    ],
+}
+
+
+def _is_text(keys):
+    return any(direction == "text" for _, direction in keys)
+
+
+def _signature(keys, options):
+    """Identidad de un índice: claves y opciones que cambian su comportamiento"""
+    if _is_text(keys):
+        weights = options.get("weights") or {field: 1 for field, _ in keys}
+        return ("text", tuple(sorted(weights.items())), options.get("default_language", "english"))
+    return (tuple((field, direction) for field, direction in keys), bool(options.get("unique")))
+
+
+def _existing_is_text(index):
+    return "textIndexVersion" in index or "_fts" in index["key"]
+
+
+def _existing_signature(index):
+    """Identidad de un índice tal como lo devuelve list_indexes()"""
+    if _existing_is_text(index):
+        return ("text", tuple(sorted(index.get("weights", {}).items())),
+                index.get("default_language", "english"))
+    return (tuple(index["key"].items()), bool(index.get("unique")))
+
+
+def _options(spec):
+    return {name: value for name, value in spec.items() if name != "keys"}
+
+
+def index_status(db, collection_name):
+    """
+    Comparar la especificación con los índices existentes de una colección.
+    Devuelve (faltantes, sobrantes): especificaciones sin crear y nombres de
+    índices que no están en la especificación.
+    """
+    specs = INDEXES[collection_name]
+    existing = {
+        _existing_signature(index): index["name"]
+        for index in db[collection_name].list_indexes()
+        if index["name"] != "_id_"
+    }
+    wanted = {_signature(spec["keys"], _options(spec)) for spec in specs}
+    
+    missing = [spec for spec in specs if _signature(spec["keys"], _options(spec)) not in existing]
+    stale = [name for signature, name in existing.items() if signature not in wanted]
+    return missing, stale
+
+
+def sync_indexes(db, drop_stale=False, replace_text=False, dry_run=False, log=print):
+    """
+    Aplicar la especificación: crear los índices faltantes (un solo
+    createIndexes por colección, que MongoDB 4.2+ construye sin bloquear
+    lecturas ni escrituras) y, si se pide, eliminar los sobrantes.
+    replace_text permite reemplazar un índice de texto anterior aunque no se
+    eliminen los demás sobrantes (solo puede haber uno por colección).
+    Devuelve {colección: {'created': [...], 'dropped': [...], 'stale': [...]}}.
+    """
+    report = {}
+    for collection_name in INDEXES:
+        collection = db[collection_name]
+        missing, stale = index_status(db, collection_name)
+        result = {"created": [], "dropped": [], "stale": list(stale)}
+        
+        text_stale = [
+            index["name"] for index in collection.list_indexes()
+            if _existing_is_text(index) and index["name"] in stale
+        ]
+        to_drop = list(stale) if drop_stale else []
+        if replace_text and any(_is_text(spec["keys"]) for spec in missing):
+            to_drop += [name for name in text_stale if name not in to_drop]
+        
+        for name in to_drop:
+            log(f"🗑️  {collection_name}.{name}")
+            if not dry_run:
+                collection.drop_index(name)
+            result["dropped"].append(name)
+            result["stale"].remove(name)
+        
+        if missing:
+            models = []
+            for spec in missing:
+                model = IndexModel(spec["keys"], background=True, **_options(spec))
+                name = model.document["name"]
+                # Un sobrante con el mismo nombre (u otro índice de texto) impide crearlo
+                blockers = [
+                    stale_name for stale_name in stale
+                    if stale_name not in to_drop
+                    and (stale_name == name or (_is_text(spec["keys"]) and stale_name in text_stale))
+                ]
+                if blockers:
+                    log(f"⚠️  {collection_name}.{name} requiere eliminar "
+                        f"{', '.join(blockers)} (usar --drop-stale)")
+                    continue
+                models.append(model)
+                log(f"➕ {collection_name}.{name}")
+            
+            if models and not dry_run:
+                try:
+                    collection.create_indexes(models)
+                except OperationFailure as e:
+                    log(f"❌ {collection_name}: {e}")
+                    raise
+            result["created"] = [model.document["name"] for model in models]
+        
+        report[collection_name] = result
+    return report
@@ -1,25 +1,56 @@
+import copy
+import json
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+from config import Config
+from utils.pagination import SORTS, cursor_query, encode_cursor, sort_spec
+from utils.count_cache import CountCache
+from utils.cache import LRUCache
+from utils.db import mongo_now
+from utils.query_plans import missing_hint
+from utils.text import search_prefixes, query_prefixes, fold
 
 class Product:
     """Modelo de Producto para MongoDB"""
     
     CATEGORIES = ["Remeras", "Abrigos", "Pantalones", "Vestidos", "Calzado", "Accesorios"]
+    STATUSES = ["disponible", "vendido", "reservado"]
     
-    def __init__(self, db):
-        self.collection = db.products
-        self._create_indexes()
+    # Dirección con la que se indexa cada campo de orden del listado.
+    # precio_desc recorre el índice de precio hacia atrás: no hace falta otro.
+    LISTING_SORT_FIELDS = {"created_at": -1, "precio": 1}
+    # Filtros de igualdad que forman parte del prefijo de los índices de listado
+    LISTING_EQUALITY_FIELDS = ("categoria", "talla")
     
-    def _create_indexes(self):
-        """Crear índices para búsquedas eficientes"""
-        self.collection.create_index("user_id")
-        self.collection.create_index("categoria")
-        self.collection.create_index("created_at")
-        self.collection.create_index([("nombre", "text"), ("descripcion", "text")])
+    # Campos públicos (los de to_dict, además de id) y vistas de los listados.
+    # summary es lo que muestra una tarjeta de la grilla: sin la descripción.
+    FIELDS = ("nombre", "descripcion", "precio", "talla", "categoria", "imagen_url",
+              "imagen_variants", "user_id", "username", "estado", "created_at")
+    VIEWS = {
+        "summary": ("nombre", "precio", "talla", "categoria", "imagen_url", "imagen_variants", "estado"),
+        "detail": FIELDS
+    }
     
-    def create(self, data, user_id):
-        """Crear un nuevo producto"""
-        product_data = {
+    # Campos de los que dependen las facetas y las sugerencias cacheadas
+    FACET_FIELDS = {"categoria", "talla", "precio", "estado"}
+    SUGGEST_FIELDS = {"nombre", "categoria", "estado", "search_prefixes"}
+    
+    def __init__(self, db, stats=None):
+        self.collection = db.products
+        self.stats = stats
+        self._count_cache = CountCache(Config.COUNT_CACHE_TTL, Config.COUNT_CACHE_SIZE,
+                                       Config.COUNT_CACHE_MAX_STALE)
+        self.cache = LRUCache(Config.PRODUCT_CACHE_SIZE, Config.PRODUCT_CACHE_TTL)
+        self._suggest_cache = LRUCache(Config.SUGGEST_CACHE_SIZE, Config.SUGGEST_CACHE_TTL)
+        self._facets_cache = LRUCache(1, Config.FACETS_CACHE_TTL)
+        self._missing_hint_warned = False
+    
+    def _build_document(self, data, user_id, now=None):
+        """Armar el documento de un producto nuevo"""
+        now = now or mongo_now()
+        return {
             "nombre": data.get("nombre"),
             "descripcion": data.get("descripcion", ""),
             "precio": float(data.get("precio", 0)),
@@ -28,61 +59,543 @@ class Product:
             "imagen_url": data.get("imagen_url", ""),
             "user_id": user_id,
             "username": data.get("username", ""),
+            "search_prefixes": search_prefixes(data.get("nombre")),
             "estado": "disponible",  # disponible, vendido, reservado
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "created_at": now,
+            "updated_at": now
         }
+    
+    def create(self, data, user_id):
+        """
+        Crear un nuevo producto.
+        Devuelve el documento insertado (insert_one le agrega el _id), sin releerlo.
+        """
+        product_data = self._build_document(data, user_id)
         
-        result = self.collection.insert_one(product_data)
-        return str(result.inserted_id)
+        self.collection.insert_one(product_data)
+        if self.stats:
+            self.stats.product_created(product_data["estado"], user_id=user_id,
+                                       username=product_data["username"])
+            self.stats.catalog_changed()
+        return product_data
     
-    def find_all(self, skip=0, limit=20, filters=None):
-        """Obtener todos los productos con paginación"""
-        query = filters or {}
+    def create_many(self, items, user_id, username, chunk_size=None):
+        """
+        Crear muchos productos con insert_many(ordered=False) por bloques.
+        Devuelve una lista paralela a items con (id, error) por producto.
+        """
+        chunk_size = chunk_size or Config.BULK_CHUNK_SIZE
+        now = mongo_now()
+        documents = [
+            self._build_document({**item, "username": username}, user_id, now)
+            for item in items
+        ]
+        
+        results = []
+        inserted = 0
+        for start in range(0, len(documents), chunk_size):
+            chunk = documents[start:start + chunk_size]
+            failed = {}
+            try:
+                self.collection.insert_many(chunk, ordered=False)
+            except BulkWriteError as e:
+                failed = {err["index"]: err.get("errmsg", "Error de escritura")
+                          for err in e.details.get("writeErrors", [])}
+            
+            # insert_many asigna el _id en cada documento antes de enviarlo
+            for i, document in enumerate(chunk):
+                if i in failed:
+                    results.append((None, failed[i]))
+                else:
+                    results.append((str(document["_id"]), None))
+                    inserted += 1
+        
+        if self.stats and inserted:
+            self.stats.product_created("disponible", count=inserted, user_id=user_id,
+                                       username=username)
+            self.stats.catalog_changed()
+        return results
+    
+    @classmethod
+    def listing_index(cls, filters=None, sort="newest"):
+        """
+        Claves del índice que sirve un listado: igualdad (estado, categoría,
+        talla) primero, después el campo de orden y el _id. Un rango de precio
+        con orden por fecha se filtra sobre ese mismo índice.
+        """
+        filters = filters or {}
+        field, _ = SORTS[sort]
+        direction = cls.LISTING_SORT_FIELDS[field]
+        
+        keys = [("estado", 1)]
+        keys += [(name, 1) for name in cls.LISTING_EQUALITY_FIELDS if name in filters]
+        keys += [(field, direction), ("_id", direction)]
+        return keys
+    
+    @classmethod
+    def listing_indexes(cls):
+        """Todos los índices de listado (una combinación de filtros por orden)"""
+        indexes = []
+        for sort in ("newest", "price_asc"):
+            for filters in ({}, {"categoria": 1}, {"talla": 1}, {"categoria": 1, "talla": 1}):
+                indexes.append(cls.listing_index(filters, sort))
+        return indexes
+    
+    @classmethod
+    def select_fields(cls, fields=None, view=None):
+        """
+        Campos pedidos para un listado: una lista separada por comas (fields)
+        o una vista de VIEWS. Devuelve una tupla, o None para todos los campos.
+        Lanza ValueError si alguno no existe.
+        """
+        if fields:
+            # id va siempre; se acepta en la lista pero no se proyecta
+            names = [name.strip() for name in fields.split(",")]
+            selected = tuple(dict.fromkeys(name for name in names if name and name != "id"))
+            unknown = [f for f in selected if f not in cls.FIELDS]
+            if unknown:
+                raise ValueError(f"Campos inválidos: {', '.join(unknown)}. Opciones: {', '.join(cls.FIELDS)}")
+            return selected
+        if view:
+            if view not in cls.VIEWS:
+                raise ValueError(f"Vista inválida. Opciones: {', '.join(cls.VIEWS)}")
+            return None if view == "detail" else cls.VIEWS[view]
+        return None
+    
+    def _projection(self, fields, sort=None):
+        """
+        Proyección de Mongo para fields (None: documento completo). Incluye
+        siempre el campo de orden, que hace falta para armar el cursor.
+        """
+        if fields is None:
+            return None
+        projection = {field: 1 for field in fields}
+        if sort is not None:
+            projection[SORTS[sort][0]] = 1
+        return projection
+    
+    def _listing_query(self, filters=None, search=None):
+        """Filtro de Mongo de un listado de productos disponibles"""
+        query = dict(filters or {})
         query["estado"] = "disponible"
+        if search:
+            query["$text"] = {"$search": search}
+        return query
+    
+    def _listing_hint(self, filters, search, sort):
+        """Índice a forzar en un listado (ninguno con $text: usa el de texto)"""
+        if search or sort is None:
+            return None
+        return self.listing_index(filters, sort)
+    
+    def _listing_pipeline(self, query, sort, skip, limit, projection=None):
+        """Agregación de una página y su total exacto con $facet"""
+        pipeline = [{"$match": query}]
+        if sort is None:
+            # Ordenar por relevancia (textScore) y exponer el puntaje
+            pipeline.append({"$addFields": {"score": {"$meta": "textScore"}}})
+            pipeline.append({"$sort": {"score": -1, "_id": -1}})
+        else:
+            pipeline.append({"$sort": dict(sort_spec(sort))})
         
-        products = self.collection.find(query)\
-            .sort("created_at", -1)\
-            .skip(skip)\
-            .limit(limit)
+        items = [{"$skip": skip}]
+        if limit > 0:
+            items.append({"$limit": limit})
+        if projection:
+            # Solo sobre los documentos de la página; el puntaje se conserva
+            items.append({"$project": projection if sort else {**projection, "score": 1}})
         
-        return list(products)
+        pipeline.append({"$facet": {
+            "items": items,
+            "total": [{"$count": "n"}]
+        }})
+        return pipeline
     
-    def find_by_id(self, product_id):
-        """Buscar producto por ID"""
-        try:
-            return self.collection.find_one({"_id": ObjectId(product_id)})
-        except:
+    def find_all(self, skip=0, limit=20, filters=None, cursor=None, sort="newest", fields=None):
+        """
+        Obtener todos los productos con paginación.
+        Si se pasa un cursor se ignora skip y se continúa desde esa posición.
+        fields limita los campos leídos (ver select_fields).
+        """
+        query = self._listing_query(filters)
+        hint = self._listing_hint(filters, None, sort)
+        
+        return self._paginate(query, skip, limit, cursor, sort, hint, self._projection(fields, sort))
+    
+    def list_page(self, filters=None, search=None, skip=0, limit=20, cursor=None,
+                  approximate_total=False, sort=None, fields=None):
+        """
+        Obtener una página de productos disponibles y el total que coincide.
+        La página y el total exacto salen de una sola agregación con $facet.
+        Con approximate_total (o en modo cursor) el total sale de un cache
+        que se refresca en segundo plano.
+        sort es una clave de SORTS; sin él, las búsquedas se ordenan por
+        relevancia y el resto por más nuevos. fields limita los campos leídos.
+        Devuelve (productos, total).
+        """
+        if sort is None and not search:
+            sort = "newest"
+        query = self._listing_query(filters, search)
+        hint = self._listing_hint(filters, search, sort)
+        projection = self._projection(fields, sort)
+        
+        if cursor or approximate_total:
+            if sort is None:
+                products = self._ranked(query, skip, limit, projection)
+            else:
+                products = self._paginate(query, skip, limit, cursor, sort, hint, projection)
+            return products, self._approximate_count(query)
+        
+        pipeline = self._listing_pipeline(query, sort, skip, limit, projection)
+        
+        def run(hint):
+            options = {"hint": hint} if hint else {}
+            return next(self.collection.aggregate(pipeline, **options), {})
+        
+        result = self._run_hinted(run, hint)
+        total = result["total"][0]["n"] if result.get("total") else 0
+        return result.get("items", []), total
+    
+    def query_shapes(self):
+        """
+        Formas de todas las consultas del modelo, con valores de ejemplo,
+        para verificar sus planes con explain (manage_indexes.py explain).
+        Cada forma es un dict con collection, name y filter/sort/hint o
+        pipeline; allow lista etapas aceptadas (p. ej. el SORT por textScore)
+        e index, el índice que debe elegir el planificador.
+        """
+        sample_id = ObjectId()
+        shapes = [
+            {"name": "producto por id", "filter": {"_id": sample_id}},
+            {"name": "productos de un usuario", "filter": {"user_id": "usuario"},
+             "sort": sort_spec("newest"),
+             "index": [("user_id", 1), ("created_at", -1), ("_id", -1)]},
+            {"name": "productos propios (bulk)",
+             "filter": {"_id": {"$in": [sample_id, ObjectId()]}, "user_id": "usuario"}},
+            {"name": "filtrar por categoría",
+             "filter": {"categoria": "Remeras", "estado": "disponible"},
+             "sort": [("created_at", -1)],
+             "index": self.listing_index({"categoria": "Remeras"}, "newest")},
+            {"name": "sugerencias", "filter": self._suggest_query(["cam"])[0],
+             "index": [("estado", 1), ("search_prefixes", 1)]},
+            {"name": "búsqueda de texto",
+             "filter": self._listing_query(None, "campera"),
+             "projection": {"score": {"$meta": "textScore"}},
+             "sort": [("score", {"$meta": "textScore"})],
+             # Ordenar por relevancia es siempre en memoria sobre lo que encontró el índice
+             "allow": ("SORT",),
+             "index": "busqueda_texto"},
+        ]
+        
+        # Listado: todas las combinaciones de filtros y orden, en su forma
+        # find (cursor/total aproximado) y en la agregación con $facet
+        for sort in SORTS:
+            for equality in ({}, {"categoria": "Remeras"}, {"talla": "M"},
+                             {"categoria": "Remeras", "talla": "M"}):
+                for price in (None, {"$gte": 1000, "$lte": 50000}):
+                    filters = dict(equality)
+                    if price:
+                        filters["precio"] = price
+                    query = self._listing_query(filters)
+                    hint = self._listing_hint(filters, None, sort)
+                    label = f"listado {sort} {filters}"
+                    shapes.append({"name": label, "filter": query,
+                                   "sort": sort_spec(sort), "hint": hint, "index": hint})
+                    shapes.append({"name": f"{label} $facet", "hint": hint, "index": hint,
+                                   "pipeline": self._listing_pipeline(query, sort, 0, 20)})
+            
+            # Página siguiente con cursor
+            last = {"_id": sample_id, "created_at": datetime.utcnow(), "precio": 1000.0}
+            query = {"$and": [self._listing_query(), cursor_query(encode_cursor(last, sort), sort)]}
+            hint = self._listing_hint({}, None, sort)
+            shapes.append({"name": f"listado {sort} con cursor", "filter": query,
+                           "sort": sort_spec(sort), "hint": hint, "index": hint})
+        
+        for filters in (None, {"categoria": "Remeras"}):
+            shapes.append({"name": f"facetas {filters or {}}",
+                           "pipeline": self._facets_pipeline(self._listing_query(filters))})
+        
+        for shape in shapes:
+            shape["collection"] = self.collection.name
+        return shapes
+    
+    def facets(self, filters=None, search=None):
+        """
+        Conteos por categoría, talla y rango de precio en una sola agregación.
+        La vista sin filtros (la más pedida) se cachea unos segundos por
+        versión del catálogo.
+        """
+        unfiltered = not filters and not search
+        if unfiltered:
+            key = self._facets_key(self.catalog_version())
+            cached = self._facets_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        pipeline = self._facets_pipeline(self._listing_query(filters, search))
+        data = self._facets_result(next(self.collection.aggregate(pipeline), {}))
+        if unfiltered:
+            self._facets_cache.set(key, data)
+        return data
+    
+    def _facets_key(self, version):
+        """
+        Clave de las facetas sin filtros. Lleva la versión del catálogo: una
+        escritura cambia el ETag y también deja de usar lo cacheado antes.
+        """
+        return f"all:{version[0] if version else ''}"
+    
+    def _facets_pipeline(self, query):
+        """Agregación de facetas para un filtro de listado"""
+        return [
+            {"$match": query},
+            # Solo campos del índice (estado, categoria, talla, precio, _id): consulta cubierta
+            {"$project": {"_id": 0, "categoria": 1, "talla": 1, "precio": 1}},
+            {"$facet": {
+                "categorias": [
+                    {"$group": {"_id": "$categoria", "count": {"$sum": 1}}}
+                ],
+                "tallas": [
+                    {"$group": {"_id": "$talla", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1, "_id": 1}}
+                ],
+                "precios": [
+                    {"$bucket": {
+                        "groupBy": "$precio",
+                        "boundaries": Config.PRICE_BUCKETS,
+                        "default": "otros",
+                        "output": {"count": {"$sum": 1}}
+                    }}
+                ]
+            }}
+        ]
+    
+    def _facets_result(self, result):
+        """Dar forma al resultado de la agregación de facetas"""
+        boundaries = Config.PRICE_BUCKETS
+        
+        # Todas las categorías conocidas, con 0 si no tienen productos
+        counts = {item["_id"]: item["count"] for item in result.get("categorias", [])}
+        categorias = [{"categoria": c, "count": counts.pop(c, 0)} for c in self.CATEGORIES]
+        categorias += [{"categoria": c, "count": n} for c, n in counts.items() if c]
+        
+        tallas = [
+            {"talla": item["_id"], "count": item["count"]}
+            for item in result.get("tallas", [])
+            if item["_id"]
+        ]
+        
+        bucket_counts = {item["_id"]: item["count"] for item in result.get("precios", [])}
+        precios = [
+            {"min": low, "max": high, "count": bucket_counts.get(low, 0)}
+            for low, high in zip(boundaries, boundaries[1:])
+        ]
+        precios.append({"min": boundaries[-1], "max": None, "count": bucket_counts.get("otros", 0)})
+        
+        return {
+            "categorias": categorias,
+            "tallas": tallas,
+            "precios": precios
+        }
+    
+    def _count_key(self, query):
+        """Clave del cache de conteos para un filtro"""
+        return json.dumps(query, sort_keys=True, default=str)
+    
+    def _approximate_count(self, query):
+        """Conteo cacheado para un filtro (se refresca en segundo plano)"""
+        key = self._count_key(query)
+        return self._count_cache.get(key, lambda: self.collection.count_documents(query))
+    
+    def invalidate_cached(self, product_id=None, fields=None):
+        """
+        Descartar lo cacheado que depende de un producto que cambió (lo llama
+        el bus de invalidación). Sin product_id, todos; fields son los campos
+        que cambió un update (None si no se sabe). Los conteos aproximados no
+        se tocan: ya se refrescan solos en segundo plano.
+        """
+        if product_id is None:
+            self.cache.clear()
+        else:
+            self.cache.invalidate(product_id)
+        if fields is None or fields & self.FACET_FIELDS:
+            self._facets_cache.clear()
+        if fields is None or fields & self.SUGGEST_FIELDS:
+            self._suggest_cache.clear()
+    
+    def catalog_version(self):
+        """(versión, fecha) del catálogo para los ETag; None si no hay Stats"""
+        if self.stats is None:
             return None
+        return self.stats.catalog_version()
+    
+    def find_by_id(self, product_id):
+        """Buscar producto por ID (con cache de lectura)"""
+        key = str(product_id)
+        product = self.cache.get(key)
+        if product is None:
+            try:
+                product = self.collection.find_one({"_id": ObjectId(product_id)})
+            except:
+                return None
+            if product is None:
+                return None
+            self.cache.set(key, product)
+        
+        # Copia profunda: imagen_variants y las listas no se comparten con el cache
+        return copy.deepcopy(product)
     
-    def find_by_user(self, user_id, skip=0, limit=20):
+    def find_by_user(self, user_id, skip=0, limit=20, cursor=None, fields=None):
         """Obtener productos de un usuario específico"""
-        products = self.collection.find({"user_id": user_id})\
-            .sort("created_at", -1)\
+        return self._paginate({"user_id": user_id}, skip, limit, cursor,
+                              projection=self._projection(fields, "newest"))
+    
+    def _paginate(self, query, skip, limit, cursor, sort="newest", hint=None, projection=None):
+        """Ejecutar un listado ordenado por (campo de orden, _id)"""
+        if cursor:
+            query = {"$and": [query, cursor_query(cursor, sort)]}
+            skip = 0
+        
+        def run(hint):
+            products = self.collection.find(query, projection).sort(sort_spec(sort))
+            if hint:
+                products = products.hint(hint)
+            return list(products.skip(skip).limit(limit))
+        
+        return self._run_hinted(run, hint)
+    
+    def _run_hinted(self, run, hint):
+        """
+        Ejecutar run(hint). Si el índice del hint no existe (base sin
+        manage_indexes.py sync) se repite sin hint: más lento, pero responde.
+        """
+        try:
+            return run(hint)
+        except OperationFailure as e:
+            if hint is None or not missing_hint(e):
+                raise
+            self._warn_missing_hint(hint)
+            return run(None)
+    
+    def _warn_missing_hint(self, hint):
+        if not self._missing_hint_warned:
+            self._missing_hint_warned = True
+            print(f"⚠️ Falta el índice {hint}: ejecutar python manage_indexes.py sync")
+    
+    def search(self, query_text, skip=0, limit=20, filters=None, fields=None):
+        """Buscar productos por texto, ordenados por relevancia"""
+        query = dict(filters or {})
+        query.update({"$text": {"$search": query_text}, "estado": "disponible"})
+        return self._ranked(query, skip, limit, self._projection(fields))
+    
+    def _ranked(self, query, skip, limit, projection=None):
+        """Ejecutar una búsqueda $text ordenada por textScore"""
+        score = {**(projection or {}), "score": {"$meta": "textScore"}}
+        products = self.collection.find(query, score)\
+            .sort([("score", {"$meta": "textScore"})])\
             .skip(skip)\
             .limit(limit)
         
         return list(products)
     
-    def search(self, query_text, skip=0, limit=20):
-        """Buscar productos por texto"""
-        products = self.collection.find(
-            {"$text": {"$search": query_text}, "estado": "disponible"}
-        ).skip(skip).limit(limit)
+    def suggest(self, prefix, limit=8):
+        """
+        Sugerencias de nombres para lo que el usuario va escribiendo.
+        Usa el índice (estado, search_prefixes), sin tildes ni mayúsculas.
+        """
+        prefixes = query_prefixes(prefix)
+        if not prefixes:
+            return []
         
-        return list(products)
+        key = self._suggest_key(prefixes, limit, self.catalog_version())
+        cached = self._suggest_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        query, projection = self._suggest_query(prefixes)
+        cursor = self.collection.find(query, projection).limit(limit * 3)
+        
+        suggestions = self._collect_suggestions(cursor, limit)
+        self._suggest_cache.set(key, suggestions)
+        return suggestions
+    
+    def _suggest_key(self, prefixes, limit, version):
+        # Con la versión del catálogo, como las facetas
+        return f"{version[0] if version else ''}:{limit}:{' '.join(prefixes)}"
+    
+    def _suggest_query(self, prefixes):
+        """Filtro y proyección de las sugerencias (se piden limit * 3 para deduplicar)"""
+        return (
+            {"estado": "disponible", "search_prefixes": {"$all": prefixes}},
+            {"nombre": 1, "categoria": 1}
+        )
+    
+    def _collect_suggestions(self, products, limit):
+        """Sugerencias sin nombres repetidos a partir de los productos encontrados"""
+        suggestions = []
+        seen = set()
+        for product in products:
+            name = fold(product.get("nombre"))
+            if name in seen:
+                continue
+            seen.add(name)
+            suggestions.append({
+                "id": str(product["_id"]),
+                "nombre": product.get("nombre"),
+                "categoria": product.get("categoria")
+            })
+            if len(suggestions) >= limit:
+                break
+        return suggestions
     
-    def filter_by_category(self, categoria, skip=0, limit=20):
+    def backfill_search_prefixes(self, batch_size=1000):
+        """Calcular search_prefixes en productos creados antes del autocompletado"""
+        updated = 0
+        operations = []
+        for product in self.collection.find({"search_prefixes": {"$exists": False}}, {"nombre": 1}):
+            operations.append(UpdateOne(
+                {"_id": product["_id"]},
+                {"$set": {"search_prefixes": search_prefixes(product.get("nombre"))}}
+            ))
+            if len(operations) >= batch_size:
+                updated += self.collection.bulk_write(operations, ordered=False).modified_count
+                operations = []
+        if operations:
+            updated += self.collection.bulk_write(operations, ordered=False).modified_count
+        return updated
+    
+    def filter_by_category(self, categoria, skip=0, limit=20, fields=None):
         """Filtrar productos por categoría"""
         products = self.collection.find(
-            {"categoria": categoria, "estado": "disponible"}
+            {"categoria": categoria, "estado": "disponible"},
+            self._projection(fields, "newest")
         ).sort("created_at", -1).skip(skip).limit(limit)
         
         return list(products)
     
-    def update(self, product_id, data, user_id):
-        """Actualizar un producto (solo el dueño)"""
-        update_data = {"updated_at": datetime.utcnow()}
+    def _owned_filter(self, product_id, user_id, is_admin=False):
+        """Filtro de un producto del usuario (de cualquiera si es admin); None si el ID es inválido"""
+        try:
+            query = {"_id": ObjectId(product_id)}
+        except Exception:
+            return None
+        if not is_admin:
+            query["user_id"] = user_id
+        return query
+    
+    def update(self, product_id, data, user_id, is_admin=False):
+        """
+        Actualizar un producto del usuario (o cualquiera si es admin) en un solo
+        find_one_and_update: el dueño es parte del filtro.
+        Devuelve (anterior, actualizado), o (None, None) si no existe o no es
+        suyo. El actualizado se arma a partir del anterior, que hace falta para
+        limpiar la imagen reemplazada.
+        """
+        query = self._owned_filter(product_id, user_id, is_admin)
+        if query is None:
+            return None, None
+        
+        update_data = {"updated_at": mongo_now()}
         
         allowed_fields = ["nombre", "descripcion", "precio", "talla", "categoria", "imagen_url"]
         for field in allowed_fields:
@@ -92,48 +605,206 @@ class Product:
                 else:
                     update_data[field] = data[field]
         
-        result = self.collection.update_one(
-            {"_id": ObjectId(product_id), "user_id": user_id},
-            {"$set": update_data}
+        if "nombre" in update_data:
+            update_data["search_prefixes"] = search_prefixes(update_data["nombre"])
+        
+        update = {"$set": update_data}
+        if "imagen_url" in update_data:
+            # Las variantes de la imagen anterior ya no aplican
+            update["$unset"] = {"imagen_variants": ""}
+        
+        previous = self.collection.find_one_and_update(
+            query, update, return_document=ReturnDocument.BEFORE
         )
-        return result.modified_count > 0
-    
-    def delete(self, product_id, user_id):
-        """Eliminar un producto (solo el dueño)"""
-        result = self.collection.delete_one({
-            "_id": ObjectId(product_id),
-            "user_id": user_id
-        })
-        return result.deleted_count > 0
-    
-    def change_status(self, product_id, status, user_id):
-        """Cambiar estado del producto"""
+        self.cache.invalidate(str(product_id))
+        if previous is None:
+            return None, None
+        
+        if self.stats:
+            self.stats.catalog_changed()
+        product = {**previous, **update_data}
+        if "imagen_url" in update_data:
+            product.pop("imagen_variants", None)
+        return previous, product
+    
+    def set_image_variants(self, product_id, imagen_url, variants):
+        """
+        Registrar las variantes generadas si la imagen sigue siendo la misma.
+        Cambian la representación del producto, así que también su updated_at.
+        """
         result = self.collection.update_one(
-            {"_id": ObjectId(product_id), "user_id": user_id},
-            {"$set": {"estado": status, "updated_at": datetime.utcnow()}}
+            {"_id": ObjectId(product_id), "imagen_url": imagen_url},
+            {"$set": {"imagen_variants": variants, "updated_at": mongo_now()}}
         )
-        return result.modified_count > 0
+        self.cache.invalidate(str(product_id))
+        if result.matched_count == 0:
+            return False
+        
+        if self.stats:
+            self.stats.catalog_changed()
+        return True
+    
+    def delete(self, product_id, user_id, is_admin=False):
+        """
+        Eliminar un producto del usuario (o cualquiera si es admin).
+        Devuelve lo necesario para limpiar sus imágenes, o None si no existe o no es suyo.
+        """
+        query = self._owned_filter(product_id, user_id, is_admin)
+        if query is None:
+            return None
+        deleted = self.collection.find_one_and_delete(
+            query,
+            projection={"estado": 1, "user_id": 1, "created_at": 1,
+                        "imagen_url": 1, "imagen_variants": 1}
+        )
+        self.cache.invalidate(str(product_id))
+        if deleted is None:
+            return None
+        
+        if self.stats:
+            self.stats.product_deleted(deleted.get("estado", "disponible"),
+                                       user_id=deleted.get("user_id"),
+                                       created_at=deleted.get("created_at"))
+            self.stats.catalog_changed()
+        return deleted
+    
+    def change_status(self, product_id, status, user_id, is_admin=False):
+        """Cambiar estado de un producto del usuario (o cualquiera si es admin)"""
+        query = self._owned_filter(product_id, user_id, is_admin)
+        if query is None:
+            return False
+        previous = self.collection.find_one_and_update(
+            query,
+            {"$set": {"estado": status, "updated_at": mongo_now()}},
+            projection={"estado": 1, "user_id": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        self.cache.invalidate(str(product_id))
+        if previous is None:
+            return False
+        
+        if self.stats:
+            self.stats.product_status_changed(previous.get("estado", "disponible"), status,
+                                              user_id=previous.get("user_id"))
+            self.stats.catalog_changed()
+        return True
+    
+    def _find_owned(self, product_ids, user_id, is_admin, projection):
+        """
+        Resolver en una sola consulta cuáles IDs existen y pertenecen al usuario.
+        Devuelve (documentos, ids_no_encontrados).
+        """
+        object_ids = []
+        not_found = []
+        for product_id in product_ids:
+            try:
+                object_ids.append(ObjectId(product_id))
+            except Exception:
+                not_found.append(str(product_id))
+        
+        query = {"_id": {"$in": object_ids}}
+        if not is_admin:
+            query["user_id"] = user_id
+        
+        documents = list(self.collection.find(query, projection)) if object_ids else []
+        found = {document["_id"] for document in documents}
+        not_found.extend(str(oid) for oid in object_ids if oid not in found)
+        return documents, not_found
+    
+    def bulk_change_status(self, product_ids, status, user_id, is_admin=False):
+        """
+        Cambiar el estado de varios productos con un solo update_many.
+        Devuelve (ids_actualizados, ids_no_encontrados).
+        """
+        documents, not_found = self._find_owned(product_ids, user_id, is_admin,
+                                                {"estado": 1, "user_id": 1})
+        if not documents:
+            return [], not_found
+        
+        object_ids = [document["_id"] for document in documents]
+        self.collection.update_many(
+            {"_id": {"$in": object_ids}},
+            {"$set": {"estado": status, "updated_at": mongo_now()}}
+        )
+        
+        # Conteo por (vendedor, estado anterior): un admin puede tocar varios vendedores
+        previous = {}
+        for document in documents:
+            self.cache.invalidate(str(document["_id"]))
+            key = (document.get("user_id"), document.get("estado", "disponible"))
+            previous[key] = previous.get(key, 0) + 1
+        
+        if self.stats:
+            for (owner_id, estado), count in previous.items():
+                self.stats.product_status_changed(estado, status, count, user_id=owner_id)
+            self.stats.catalog_changed()
+        
+        return [str(oid) for oid in object_ids], not_found
+    
+    def bulk_delete(self, product_ids, user_id, is_admin=False):
+        """
+        Eliminar varios productos con un solo delete_many.
+        Devuelve (documentos_eliminados, ids_no_encontrados); los documentos
+        traen imagen_url e imagen_variants para limpiar los archivos.
+        """
+        documents, not_found = self._find_owned(
+            product_ids, user_id, is_admin,
+            {"estado": 1, "user_id": 1, "created_at": 1, "imagen_url": 1, "imagen_variants": 1}
+        )
+        if not documents:
+            return [], not_found
+        
+        self.collection.delete_many({"_id": {"$in": [document["_id"] for document in documents]}})
+        
+        # Conteo por (vendedor, estado, día de alta): un admin puede tocar varios vendedores
+        deleted = {}
+        for document in documents:
+            self.cache.invalidate(str(document["_id"]))
+            created_at = document.get("created_at")
+            key = (document.get("user_id"), document.get("estado", "disponible"),
+                   created_at.date() if isinstance(created_at, datetime) else None)
+            deleted[key] = deleted.get(key, 0) + 1
+        
+        if self.stats:
+            for (owner_id, estado, day), count in deleted.items():
+                self.stats.product_deleted(estado, count, user_id=owner_id, created_at=day)
+            self.stats.catalog_changed()
+        
+        return documents, not_found
     
     def count(self, filters=None):
         """Contar productos"""
         query = filters or {}
         return self.collection.count_documents(query)
     
-    def to_dict(self, product):
-        """Convertir producto a diccionario"""
+    def to_dict(self, product, fields=None):
+        """
+        Convertir producto a diccionario (ObjectId y fechas los serializa el
+        proveedor JSON). Con fields solo se incluyen id y esos campos.
+        """
         if not product:
             return None
         
-        return {
-            "id": str(product["_id"]),
+        data = {
+            "id": product["_id"],
             "nombre": product.get("nombre"),
             "descripcion": product.get("descripcion", ""),
             "precio": product.get("precio", 0),
             "talla": product.get("talla", ""),
             "categoria": product.get("categoria"),
             "imagen_url": product.get("imagen_url", ""),
+            "imagen_variants": product.get("imagen_variants", {}),
             "user_id": product.get("user_id"),
             "username": product.get("username", ""),
             "estado": product.get("estado", "disponible"),
-            "created_at": product.get("created_at").isoformat() if product.get("created_at") else None
-        }
\ No newline at end of file
+            "created_at": product.get("created_at")
+        }
+        
+        if fields is not None:
+            data = {"id": data["id"], **{field: data[field] for field in fields}}
+        
+        # Relevancia cuando el producto viene de una búsqueda
+        if "score" in product:
+            data["score"] = round(product["score"], 3)
+        
+        return data
\ No newline at end of file
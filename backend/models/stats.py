@@ -0,0 +1,300 @@
+from datetime import date, datetime, timedelta
+from pymongo import UpdateOne
+from config import Config
+from utils.cache import LRUCache
+from utils.db import mongo_now
+
+
+class Stats:
+    """
+    Contadores agregados para el dashboard.
+    Un documento 'global' con totales, uno por día con las altas y uno por
+    vendedor con sus productos, todos actualizados con $inc desde los
+    modelos. El documento 'catalog'
+    lleva la versión del catálogo, que sube con cada escritura de productos
+    y alimenta los ETag de los listados.
+    """
+    
+    GLOBAL_ID = "global"
+    CATALOG_ID = "catalog"
+    DAILY_PREFIX = "daily:"
+    SELLER_PREFIX = "seller:"
+    # Versión del esquema del documento global; uno anterior se reconstruye
+    # (2: contadores por vendedor)
+    SCHEMA_VERSION = 2
+    
+    # Conteo por estado: el $sort inicial hace que se resuelva recorriendo un
+    # índice que empieza por estado (consulta cubierta), no la colección
+    ESTADO_PIPELINE = [
+        {"$sort": {"estado": 1}},
+        {"$project": {"_id": 0, "estado": 1}},
+        {"$group": {"_id": "$estado", "count": {"$sum": 1}}}
+    ]
+    
+    # Altas por día (usa el índice de created_at de cada colección)
+    DAILY_PIPELINE = [
+        {"$match": {"created_at": {"$type": "date"}}},
+        {"$group": {
+            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+            "count": {"$sum": 1}
+        }}
+    ]
+    
+    # Productos por vendedor. Recorre la colección: solo lo usa rebuild()
+    SELLERS_PIPELINE = [
+        {"$group": {
+            "_id": "$user_id",
+            "username": {"$first": "$username"},
+            "total_products": {"$sum": 1},
+            "available": {
+                "$sum": {"$cond": [{"$eq": ["$estado", "disponible"]}, 1, 0]}
+            }
+        }}
+    ]
+    
+    # Top sellers desde los documentos por vendedor (índice de total_products)
+    TOP_SELLERS_FILTER = {"total_products": {"$gt": 0}}
+    TOP_SELLERS_SORT = [("total_products", -1)]
+    
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.stats
+        self._catalog_cache = LRUCache(1, Config.CATALOG_VERSION_TTL)
+    
+    def _day_id(self, when=None):
+        """ID del documento diario (ordenable como texto)"""
+        when = when or datetime.utcnow()
+        return f"{self.DAILY_PREFIX}{when.strftime('%Y-%m-%d')}"
+    
+    def _inc_global(self, increments):
+        # Con upsert no se pierde ningún incremento; mientras el documento no
+        # tenga el schema actual, _totals() lo reconstruye completo igual
+        self.collection.update_one({"_id": self.GLOBAL_ID}, {"$inc": increments}, upsert=True)
+    
+    def _inc_daily(self, increments, when=None):
+        self.collection.update_one(
+            {"_id": self._day_id(when)},
+            {"$inc": increments},
+            upsert=True
+        )
+    
+    def _inc_seller(self, user_id, increments, username=None):
+        if user_id is None or not any(increments.values()):
+            return
+        update = {"$inc": increments, "$setOnInsert": {"user_id": user_id}}
+        if username is not None:
+            update["$set"] = {"username": username}
+        self.collection.update_one({"_id": f"{self.SELLER_PREFIX}{user_id}"}, update, upsert=True)
+    
+    def user_created(self, active=True):
+        """Registrar el alta de un usuario"""
+        increments = {"users.total": 1}
+        if active:
+            increments["users.active"] = 1
+        self._inc_global(increments)
+        self._inc_daily({"users_new": 1})
+    
+    def product_created(self, estado="disponible", count=1, user_id=None, username=None):
+        """Registrar el alta de uno o más productos (de un vendedor, si se indica)"""
+        if count <= 0:
+            return
+        self._inc_global({"products.total": count, f"products.by_estado.{estado}": count})
+        self._inc_daily({"products_new": count})
+        self._inc_seller(user_id, {
+            "total_products": count,
+            "available": count if estado == "disponible" else 0
+        }, username)
+    
+    def product_deleted(self, estado, count=1, user_id=None, created_at=None):
+        """
+        Registrar la baja de uno o más productos (de un vendedor, si se
+        indica). Con created_at (fecha o día de alta) también se descuentan de
+        las altas de ese día, como si nunca hubieran existido (igual que rebuild).
+        """
+        if count <= 0:
+            return
+        self._inc_global({"products.total": -count, f"products.by_estado.{estado}": -count})
+        if isinstance(created_at, date):
+            self._inc_daily({"products_new": -count}, created_at)
+        self._inc_seller(user_id, {
+            "total_products": -count,
+            "available": -count if estado == "disponible" else 0
+        })
+    
+    def product_status_changed(self, old_status, new_status, count=1, user_id=None):
+        """Registrar un cambio de estado de uno o más productos (de un vendedor, si se indica)"""
+        if old_status == new_status or count <= 0:
+            return
+        self._inc_global({
+            f"products.by_estado.{old_status}": -count,
+            f"products.by_estado.{new_status}": count
+        })
+        available = (new_status == "disponible") - (old_status == "disponible")
+        self._inc_seller(user_id, {"available": available * count})
+    
+    def catalog_changed(self):
+        """Registrar un cambio en el catálogo (nueva versión para los ETag)"""
+        self.collection.update_one(
+            {"_id": self.CATALOG_ID},
+            {"$inc": {"version": 1}, "$currentDate": {"updated_at": True}},
+            upsert=True
+        )
+        self._catalog_cache.invalidate(self.CATALOG_ID)
+    
+    def _catalog_value(self, document):
+        document = document or {}
+        return document.get("version", 0), document.get("updated_at")
+    
+    def catalog_version(self):
+        """
+        (versión, fecha del último cambio) del catálogo. Se reusa durante
+        CATALOG_VERSION_TTL segundos: los cambios hechos en otro worker se ven
+        con ese retraso como máximo.
+        """
+        version = self._catalog_cache.get(self.CATALOG_ID)
+        if version is None:
+            version = self._catalog_value(self.collection.find_one({"_id": self.CATALOG_ID}))
+            self._catalog_cache.set(self.CATALOG_ID, version)
+        return version
+    
+    def invalidate_cached(self, document_id=None, fields=None):
+        """Descartar la versión del catálogo cacheada si cambió (bus de invalidación)"""
+        if document_id in (None, self.CATALOG_ID):
+            self._catalog_cache.invalidate(self.CATALOG_ID)
+    
+    def _totals(self):
+        """
+        Documento global. Se reconstruye todo si falta, si solo lo crearon los
+        $inc (sin reconstruir nunca) o si es de un esquema anterior.
+        """
+        totals = self.collection.find_one({"_id": self.GLOBAL_ID})
+        if totals is None or totals.get("schema") != self.SCHEMA_VERSION:
+            totals = self.rebuild()
+        return totals
+    
+    def overview(self, days=30):
+        """Totales y altas de los últimos días sin recorrer las colecciones"""
+        totals = self._totals()
+        
+        today = datetime.utcnow()
+        start = self._day_id(today - timedelta(days=days - 1))
+        daily = self.collection.find(
+            {"_id": {"$gte": start, "$lte": self._day_id(today)}},
+            {"users_new": 1, "products_new": 1}
+        )
+        
+        new_users = 0
+        new_products = 0
+        for bucket in daily:
+            new_users += bucket.get("users_new", 0)
+            new_products += bucket.get("products_new", 0)
+        
+        users = totals.get("users", {})
+        products = totals.get("products", {})
+        by_estado = products.get("by_estado", {})
+        
+        return {
+            'users': {
+                'total': users.get("total", 0),
+                'active': users.get("active", 0),
+                'new_last_30_days': new_users
+            },
+            'products': {
+                'total': products.get("total", 0),
+                'available': by_estado.get("disponible", 0),
+                'sold': by_estado.get("vendido", 0),
+                'new_last_30_days': new_products
+            }
+        }
+    
+    def top_sellers(self, limit=10):
+        """Vendedores con más productos, desde los documentos por vendedor"""
+        self._totals()
+        return list(self.collection.find(
+            self.TOP_SELLERS_FILTER,
+            {"_id": 0, "user_id": 1, "username": 1, "total_products": 1, "available": 1}
+        ).sort(self.TOP_SELLERS_SORT).limit(limit))
+    
+    def query_shapes(self):
+        """Formas de las consultas de top_sellers() y rebuild() para verificar sus planes"""
+        count_all = [{"$match": {}}, {"$group": {"_id": 1, "n": {"$sum": 1}}}]
+        count_active = [{"$match": {"active": True}}, {"$group": {"_id": 1, "n": {"$sum": 1}}}]
+        return [
+            {"collection": "stats", "name": "stats: top sellers",
+             "filter": self.TOP_SELLERS_FILTER, "sort": self.TOP_SELLERS_SORT, "limit": 10,
+             "index": [("total_products", -1)]},
+            {"collection": "products", "name": "stats: productos por estado",
+             "pipeline": self.ESTADO_PIPELINE},
+            {"collection": "users", "name": "stats: total de usuarios",
+             "pipeline": count_all, "hint": "_id_"},
+            {"collection": "users", "name": "stats: usuarios activos", "pipeline": count_active,
+             "index": [("active", 1)]},
+            {"collection": "users", "name": "stats: altas diarias de usuarios",
+             "pipeline": self.DAILY_PIPELINE, "index": [("created_at", -1)]},
+            {"collection": "products", "name": "stats: altas diarias de productos",
+             "pipeline": self.DAILY_PIPELINE, "index": [("created_at", -1)]},
+            # Necesita todos los productos: solo corre al reconstruir
+            {"collection": "products", "name": "stats: productos por vendedor",
+             "pipeline": self.SELLERS_PIPELINE, "allow": ("COLLSCAN",)},
+        ]
+    
+    def _replace_rollup(self, prefix, documents, rebuilt_at):
+        """
+        Reemplazar los documentos de un prefijo sin borrarlos antes: upsert
+        por clave marcado con rebuilt_at y después baja de los que quedaron
+        de una reconstrucción anterior. Así no se pierden los $inc que llegan
+        mientras tanto (los documentos que crean no tienen marca) y dos
+        reconstrucciones a la vez no chocan por _id duplicado.
+        """
+        operations = [
+            UpdateOne({"_id": document_id}, {"$set": {**fields, "rebuilt_at": rebuilt_at}}, upsert=True)
+            for document_id, fields in documents.items()
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+        self.collection.delete_many({
+            "_id": {"$regex": f"^{prefix}"},
+            "rebuilt_at": {"$lt": rebuilt_at}
+        })
+    
+    def rebuild(self):
+        """Recalcular todos los contadores a partir de las colecciones"""
+        groups = list(self.db.products.aggregate(self.ESTADO_PIPELINE))
+        by_estado = {item["_id"]: item["count"] for item in groups if item["_id"]}
+        
+        totals = {
+            "_id": self.GLOBAL_ID,
+            "users": {
+                "total": self.db.users.count_documents({}, hint="_id_"),
+                "active": self.db.users.count_documents({"active": True})
+            },
+            "products": {
+                "total": sum(item["count"] for item in groups),
+                "by_estado": by_estado
+            },
+            "schema": self.SCHEMA_VERSION,
+            "rebuilt_at": mongo_now()
+        }
+        self.collection.replace_one({"_id": self.GLOBAL_ID}, totals, upsert=True)
+        
+        # Altas por día
+        buckets = {}
+        for collection, field in ((self.db.users, "users_new"), (self.db.products, "products_new")):
+            for item in collection.aggregate(self.DAILY_PIPELINE):
+                day_id = f"{self.DAILY_PREFIX}{item['_id']}"
+                buckets.setdefault(day_id, {"users_new": 0, "products_new": 0})[field] = item["count"]
+        self._replace_rollup(self.DAILY_PREFIX, buckets, totals["rebuilt_at"])
+        
+        # Productos por vendedor
+        sellers = {
+            f"{self.SELLER_PREFIX}{item['_id']}": {
+                "user_id": item["_id"],
+                "username": item["username"],
+                "total_products": item["total_products"],
+                "available": item["available"]
+            }
+            for item in self.db.products.aggregate(self.SELLERS_PIPELINE) if item["_id"]
+        }
+        self._replace_rollup(self.SELLER_PREFIX, sellers, totals["rebuilt_at"])
+        
+        return totals
@@ -1,21 +1,26 @@
-from datetime import datetime
+import copy
 from bson import ObjectId
-import bcrypt
+from pymongo import ReturnDocument
+from config import Config
+from utils.cache import LRUCache
+from utils.db import mongo_now
+from utils.password_hasher import password_hasher, HasherBusyError
 
 class User:
     """Modelo de Usuario para MongoDB"""
     
-    def __init__(self, db):
+    def __init__(self, db, stats=None):
         self.collection = db.users
-        self._create_indexes()
-    
-    def _create_indexes(self):
-        """Crear índices para búsquedas eficientes"""
-        self.collection.create_index("email", unique=True)
-        self.collection.create_index("username", unique=True)
+        self.stats = stats
+        self.hasher = password_hasher
+        self.cache = LRUCache(Config.USER_CACHE_SIZE, Config.USER_CACHE_TTL)
     
     def create(self, data):
-        """Crear un nuevo usuario"""
+        """
+        Crear un nuevo usuario.
+        Devuelve el documento insertado (insert_one le agrega el _id), sin releerlo.
+        """
+        now = mongo_now()
         user_data = {
             "username": data.get("username"),
             "email": data.get("email"),
@@ -24,13 +29,15 @@ class User:
             "telefono": data.get("telefono", ""),
             "direccion": data.get("direccion", ""),
             "role": data.get("role", "usuario"),  # usuario o admin
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
+            "created_at": now,
+            "updated_at": now,
             "active": True
         }
         
-        result = self.collection.insert_one(user_data)
-        return str(result.inserted_id)
+        self.collection.insert_one(user_data)
+        if self.stats:
+            self.stats.user_created(user_data["active"])
+        return user_data
     
     def find_by_email(self, email):
         """Buscar usuario por email"""
@@ -41,16 +48,28 @@ class User:
         return self.collection.find_one({"username": username})
     
     def find_by_id(self, user_id):
-        """Buscar usuario por ID"""
-        try:
-            return self.collection.find_one({"_id": ObjectId(user_id)})
-        except:
-            return None
+        """Buscar usuario por ID (con cache de lectura)"""
+        key = str(user_id)
+        user = self.cache.get(key)
+        if user is None:
+            try:
+                user = self.collection.find_one({"_id": ObjectId(user_id)})
+            except:
+                return None
+            if user is None:
+                return None
+            self.cache.set(key, user)
+        
+        # Copia profunda para que quien llama no modifique la entrada cacheada
+        return copy.deepcopy(user)
     
     def update(self, user_id, data):
-        """Actualizar datos del usuario"""
+        """
+        Actualizar datos del usuario.
+        Devuelve el documento actualizado (find_one_and_update) o None si no existe.
+        """
         update_data = {
-            "updated_at": datetime.utcnow()
+            "updated_at": mongo_now()
         }
         
         # Campos que se pueden actualizar
@@ -59,11 +78,13 @@ class User:
             if field in data:
                 update_data[field] = data[field]
         
-        result = self.collection.update_one(
+        user = self.collection.find_one_and_update(
             {"_id": ObjectId(user_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
-        return result.modified_count > 0
+        self.cache.invalidate(str(user_id))
+        return user
     
     def verify_password(self, email, password):
         """Verificar contraseña de usuario"""
@@ -71,26 +92,67 @@ class User:
         if not user:
             return None
         
-        if bcrypt.checkpw(password.encode('utf-8'), user['password']):
-            return user
-        return None
+        if not self.hasher.check(password, user['password']):
+            return None
+        
+        # Si cambió el costo configurado, actualizar el hash de forma transparente
+        if self.hasher.needs_rehash(user['password']):
+            try:
+                new_hash = self._hash_password(password)
+                self.collection.update_one({"_id": user["_id"]}, {"$set": {"password": new_hash}})
+                self.cache.invalidate(str(user["_id"]))
+                user['password'] = new_hash
+            except HasherBusyError:
+                pass  # Se reintentará en el próximo login
+        
+        return user
     
     def _hash_password(self, password):
-        """Hashear contraseña con bcrypt"""
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        """Hashear contraseña con bcrypt (en el pool dedicado)"""
+        return self.hasher.hash(password)
     
     def to_dict(self, user):
-        """Convertir usuario a diccionario sin datos sensibles"""
+        """Convertir usuario a diccionario sin datos sensibles (ObjectId y fechas los serializa el proveedor JSON)"""
         if not user:
             return None
         
         return {
-            "id": str(user["_id"]),
+            "id": user["_id"],
             "username": user.get("username"),
             "email": user.get("email"),
             "nombre": user.get("nombre"),
             "telefono": user.get("telefono", ""),
             "direccion": user.get("direccion", ""),
             "role": user.get("role", "usuario"),
-            "created_at": user.get("created_at").isoformat() if user.get("created_at") else None
-        }
\ No newline at end of file
+            "created_at": user.get("created_at")
+        }
+    
+    def query_shapes(self):
+        """Formas de las consultas del modelo para verificar sus planes (ver Product)"""
+        return [
+            {"collection": self.collection.name, "name": "usuario por email",
+             "filter": {"email": "usuario@tradeco.com"}, "index": [("email", 1)]},
+            {"collection": self.collection.name, "name": "usuario por username",
+             "filter": {"username": "usuario"}, "index": [("username", 1)]},
+            {"collection": self.collection.name, "name": "usuario por id",
+             "filter": {"_id": ObjectId()}},
+        ]
+    
+    def invalidate_cached(self, user_id=None, fields=None):
+        """Descartar un usuario del cache (o todos); lo llama el bus de invalidación"""
+        if user_id is None:
+            self.cache.clear()
+        else:
+            self.cache.invalidate(user_id)
+    
+    def public_dict(self, user):
+        """Información pública de un usuario (perfil visible para otros)"""
+        if not user:
+            return None
+        
+        return {
+            "id": str(user["_id"]),
+            "username": user.get("username"),
+            "nombre": user.get("nombre"),
+            "created_at": user.get("created_at")
+        }
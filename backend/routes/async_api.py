@@ -0,0 +1,232 @@
+import json
+import time
+from starlette.responses import Response
+from starlette.routing import Route
+from werkzeug.http import parse_accept_header
+from config import Config
+from models.product import Product
+from routes.products import listing_filters, listing_params, listing_payload
+from utils.compression import choose_encoding, compress_body
+from utils.http_cache import (catalog_validators, document_validators, static_validators,
+                              catalog_policy, static_policy, fresh_etag, validator_headers)
+from utils.json_provider import _default, orjson
+from utils.metrics import flask_route, observe_request
+
+
+def _dumps(data):
+    """Serializar igual que el proveedor JSON de Flask"""
+    if Config.JSON_PROVIDER == 'orjson' and orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=_default, ensure_ascii=False).encode('utf-8')
+
+
+def api_response(request, data, status=200, validators=None, policy=None):
+    """
+    Respuesta JSON con las mismas cabeceras que la app Flask: CORS abierto
+    para /api/* y compresión br/gzip por encima de COMPRESS_MIN_SIZE.
+    Con validators agrega ETag/Last-Modified y el Cache-Control de policy.
+    """
+    body = _dumps(data)
+    headers = {
+        'Access-Control-Allow-Origin': '*',
+        'Vary': 'Accept-Encoding',
+        **validator_headers(validators, policy)
+    }
+    
+    if len(body) >= Config.COMPRESS_MIN_SIZE:
+        accepted = parse_accept_header(request.headers.get('accept-encoding'))
+        encoding = choose_encoding(accepted)
+        if encoding is not None:
+            body = compress_body(body, encoding)
+            headers['Content-Encoding'] = encoding
+            # Mismo ETag por codificación que compress_response
+            if validators is not None:
+                headers['ETag'] = f'W/"{validators[0]}-{encoding}"'
+    
+    return Response(body, status_code=status, headers=headers, media_type='application/json')
+
+
+def not_modified(request, validators, policy):
+    """304 si el cliente ya tiene esta versión; None si no"""
+    etag = fresh_etag(request.headers, validators)
+    if etag is None:
+        return None
+    return Response(status_code=304, headers={
+        'Access-Control-Allow-Origin': '*',
+        'Vary': 'Accept-Encoding',
+        **validator_headers(validators, policy, etag)
+    })
+
+
+def _error(request, message, status):
+    return api_response(request, {'success': False, 'message': message}, status)
+
+
+def _timed_route(blueprint, path, endpoint):
+    """Route que registra la latencia con las mismas etiquetas que en Flask"""
+    route = flask_route(path)
+    
+    async def timed(request):
+        started = time.perf_counter()
+        response = await endpoint(request)
+        observe_request(blueprint, route, request.method, response.status_code,
+                        time.perf_counter() - started)
+        return response
+    
+    return Route(path, timed)
+
+
+def init_routes(product_model, user_model, fallback):
+    """
+    Rutas de lectura servidas de forma nativa en modo ASGI.
+    product_model y user_model son AsyncProduct y AsyncUser; todo lo que no
+    está aquí (escrituras, auth, dashboard, archivos) lo atiende la app Flask
+    a través de fallback.
+    """
+    
+    async def health_check(request):
+        """Verificar que la API está funcionando"""
+        return api_response(request, {
+            'success': True,
+            'message': 'API TRADEco funcionando correctamente',
+            'version': '1.0.0'
+        })
+    
+    async def get_products(request):
+        """Obtener todos los productos con paginación y filtros"""
+        try:
+            params = listing_params(request.query_params)
+            
+            validators = catalog_validators(await product_model.catalog_version(),
+                                            request.query_params.multi_items())
+            cached = not_modified(request, validators, catalog_policy())
+            if cached is not None:
+                return cached
+            
+            products, total = await product_model.list_page(
+                params['filters'],
+                search=params['search'],
+                skip=params['skip'],
+                limit=params['limit'],
+                cursor=params['cursor'],
+                approximate_total=params['approximate'],
+                sort=params['sort'],
+                fields=params['fields']
+            )
+            
+            return api_response(request, listing_payload(product_model, products, total, params),
+                                validators=validators, policy=catalog_policy())
+        
+        except ValueError as e:
+            return _error(request, str(e), 400)
+        except Exception as e:
+            return _error(request, f'Error al obtener productos: {str(e)}', 500)
+    
+    async def get_facets(request):
+        """Conteos por categoría, talla y rango de precio para los filtros actuales"""
+        try:
+            filters, search = listing_filters(request.query_params)
+            
+            validators = catalog_validators(await product_model.catalog_version(),
+                                            request.query_params.multi_items())
+            cached = not_modified(request, validators, catalog_policy())
+            if cached is not None:
+                return cached
+            
+            return api_response(request, {
+                'success': True,
+                'data': await product_model.facets(filters, search=search)
+            }, validators=validators, policy=catalog_policy())
+        
+        except ValueError as e:
+            return _error(request, str(e), 400)
+        except Exception as e:
+            return _error(request, f'Error al obtener facetas: {str(e)}', 500)
+    
+    async def suggest_products(request):
+        """Autocompletado de nombres de productos"""
+        try:
+            q = request.query_params.get('q', '')
+            limit = min(int(request.query_params.get('limit', 8)), 20)
+            
+            validators = catalog_validators(await product_model.catalog_version(),
+                                            request.query_params.multi_items())
+            cached = not_modified(request, validators, catalog_policy())
+            if cached is not None:
+                return cached
+            
+            return api_response(request, {
+                'success': True,
+                'data': await product_model.suggest(q, limit)
+            }, validators=validators, policy=catalog_policy())
+        
+        except ValueError as e:
+            return _error(request, str(e), 400)
+        except Exception as e:
+            return _error(request, f'Error al obtener sugerencias: {str(e)}', 500)
+    
+    async def get_categories(request):
+        """Obtener todas las categorías disponibles"""
+        validators = static_validators('categories', Product.CATEGORIES)
+        cached = not_modified(request, validators, static_policy())
+        if cached is not None:
+            return cached
+        
+        return api_response(request, {
+            'success': True,
+            'data': Product.CATEGORIES
+        }, validators=validators, policy=static_policy())
+    
+    async def get_product(request):
+        """Obtener un producto específico"""
+        try:
+            product = await product_model.find_by_id(request.path_params['product_id'])
+            
+            if not product:
+                return _error(request, 'Producto no encontrado', 404)
+            
+            validators = document_validators('product', product)
+            cached = not_modified(request, validators, catalog_policy())
+            if cached is not None:
+                return cached
+            
+            return api_response(request, {
+                'success': True,
+                'data': product_model.to_dict(product)
+            }, validators=validators, policy=catalog_policy())
+        
+        except Exception as e:
+            return _error(request, f'Error al obtener producto: {str(e)}', 500)
+    
+    async def get_user(request):
+        """Obtener información pública de un usuario"""
+        try:
+            user = await user_model.find_by_id(request.path_params['user_id'])
+            
+            if not user:
+                return _error(request, 'Usuario no encontrado', 404)
+            
+            validators = document_validators('user', user)
+            cached = not_modified(request, validators, catalog_policy())
+            if cached is not None:
+                return cached
+            
+            return api_response(request, {
+                'success': True,
+                'data': user_model.public_dict(user)
+            }, validators=validators, policy=catalog_policy())
+        
+        except Exception as e:
+            return _error(request, f'Error al obtener usuario: {str(e)}', 500)
+    
+    # Las rutas fijas van antes de las variables; /profile requiere token y queda en Flask
+    return [
+        _timed_route('app', '/api/health', health_check),
+        _timed_route('products', '/api/products/', get_products),
+        _timed_route('products', '/api/products/facets', get_facets),
+        _timed_route('products', '/api/products/suggest', suggest_products),
+        _timed_route('products', '/api/products/categories', get_categories),
+        _timed_route('products', '/api/products/{product_id}', get_product),
+        Route('/api/users/profile', fallback),
+        _timed_route('users', '/api/users/{user_id}', get_user),
+    ]
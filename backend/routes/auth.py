@@ -3,11 +3,12 @@ import jwt
 from datetime import datetime, timedelta
 from config import Config
 from utils.validators import validate_email, validate_password, validate_username, validate_phone
-
-auth_bp = Blueprint('auth', __name__)
+from utils.password_hasher import HasherBusyError
 
 def init_routes(db, user_model):
     """Inicializar rutas de autenticación"""
+    # Blueprint nuevo por app: create_app se puede llamar más de una vez
+    auth_bp = Blueprint('auth', __name__)
     
     @auth_bp.route('/register', methods=['POST'])
     def register():
@@ -68,15 +69,12 @@ def init_routes(db, user_model):
                     'message': 'El nombre de usuario ya está en uso'
                 }), 400
             
-            # Crear usuario
-            user_id = user_model.create(data)
-            
-            # Obtener usuario creado
-            user = user_model.find_by_id(user_id)
+            # Crear usuario (devuelve el documento, sin volver a leerlo)
+            user = user_model.create(data)
             
             # Generar token JWT
             token = jwt.encode({
-                'user_id': user_id,
+                'user_id': str(user['_id']),
                 'role': user.get('role', 'usuario'),
                 'exp': datetime.utcnow() + timedelta(hours=Config.JWT_EXPIRATION_HOURS)
             }, Config.JWT_SECRET_KEY, algorithm='HS256')
@@ -89,7 +87,13 @@ def init_routes(db, user_model):
                     'user': user_model.to_dict(user)
                 }
             }), 201
-            
+        
+        except HasherBusyError:
+            return jsonify({
+                'success': False,
+                'message': 'Servidor ocupado, intenta nuevamente en unos segundos'
+            }), 503, {'Retry-After': '1'}
+        
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -140,7 +144,13 @@ def init_routes(db, user_model):
                     'user': user_model.to_dict(user)
                 }
             }), 200
-            
+        
+        except HasherBusyError:
+            return jsonify({
+                'success': False,
+                'message': 'Servidor ocupado, intenta nuevamente en unos segundos'
+            }), 503, {'Retry-After': '1'}
+        
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -1,55 +1,84 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from middleware.auth_middleware import admin_required
-from datetime import datetime, timedelta
-from bson import ObjectId
 
-dashboard_bp = Blueprint('dashboard', __name__)
+# Las agregaciones empiezan con un $sort sobre campos indexados: así MongoDB
+# recorre un índice (en varias, sin leer documentos) en vez de la colección.
+# Top sellers no tiene un índice que lo resuelva: sale de Stats (por vendedor).
+PRODUCTS_BY_CATEGORY = [
+    {'$sort': {'categoria': 1, 'estado': 1}},
+    {'$project': {'_id': 0, 'categoria': 1, 'estado': 1}},
+    {'$group': {
+        '_id': '$categoria',
+        'total': {'$sum': 1},
+        'disponibles': {
+            '$sum': {'$cond': [{'$eq': ['$estado', 'disponible']}, 1, 0]}
+        }
+    }},
+    {'$sort': {'total': -1}}
+]
 
-def init_routes(db, product_model, user_model):
+USERS_GROWTH = [
+    {'$sort': {'created_at': 1}},
+    {'$project': {'_id': 0, 'created_at': 1}},
+    {'$group': {
+        '_id': {
+            'year': {'$year': '$created_at'},
+            'month': {'$month': '$created_at'}
+        },
+        'count': {'$sum': 1}
+    }},
+    {'$sort': {'_id.year': 1, '_id.month': 1}},
+    {'$limit': 12}
+]
+
+PRICE_STATS = [
+    {'$sort': {'estado': 1, 'precio': 1}},
+    {'$project': {'_id': 0, 'precio': 1}},
+    {'$group': {
+        '_id': None,
+        'avg_price': {'$avg': '$precio'},
+        'min_price': {'$min': '$precio'},
+        'max_price': {'$max': '$precio'}
+    }}
+]
+
+RECENT_SORT = [('created_at', -1)]
+
+
+def query_shapes():
+    """Formas de las consultas del dashboard para verificar sus planes"""
+    return [
+        {'collection': 'products', 'name': 'dashboard: productos por categoría',
+         'pipeline': PRODUCTS_BY_CATEGORY, 'index': [('categoria', 1), ('estado', 1)]},
+        {'collection': 'users', 'name': 'dashboard: crecimiento de usuarios',
+         'pipeline': USERS_GROWTH, 'index': [('created_at', -1)]},
+        {'collection': 'products', 'name': 'dashboard: precios', 'pipeline': PRICE_STATS},
+        {'collection': 'users', 'name': 'dashboard: usuarios recientes',
+         'filter': {}, 'sort': RECENT_SORT, 'index': [('created_at', -1)]},
+        {'collection': 'products', 'name': 'dashboard: productos recientes',
+         'filter': {}, 'sort': RECENT_SORT, 'index': [('created_at', -1)]},
+    ]
+
+
+def init_routes(db, product_model, user_model, stats_model):
     """Inicializar rutas del dashboard"""
+    # Blueprint nuevo por app: create_app se puede llamar más de una vez
+    dashboard_bp = Blueprint('dashboard', __name__)
     
     @dashboard_bp.route('/stats', methods=['GET'])
     @admin_required
     def get_stats(current_user_id, current_user_role):
         """Obtener estadísticas generales"""
         try:
-            # Contar usuarios totales
-            total_users = db.users.count_documents({})
-            active_users = db.users.count_documents({'active': True})
-            
-            # Contar productos
-            total_products = db.products.count_documents({})
-            available_products = db.products.count_documents({'estado': 'disponible'})
-            sold_products = db.products.count_documents({'estado': 'vendido'})
-            
-            # Usuarios registrados en los últimos 30 días
-            thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-            new_users = db.users.count_documents({
-                'created_at': {'$gte': thirty_days_ago}
-            })
-            
-            # Productos publicados en los últimos 30 días
-            new_products = db.products.count_documents({
-                'created_at': {'$gte': thirty_days_ago}
-            })
+            # Los contadores se mantienen con $inc; ?refresh=1 los recalcula
+            if request.args.get('refresh') == '1':
+                stats_model.rebuild()
             
             return jsonify({
                 'success': True,
-                'data': {
-                    'users': {
-                        'total': total_users,
-                        'active': active_users,
-                        'new_last_30_days': new_users
-                    },
-                    'products': {
-                        'total': total_products,
-                        'available': available_products,
-                        'sold': sold_products,
-                        'new_last_30_days': new_products
-                    }
-                }
+                'data': stats_model.overview(days=30)
             }), 200
-            
+        
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -61,18 +90,7 @@ def init_routes(db, product_model, user_model):
     def products_by_category(current_user_id, current_user_role):
         """Obtener productos agrupados por categoría"""
         try:
-            pipeline = [
-                {'$group': {
-                    '_id': '$categoria',
-                    'total': {'$sum': 1},
-                    'disponibles': {
-                        '$sum': {'$cond': [{'$eq': ['$estado', 'disponible']}, 1, 0]}
-                    }
-                }},
-                {'$sort': {'total': -1}}
-            ]
-            
-            result = list(db.products.aggregate(pipeline))
+            result = list(db.products.aggregate(PRODUCTS_BY_CATEGORY))
             
             # Formatear resultado
             data = [{
@@ -85,7 +103,7 @@ def init_routes(db, product_model, user_model):
                 'success': True,
                 'data': data
             }), 200
-            
+        
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -99,12 +117,12 @@ def init_routes(db, product_model, user_model):
         try:
             # Últimos 10 usuarios registrados
             recent_users = list(db.users.find()
-                .sort('created_at', -1)
+                .sort(RECENT_SORT)
                 .limit(10))
             
             # Últimos 10 productos publicados
             recent_products = list(db.products.find()
-                .sort('created_at', -1)
+                .sort(RECENT_SORT)
                 .limit(10))
             
             # Formatear usuarios
@@ -125,7 +143,7 @@ def init_routes(db, product_model, user_model):
                     'recent_products': products_list
                 }
             }), 200
-            
+        
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -137,19 +155,7 @@ def init_routes(db, product_model, user_model):
     def users_growth(current_user_id, current_user_role):
         """Obtener crecimiento de usuarios por mes"""
         try:
-            pipeline = [
-                {'$group': {
-                    '_id': {
-                        'year': {'$year': '$created_at'},
-                        'month': {'$month': '$created_at'}
-                    },
-                    'count': {'$sum': 1}
-                }},
-                {'$sort': {'_id.year': 1, '_id.month': 1}},
-                {'$limit': 12}
-            ]
-            
-            result = list(db.users.aggregate(pipeline))
+            result = list(db.users.aggregate(USERS_GROWTH))
             
             # Formatear resultado
             months = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 
@@ -164,7 +170,7 @@ def init_routes(db, product_model, user_model):
                 'success': True,
                 'data': data
             }), 200
-            
+        
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -176,25 +182,13 @@ def init_routes(db, product_model, user_model):
     def top_sellers(current_user_id, current_user_role):
         """Obtener usuarios con más productos publicados"""
         try:
-            pipeline = [
-                {'$group': {
-                    '_id': '$user_id',
-                    'username': {'$first': '$username'},
-                    'total_products': {'$sum': 1},
-                    'available': {
-                        '$sum': {'$cond': [{'$eq': ['$estado', 'disponible']}, 1, 0]}
-                    }
-                }},
-                {'$sort': {'total_products': -1}},
-                {'$limit': 10}
-            ]
-            
-            result = list(db.products.aggregate(pipeline))
+            # Contadores por vendedor que mantiene Stats (sin recorrer products)
+            result = stats_model.top_sellers(limit=10)
             
             # Formatear resultado
             data = [{
-                'user_id': item['_id'],
-                'username': item['username'],
+                'user_id': item['user_id'],
+                'username': item.get('username'),
                 'total_products': item['total_products'],
                 'available': item['available']
             } for item in result]
@@ -203,7 +197,7 @@ def init_routes(db, product_model, user_model):
                 'success': True,
                 'data': data
             }), 200
-            
+        
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -215,16 +209,7 @@ def init_routes(db, product_model, user_model):
     def price_stats(current_user_id, current_user_role):
         """Obtener estadísticas de precios"""
         try:
-            pipeline = [
-                {'$group': {
-                    '_id': None,
-                    'avg_price': {'$avg': '$precio'},
-                    'min_price': {'$min': '$precio'},
-                    'max_price': {'$max': '$precio'}
-                }}
-            ]
-            
-            result = list(db.products.aggregate(pipeline))
+            result = list(db.products.aggregate(PRICE_STATS))
             
             if result:
                 data = {
@@ -243,11 +228,34 @@ def init_routes(db, product_model, user_model):
                 'success': True,
                 'data': data
             }), 200
-            
+        
         except Exception as e:
             return jsonify({
                 'success': False,
                 'message': f'Error al obtener estadísticas de precios: {str(e)}'
             }), 500
     
+    @dashboard_bp.route('/system', methods=['GET'])
+    @admin_required
+    def system_stats(current_user_id, current_user_role):
+        """Obtener métricas internas (caches en memoria, hashing y arranque)"""
+        try:
+            return jsonify({
+                'success': True,
+                'data': {
+                    'caches': {
+                        'products': product_model.cache.stats(),
+                        'users': user_model.cache.stats()
+                    },
+                    'password_hasher': user_model.hasher.stats(),
+                    'boot_ms': current_app.config.get('BOOT_TIME_MS')
+                }
+            }), 200
+        
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'Error al obtener métricas del sistema: {str(e)}'
+            }), 500
+    
     return dashboard_bp
\ No newline at end of file
@@ -1,61 +1,237 @@
 from flask import Blueprint, request, jsonify
 import os
+import uuid
+from datetime import datetime
 from werkzeug.utils import secure_filename
 from middleware.auth_middleware import token_required, admin_required
 from utils.validators import allowed_file, validate_product_data, sanitize_filename
+from models.product import Product
+from utils.pagination import SORTS, encode_cursor
+from utils.image_pipeline import image_pipeline, remove_image_files
+from utils.bulk_import import parse_bulk_request, index_archive, save_archive_image
+from utils.file_cleanup import file_cleanup
+from utils.http_cache import (catalog_validators, document_validators, static_validators,
+                              catalog_policy, static_policy, not_modified, cacheable)
 from config import Config
 
-products_bp = Blueprint('products', __name__)
+
+def upload_prefix():
+    """
+    Prefijo de los archivos subidos: timestamp más un token aleatorio, así
+    dos subidas del mismo segundo nunca comparten nombre (se sirven como
+    inmutables, ver utils/static_files.py).
+    """
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+
+def listing_filters(args):
+    """
+    Leer los filtros comunes de listado y facetas desde la query string.
+    Devuelve (filtros, texto_de_búsqueda); lanza ValueError si son inválidos.
+    """
+    filters = {}
+    categoria = args.get('categoria')
+    talla = args.get('talla')
+    search = args.get('search')
+    
+    if categoria:
+        filters['categoria'] = categoria
+    if talla:
+        filters['talla'] = talla
+    
+    # Rango de precios (se combina también con la búsqueda de texto)
+    precio = {}
+    try:
+        if args.get('min_precio'):
+            precio['$gte'] = float(args['min_precio'])
+        if args.get('max_precio'):
+            precio['$lte'] = float(args['max_precio'])
+    except ValueError:
+        raise ValueError('min_precio y max_precio deben ser números')
+    if precio:
+        filters['precio'] = precio
+    
+    return filters, search
+
+
+def listing_params(args):
+    """
+    Leer paginación, filtros, orden y campos de GET /api/products.
+    Lo comparten el modo WSGI y el ASGI; lanza ValueError si son inválidos.
+    """
+    page = int(args.get('page', 1))
+    limit = int(args.get('limit', 20))
+    cursor = args.get('cursor')
+    
+    # Filtros opcionales
+    filters, search = listing_filters(args)
+    
+    if cursor and search:
+        raise ValueError('La paginación por cursor no está disponible para búsquedas')
+    
+    # Orden: newest (por defecto), price_asc o price_desc.
+    # Las búsquedas sin orden explícito van por relevancia.
+    sort = args.get('sort') or None
+    if sort is not None and sort not in SORTS:
+        raise ValueError(f"Orden inválido. Opciones: {', '.join(SORTS)}")
+    if sort is None and not search:
+        sort = 'newest'
+    
+    return {
+        'page': page,
+        'limit': limit,
+        'skip': (page - 1) * limit,
+        'cursor': cursor,
+        'filters': filters,
+        'search': search,
+        'sort': sort,
+        # fields=nombre,precio o view=summary|detail (por defecto, todos)
+        'fields': Product.select_fields(args.get('fields'), args.get('view')),
+        # Total aproximado (más barato para filtros amplios)
+        'approximate': args.get('approx_total', '').lower() in ('1', 'true')
+    }
+
+
+def listing_payload(product_model, products, total, params):
+    """Cuerpo de la respuesta de un listado (página, paginación y cursor)"""
+    limit = params['limit']
+    
+    # Cursor para la página siguiente (solo si la página vino completa)
+    next_cursor = None
+    if not params['search'] and len(products) == limit:
+        next_cursor = encode_cursor(products[-1], params['sort'])
+    
+    return {
+        'success': True,
+        'data': {
+            'products': [product_model.to_dict(p, params['fields']) for p in products],
+            'pagination': {
+                'page': params['page'],
+                'limit': limit,
+                'total': total,
+                'pages': (total + limit - 1) // limit if limit > 0 else 1,
+                'total_approximate': bool(params['approximate'] or params['cursor']),
+                'next_cursor': next_cursor
+            }
+        }
+    }
+
 
 def init_routes(db, product_model, user_model):
     """Inicializar rutas de productos"""
+    # Blueprint nuevo por app: create_app se puede llamar más de una vez
+    products_bp = Blueprint('products', __name__)
+    
+    def _missing_or_forbidden(product_id, message):
+        """
+        Respuesta de una escritura que no encontró el producto del usuario.
+        Solo en este caso (poco frecuente) se lee el producto para distinguir
+        404 de 403.
+        """
+        if product_model.find_by_id(product_id) is None:
+            return jsonify({
+                'success': False,
+                'message': 'Producto no encontrado'
+            }), 404
+        return jsonify({
+            'success': False,
+            'message': message
+        }), 403
     
     @products_bp.route('/', methods=['GET'])
     def get_products():
         """Obtener todos los productos con paginación y filtros"""
         try:
-            # Parámetros de paginación
-            page = int(request.args.get('page', 1))
-            limit = int(request.args.get('limit', 20))
-            skip = (page - 1) * limit
-            
-            # Filtros opcionales
-            filters = {}
-            categoria = request.args.get('categoria')
-            search = request.args.get('search')
-            
-            if categoria:
-                filters['categoria'] = categoria
+            params = listing_params(request.args)
+            
+            # Si el catálogo no cambió desde la copia del cliente, 304 sin consultar
+            validators = catalog_validators(product_model.catalog_version(),
+                                            request.args.items(multi=True))
+            cached = not_modified(validators, catalog_policy())
+            if cached is not None:
+                return cached
+            
+            # Buscar productos y total en una sola consulta
+            products, total = product_model.list_page(
+                params['filters'],
+                search=params['search'],
+                skip=params['skip'],
+                limit=params['limit'],
+                cursor=params['cursor'],
+                approximate_total=params['approximate'],
+                sort=params['sort'],
+                fields=params['fields']
+            )
+            
+            return cacheable(jsonify(listing_payload(product_model, products, total, params)),
+                             validators, catalog_policy()), 200
+        
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'Error al obtener productos: {str(e)}'
+            }), 500
+    
+    @products_bp.route('/facets', methods=['GET'])
+    def get_facets():
+        """Conteos por categoría, talla y rango de precio para los filtros actuales"""
+        try:
+            filters, search = listing_filters(request.args)
             
-            # Buscar productos
-            if search:
-                products = product_model.search(search, skip, limit)
-            else:
-                products = product_model.find_all(skip, limit, filters)
+            validators = catalog_validators(product_model.catalog_version(),
+                                            request.args.items(multi=True))
+            cached = not_modified(validators, catalog_policy())
+            if cached is not None:
+                return cached
             
-            # Convertir a diccionario
-            products_list = [product_model.to_dict(p) for p in products]
+            return cacheable(jsonify({
+                'success': True,
+                'data': product_model.facets(filters, search=search)
+            }), validators, catalog_policy()), 200
+        
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'Error al obtener facetas: {str(e)}'
+            }), 500
+    
+    @products_bp.route('/suggest', methods=['GET'])
+    def suggest_products():
+        """Autocompletado de nombres de productos"""
+        try:
+            q = request.args.get('q', '')
+            limit = min(int(request.args.get('limit', 8)), 20)
             
-            # Contar total
-            total = product_model.count(filters)
+            validators = catalog_validators(product_model.catalog_version(),
+                                            request.args.items(multi=True))
+            cached = not_modified(validators, catalog_policy())
+            if cached is not None:
+                return cached
             
-            return jsonify({
+            return cacheable(jsonify({
                 'success': True,
-                'data': {
-                    'products': products_list,
-                    'pagination': {
-                        'page': page,
-                        'limit': limit,
-                        'total': total,
-                        'pages': (total + limit - 1) // limit
-                    }
-                }
-            }), 200
-            
+                'data': product_model.suggest(q, limit)
+            }), validators, catalog_policy()), 200
+        
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         except Exception as e:
             return jsonify({
                 'success': False,
-                'message': f'Error al obtener productos: {str(e)}'
+                'message': f'Error al obtener sugerencias: {str(e)}'
             }), 500
     
     @products_bp.route('/<product_id>', methods=['GET'])
@@ -70,11 +246,17 @@ def init_routes(db, product_model, user_model):
                     'message': 'Producto no encontrado'
                 }), 404
             
-            return jsonify({
+            # El documento suele venir del cache de lectura: el 304 ahorra serializarlo
+            validators = document_validators('product', product)
+            cached = not_modified(validators, catalog_policy())
+            if cached is not None:
+                return cached
+            
+            return cacheable(jsonify({
                 'success': True,
                 'data': product_model.to_dict(product)
-            }), 200
-            
+            }), validators, catalog_policy()), 200
+        
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -104,10 +286,8 @@ def init_routes(db, product_model, user_model):
                 file = request.files['imagen']
                 if file and file.filename and allowed_file(file.filename):
                     filename = sanitize_filename(file.filename)
-                    # Agregar timestamp para evitar colisiones
-                    from datetime import datetime
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    filename = f"{timestamp}_{filename}"
+                    # Agregar timestamp y token para evitar colisiones
+                    filename = f"{upload_prefix()}_{filename}"
                     filepath = os.path.join(Config.UPLOAD_FOLDER, filename)
                     file.save(filepath)
                     imagen_url = f"/uploads/products/{filename}"
@@ -117,44 +297,143 @@ def init_routes(db, product_model, user_model):
             data['username'] = user.get('username', 'Anónimo')
             data['imagen_url'] = imagen_url
             
-            # Crear producto
-            product_id = product_model.create(data, current_user_id)
+            # Crear producto (devuelve el documento, sin volver a leerlo)
+            product = product_model.create(data, current_user_id)
             
-            # Obtener producto creado
-            product = product_model.find_by_id(product_id)
+            # Generar miniaturas y WebP en segundo plano
+            image_pipeline.submit(product_model, str(product['_id']), imagen_url)
             
             return jsonify({
                 'success': True,
                 'message': 'Producto publicado exitosamente',
                 'data': product_model.to_dict(product)
             }), 201
-            
+        
         except Exception as e:
             return jsonify({
                 'success': False,
                 'message': f'Error al crear producto: {str(e)}'
             }), 500
     
-    @products_bp.route('/<product_id>', methods=['PUT'])
+    @products_bp.route('/bulk', methods=['POST'])
     @token_required
-    def update_product(current_user_id, current_user_role, product_id):
-        """Actualizar un producto existente"""
+    def bulk_create_products(current_user_id, current_user_role):
+        """Crear muchos productos en una sola petición (JSON, NDJSON o multipart + zip)"""
+        archive = None
+        # Imágenes extraídas del zip; las que no quedan en un producto se borran al final
+        saved_images = []
+        kept_images = set()
         try:
-            # Verificar que el producto existe
-            product = product_model.find_by_id(product_id)
-            if not product:
+            items, archive = parse_bulk_request(request)
+            
+            if not items:
                 return jsonify({
                     'success': False,
-                    'message': 'Producto no encontrado'
-                }), 404
+                    'message': 'No se recibieron productos'
+                }), 400
             
-            # Verificar que el usuario es el dueño (o admin)
-            if product['user_id'] != current_user_id and current_user_role != 'admin':
+            if len(items) > Config.BULK_MAX_ITEMS:
                 return jsonify({
                     'success': False,
-                    'message': 'No tienes permiso para editar este producto'
-                }), 403
+                    'message': f'Máximo {Config.BULK_MAX_ITEMS} productos por petición'
+                }), 400
+            
+            # Validar todo antes de escribir
+            results = [None] * len(items)
+            valid_items = []
+            valid_indexes = []
+            entries = index_archive(archive)
+            # Prefijo por petición: dos cargas en el mismo segundo no comparten nombres
+            timestamp = upload_prefix()
+            
+            for index, item in enumerate(items):
+                if not isinstance(item, dict):
+                    results[index] = {'index': index, 'success': False, 'errors': ['Formato inválido']}
+                    continue
+                
+                # La URL de la imagen solo puede venir del archivo subido
+                item['imagen_url'] = ''
+                valid, errors = validate_product_data(item)
+                if valid and item.get('imagen'):
+                    if not isinstance(item['imagen'], str):
+                        valid, errors = False, ['imagen debe ser el nombre de un archivo del zip']
+                    elif archive is None:
+                        valid, errors = False, ['Se indicó una imagen pero no se envió el archivo imagenes']
+                    else:
+                        try:
+                            item['imagen_url'] = save_archive_image(
+                                archive, entries, item['imagen'], f"{timestamp}_{index}"
+                            )
+                            saved_images.append(item['imagen_url'])
+                        except ValueError as e:
+                            valid, errors = False, [str(e)]
+                
+                if not valid:
+                    results[index] = {'index': index, 'success': False, 'errors': errors}
+                    continue
+                
+                valid_items.append(item)
+                valid_indexes.append(index)
+            
+            # Username del vendedor una sola vez para todo el lote
+            created = 0
+            if valid_items:
+                user = user_model.find_by_id(current_user_id)
+                username = user.get('username', 'Anónimo') if user else 'Anónimo'
+                
+                inserted = product_model.create_many(valid_items, current_user_id, username)
+                
+                for index, item, (product_id, error) in zip(valid_indexes, valid_items, inserted):
+                    if error:
+                        results[index] = {'index': index, 'success': False, 'errors': [error]}
+                        continue
+                    
+                    kept_images.add(item.get('imagen_url'))
+                    created += 1
+                    results[index] = {'index': index, 'success': True, 'id': product_id}
+                    image_pipeline.submit(product_model, product_id, item.get('imagen_url'))
+            
+            failed = len(items) - created
+            if created == 0:
+                status = 400
+            elif failed:
+                status = 207
+            else:
+                status = 201
             
+            return jsonify({
+                'success': created > 0,
+                'message': f'{created} productos publicados, {failed} con errores',
+                'data': {
+                    'created': created,
+                    'failed': failed,
+                    'results': results
+                }
+            }), status
+        
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'Error en la carga masiva: {str(e)}'
+            }), 500
+        finally:
+            if archive is not None:
+                archive.close()
+            # También si create_many o las estadísticas fallaron a mitad de camino
+            for imagen_url in saved_images:
+                if imagen_url not in kept_images:
+                    remove_image_files(imagen_url)
+    
+    @products_bp.route('/<product_id>', methods=['PUT'])
+    @token_required
+    def update_product(current_user_id, current_user_role, product_id):
+        """Actualizar un producto existente"""
+        try:
             # Obtener datos del formulario
             data = request.form.to_dict()
             
@@ -169,42 +448,37 @@ def init_routes(db, product_model, user_model):
                     }), 400
             
             # Manejar nueva imagen si se proporciona
+            new_image = None
             if 'imagen' in request.files:
                 file = request.files['imagen']
                 if file and file.filename and allowed_file(file.filename):
                     filename = sanitize_filename(file.filename)
-                    from datetime import datetime
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    filename = f"{timestamp}_{filename}"
+                    filename = f"{upload_prefix()}_{filename}"
                     filepath = os.path.join(Config.UPLOAD_FOLDER, filename)
                     file.save(filepath)
-                    data['imagen_url'] = f"/uploads/products/{filename}"
-                    
-                    # Eliminar imagen anterior si existe
-                    if product.get('imagen_url'):
-                        old_file = product['imagen_url'].replace('/uploads/products/', '')
-                        old_filepath = os.path.join(Config.UPLOAD_FOLDER, old_file)
-                        if os.path.exists(old_filepath):
-                            os.remove(old_filepath)
+                    new_image = data['imagen_url'] = f"/uploads/products/{filename}"
             
-            # Actualizar producto
-            success = product_model.update(product_id, data, current_user_id)
+            # Actualizar producto: el dueño (o admin) es parte del filtro
+            previous, product = product_model.update(
+                product_id, data, current_user_id, is_admin=current_user_role == 'admin'
+            )
             
-            if not success:
-                return jsonify({
-                    'success': False,
-                    'message': 'No se pudo actualizar el producto'
-                }), 400
+            if product is None:
+                # La imagen subida ya no se va a usar
+                file_cleanup.enqueue(new_image)
+                return _missing_or_forbidden(product_id, 'No tienes permiso para editar este producto')
             
-            # Obtener producto actualizado
-            updated_product = product_model.find_by_id(product_id)
+            if new_image:
+                # Eliminar imagen anterior (y sus variantes) y generar las nuevas en segundo plano
+                file_cleanup.enqueue(previous.get('imagen_url'), previous.get('imagen_variants'))
+                image_pipeline.submit(product_model, product_id, new_image)
             
             return jsonify({
                 'success': True,
                 'message': 'Producto actualizado exitosamente',
-                'data': product_model.to_dict(updated_product)
+                'data': product_model.to_dict(product)
             }), 200
-            
+        
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -216,57 +490,157 @@ def init_routes(db, product_model, user_model):
     def delete_product(current_user_id, current_user_role, product_id):
         """Eliminar un producto"""
         try:
-            # Verificar que el producto existe
-            product = product_model.find_by_id(product_id)
-            if not product:
-                return jsonify({
-                    'success': False,
-                    'message': 'Producto no encontrado'
-                }), 404
+            # Eliminar producto: el dueño (o admin) es parte del filtro
+            deleted = product_model.delete(
+                product_id, current_user_id, is_admin=current_user_role == 'admin'
+            )
             
-            # Verificar que el usuario es el dueño (o admin)
-            if product['user_id'] != current_user_id and current_user_role != 'admin':
-                return jsonify({
-                    'success': False,
-                    'message': 'No tienes permiso para eliminar este producto'
-                }), 403
+            if deleted is None:
+                return _missing_or_forbidden(product_id, 'No tienes permiso para eliminar este producto')
             
-            # Eliminar imagen si existe
-            if product.get('imagen_url'):
-                filename = product['imagen_url'].replace('/uploads/products/', '')
-                filepath = os.path.join(Config.UPLOAD_FOLDER, filename)
-                if os.path.exists(filepath):
-                    os.remove(filepath)
+            # Eliminar imagen y variantes en segundo plano
+            file_cleanup.enqueue(deleted.get('imagen_url'), deleted.get('imagen_variants'))
             
-            # Eliminar producto
-            success = product_model.delete(product_id, current_user_id)
+            return jsonify({
+                'success': True,
+                'message': 'Producto eliminado exitosamente'
+            }), 200
+        
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'Error al eliminar producto: {str(e)}'
+            }), 500
+    
+    @products_bp.route('/<product_id>/status', methods=['PATCH'])
+    @token_required
+    def change_product_status(current_user_id, current_user_role, product_id):
+        """Cambiar el estado de un producto (disponible, vendido, reservado)"""
+        try:
+            data = request.get_json(silent=True) or {}
+            estado = data.get('estado')
             
-            if not success:
+            if estado not in product_model.STATUSES:
                 return jsonify({
                     'success': False,
-                    'message': 'No se pudo eliminar el producto'
+                    'message': f"Estado inválido. Valores permitidos: {', '.join(product_model.STATUSES)}"
                 }), 400
             
+            # El dueño (o admin) es parte del filtro
+            if not product_model.change_status(
+                product_id, estado, current_user_id, is_admin=current_user_role == 'admin'
+            ):
+                return _missing_or_forbidden(product_id, 'No tienes permiso para modificar este producto')
+            
             return jsonify({
                 'success': True,
-                'message': 'Producto eliminado exitosamente'
+                'message': 'Estado actualizado exitosamente',
+                'data': {'id': product_id, 'estado': estado}
             }), 200
+        
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'Error al cambiar estado: {str(e)}'
+            }), 500
+    
+    def _bulk_ids(data):
+        """Leer y validar la lista de IDs de una operación masiva"""
+        ids = data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            raise ValueError('Se requiere una lista de ids')
+        if len(ids) > Config.BULK_MAX_ITEMS:
+            raise ValueError(f'Máximo {Config.BULK_MAX_ITEMS} productos por petición')
+        return list(dict.fromkeys(str(i) for i in ids))
+    
+    @products_bp.route('/bulk/status', methods=['POST'])
+    @token_required
+    def bulk_change_status(current_user_id, current_user_role):
+        """Cambiar el estado de varios productos propios en una sola operación"""
+        try:
+            data = request.get_json(silent=True) or {}
+            ids = _bulk_ids(data)
+            estado = data.get('estado')
+            
+            if estado not in product_model.STATUSES:
+                return jsonify({
+                    'success': False,
+                    'message': f"Estado inválido. Valores permitidos: {', '.join(product_model.STATUSES)}"
+                }), 400
+            
+            updated, not_found = product_model.bulk_change_status(
+                ids, estado, current_user_id, is_admin=current_user_role == 'admin'
+            )
             
+            return jsonify({
+                'success': len(updated) > 0,
+                'message': f'{len(updated)} productos actualizados',
+                'data': {
+                    'updated': updated,
+                    'not_found': not_found
+                }
+            }), 200 if updated else 404
+        
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         except Exception as e:
             return jsonify({
                 'success': False,
-                'message': f'Error al eliminar producto: {str(e)}'
+                'message': f'Error al cambiar estados: {str(e)}'
+            }), 500
+    
+    @products_bp.route('/bulk/delete', methods=['POST'])
+    @token_required
+    def bulk_delete_products(current_user_id, current_user_role):
+        """Eliminar varios productos propios en una sola operación"""
+        try:
+            data = request.get_json(silent=True) or {}
+            ids = _bulk_ids(data)
+            
+            deleted, not_found = product_model.bulk_delete(
+                ids, current_user_id, is_admin=current_user_role == 'admin'
+            )
+            
+            # Las imágenes se borran en segundo plano
+            for product in deleted:
+                file_cleanup.enqueue(product.get('imagen_url'), product.get('imagen_variants'))
+            
+            return jsonify({
+                'success': len(deleted) > 0,
+                'message': f'{len(deleted)} productos eliminados',
+                'data': {
+                    'deleted': [str(product['_id']) for product in deleted],
+                    'not_found': not_found
+                }
+            }), 200 if deleted else 404
+        
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'Error al eliminar productos: {str(e)}'
             }), 500
     
     @products_bp.route('/categories', methods=['GET'])
     def get_categories():
         """Obtener todas las categorías disponibles"""
         try:
-            from models.product import Product
-            return jsonify({
+            validators = static_validators('categories', Product.CATEGORIES)
+            cached = not_modified(validators, static_policy())
+            if cached is not None:
+                return cached
+            
+            return cacheable(jsonify({
                 'success': True,
                 'data': Product.CATEGORIES
-            }), 200
+            }), validators, static_policy()), 200
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -280,15 +654,31 @@ def init_routes(db, product_model, user_model):
             page = int(request.args.get('page', 1))
             limit = int(request.args.get('limit', 20))
             skip = (page - 1) * limit
+            cursor = request.args.get('cursor')
+            fields = Product.select_fields(request.args.get('fields'), request.args.get('view'))
             
-            products = product_model.find_by_user(user_id, skip, limit)
-            products_list = [product_model.to_dict(p) for p in products]
+            validators = catalog_validators(product_model.catalog_version(),
+                                            [('user_id', user_id), *request.args.items(multi=True)])
+            cached = not_modified(validators, catalog_policy())
+            if cached is not None:
+                return cached
             
-            return jsonify({
-                'success': True,
-                'data': products_list
-            }), 200
+            products = product_model.find_by_user(user_id, skip, limit, cursor=cursor, fields=fields)
+            products_list = [product_model.to_dict(p, fields) for p in products]
             
+            next_cursor = encode_cursor(products[-1]) if len(products) == limit else None
+            
+            return cacheable(jsonify({
+                'success': True,
+                'data': products_list,
+                'next_cursor': next_cursor
+            }), validators, catalog_policy()), 200
+        
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -1,11 +1,12 @@
 from flask import Blueprint, request, jsonify
 from middleware.auth_middleware import token_required, admin_required
 from utils.validators import validate_phone
-
-users_bp = Blueprint('users', __name__)
+from utils.http_cache import document_validators, catalog_policy, not_modified, cacheable
 
 def init_routes(db, user_model):
     """Inicializar rutas de usuarios"""
+    # Blueprint nuevo por app: create_app se puede llamar más de una vez
+    users_bp = Blueprint('users', __name__)
     
     @users_bp.route('/profile', methods=['GET'])
     @token_required
@@ -24,7 +25,7 @@ def init_routes(db, user_model):
                 'success': True,
                 'data': user_model.to_dict(user)
             }), 200
-            
+        
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -45,24 +46,21 @@ def init_routes(db, user_model):
                     'message': 'Número de teléfono inválido'
                 }), 400
             
-            # Actualizar usuario
-            success = user_model.update(current_user_id, data)
+            # Actualizar usuario (devuelve el documento actualizado)
+            updated_user = user_model.update(current_user_id, data)
             
-            if not success:
+            if updated_user is None:
                 return jsonify({
                     'success': False,
                     'message': 'No se pudo actualizar el perfil'
                 }), 400
             
-            # Obtener usuario actualizado
-            updated_user = user_model.find_by_id(current_user_id)
-            
             return jsonify({
                 'success': True,
                 'message': 'Perfil actualizado exitosamente',
                 'data': user_model.to_dict(updated_user)
             }), 200
-            
+        
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -81,19 +79,17 @@ def init_routes(db, user_model):
                     'message': 'Usuario no encontrado'
                 }), 404
             
-            # Devolver solo información pública
-            public_info = {
-                'id': str(user['_id']),
-                'username': user.get('username'),
-                'nombre': user.get('nombre'),
-                'created_at': user.get('created_at').isoformat() if user.get('created_at') else None
-            }
+            validators = document_validators('user', user)
+            cached = not_modified(validators, catalog_policy())
+            if cached is not None:
+                return cached
             
-            return jsonify({
+            # Devolver solo información pública
+            return cacheable(jsonify({
                 'success': True,
-                'data': public_info
-            }), 200
-            
+                'data': user_model.public_dict(user)
+            }), validators, catalog_policy()), 200
+        
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -129,7 +125,7 @@ def init_routes(db, user_model):
                     }
                 }
             }), 200
-            
+        
         except Exception as e:
             return jsonify({
                 'success': False,
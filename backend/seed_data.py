@@ -0,0 +1,283 @@
+"""
+Datos sintéticos para pruebas de carga.
+
+Genera usuarios y productos con distribuciones parecidas a las reales:
+pocas categorías concentran la mayoría de los productos, los precios siguen
+una log-normal por categoría, unos pocos vendedores publican casi todo y las
+publicaciones se acumulan en los últimos meses. Nombres y descripciones son
+texto en español para el índice $text y el autocompletado.
+
+    python seed_data.py --users 10000 --products 1000000 --workers 8 --drop
+    python seed_data.py --products 20000 --images 30 --db tradeco_demo
+
+La contraseña de todos los usuarios es --password (se hashea una sola vez);
+el usuario 0 es admin (admin@seed.tradeco). Los índices se crean al final,
+que es más rápido que mantenerlos durante la carga.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+from config import Config
+from models.indexes import sync_indexes
+from models.product import Product
+from models.stats import Stats
+from utils.image_pipeline import UPLOAD_URL_PREFIX, process_image
+from utils.password_hasher import password_hasher
+
+PASSWORD = 'Seed1234'
+ADMIN_EMAIL = 'admin@seed.tradeco'
+
+TIPOS_POR_CATEGORIA = {
+    'Remeras': ['remera', 'camisa', 'musculosa', 'chomba'],
+    'Pantalones': ['pantalón', 'jean', 'bermuda', 'jogger'],
+    'Abrigos': ['campera', 'buzo', 'chaleco', 'sweater', 'tapado'],
+    'Calzado': ['zapatillas', 'botas', 'sandalias', 'mocasines'],
+    'Vestidos': ['vestido', 'pollera', 'enterito'],
+    'Accesorios': ['bufanda', 'mochila', 'gorra', 'cinturón', 'cartera'],
+}
+# Participación de cada categoría en el catálogo
+PESO_CATEGORIA = {'Remeras': 30, 'Pantalones': 20, 'Abrigos': 18, 'Calzado': 14,
+                  'Vestidos': 10, 'Accesorios': 8}
+# Precio mediano por categoría (la dispersión es log-normal)
+PRECIO_MEDIANO = {'Remeras': 6000, 'Pantalones': 12000, 'Abrigos': 25000, 'Calzado': 30000,
+                  'Vestidos': 15000, 'Accesorios': 5000}
+TALLAS = {
+    'Calzado': (['36', '37', '38', '39', '40', '41', '42', '43', '44'], [3, 6, 10, 12, 13, 12, 10, 6, 3]),
+    'Accesorios': (['Único'], [1]),
+}
+TALLAS_ROPA = (['XS', 'S', 'M', 'L', 'XL', 'XXL'], [5, 18, 32, 27, 13, 5])
+ESTADOS = (['disponible', 'vendido', 'reservado'], [85, 10, 5])
+
+MATERIALES = ['cuero', 'algodón', 'lino', 'jean', 'lana', 'seda', 'gabardina', 'corderoy', 'polar', 'gamuza']
+COLORES = ['negro', 'blanco', 'azul', 'rojo', 'verde', 'beige', 'gris', 'marrón', 'bordó', 'celeste']
+ESTILOS = ['vintage', 'oversize', 'clásico', 'deportivo', 'elegante', 'urbano', 'casual']
+CONDICIONES = ['como nuevo', 'en muy buen estado', 'con poco uso', 'usado pero impecable', 'nuevo con etiqueta']
+MARCAS = ['Adidas', 'Nike', 'Zara', 'Levi\'s', 'Topper', 'Kosiuko', 'Rapsodia', 'Akiabara', 'sin marca']
+NOMBRES = ['Lucía', 'Mateo', 'Valentina', 'Santiago', 'Camila', 'Benjamín', 'Sofía', 'Joaquín',
+           'Martina', 'Tomás', 'Julieta', 'Thiago', 'Catalina', 'Lautaro', 'Florencia', 'Nicolás']
+APELLIDOS = ['González', 'Rodríguez', 'Fernández', 'López', 'Martínez', 'García', 'Pérez',
+             'Romero', 'Sánchez', 'Díaz', 'Álvarez', 'Torres', 'Ruiz', 'Gómez', 'Acosta']
+
+CATEGORIAS = list(PESO_CATEGORIA)
+PESOS = list(PESO_CATEGORIA.values())
+
+
+def random_product(rng=random, categoria=None):
+    """Datos de un producto como los enviaría el formulario de publicación"""
+    categoria = categoria or rng.choices(CATEGORIAS, PESOS)[0]
+    tipo = rng.choice(TIPOS_POR_CATEGORIA[categoria])
+    nombre = f"{tipo.capitalize()} {rng.choice(MATERIALES)} {rng.choice(COLORES)}"
+    if rng.random() < 0.5:
+        nombre += f" {rng.choice(ESTILOS)}"
+    descripcion = (f"{tipo.capitalize()} {rng.choice(MARCAS)} {rng.choice(CONDICIONES)}, "
+                   f"estilo {rng.choice(ESTILOS)}. Ideal para combinar con "
+                   f"{rng.choice(TIPOS_POR_CATEGORIA[rng.choice(CATEGORIAS)])} {rng.choice(COLORES)}.")
+    tallas, pesos = TALLAS.get(categoria, TALLAS_ROPA)
+    precio = PRECIO_MEDIANO[categoria] * rng.lognormvariate(0, 0.6)
+    return {
+        'nombre': nombre,
+        'descripcion': descripcion,
+        'precio': max(500, round(precio, -2)),
+        'talla': rng.choices(tallas, pesos)[0],
+        'categoria': categoria
+    }
+
+
+def days_ago(rng, mean_days=90, max_days=730):
+    """Antigüedad sesgada hacia lo reciente (exponencial, recortada)"""
+    return min(rng.expovariate(1 / mean_days), max_days)
+
+
+def pick_seller(rng, sellers):
+    """Vendedor con distribución muy sesgada: los primeros publican casi todo"""
+    return sellers[int(len(sellers) * rng.random() ** 3)]
+
+
+def user_email(index):
+    return ADMIN_EMAIL if index == 0 else f'usuario{index}@seed.tradeco'
+
+
+def user_document(rng, index, user_id, password_hash, now):
+    created_at = now - timedelta(days=days_ago(rng, mean_days=180))
+    return {
+        '_id': user_id,
+        'username': 'admin_seed' if index == 0 else f'usuario{index}',
+        'email': user_email(index),
+        'password': password_hash,
+        'nombre': f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}",
+        'telefono': '',
+        'direccion': '',
+        'role': 'admin' if index == 0 else 'usuario',
+        'created_at': created_at,
+        'updated_at': created_at,
+        'active': rng.random() > 0.03
+    }
+
+
+def product_document(rng, product_model, sellers, images, now):
+    user_id, username = pick_seller(rng, sellers)
+    data = random_product(rng)
+    data['username'] = username
+    if images:
+        data['imagen_url'], variants = rng.choice(images)
+    document = product_model._build_document(data, user_id, now - timedelta(days=days_ago(rng)))
+    document['estado'] = rng.choices(*ESTADOS)[0]
+    if images:
+        document['imagen_variants'] = variants
+    return document
+
+
+# Estado de cada proceso del pool (lo arma _init_worker después del fork)
+_worker = {}
+
+
+def _init_worker(uri, db_name, db, context):
+    if db is None:
+        db = MongoClient(uri)[db_name]
+    _worker.update(context, db=db, product_model=Product(db))
+
+
+def _insert_chunk(task):
+    """Generar e insertar un bloque; la semilla depende del inicio, no del proceso"""
+    kind, start, count, seed = task
+    rng = random.Random(seed * 1_000_003 + start)
+    db = _worker['db']
+    if kind == 'users':
+        documents = [
+            user_document(rng, index, _worker['user_ids'][index], _worker['password_hash'], _worker['now'])
+            for index in range(start, start + count)
+        ]
+        db.users.insert_many(documents, ordered=False)
+    else:
+        documents = [
+            product_document(rng, _worker['product_model'], _worker['sellers'], _worker['images'], _worker['now'])
+            for _ in range(count)
+        ]
+        db.products.insert_many(documents, ordered=False)
+    return count
+
+
+def _run(kind, total, db, context, workers, chunk_size, seed, uri, log):
+    tasks = [(kind, start, min(chunk_size, total - start), seed)
+             for start in range(0, total, chunk_size)]
+    context = dict(context, now=datetime.utcnow())
+    started = time.perf_counter()
+    done = 0
+    step = max(1, len(tasks) // 10)
+    
+    def report(index, count):
+        nonlocal done
+        done += count
+        if (index + 1) % step == 0 or done == total:
+            elapsed = time.perf_counter() - started
+            log(f"  {kind}: {done}/{total} ({done / elapsed:,.0f}/s)")
+    
+    if workers <= 1:
+        # En el mismo proceso (sirve también con una db que no se puede reabrir)
+        _init_worker(uri, db.name, db, context)
+        for index, task in enumerate(tasks):
+            report(index, _insert_chunk(task))
+        return done
+    
+    with multiprocessing.Pool(workers, _init_worker, (uri, db.name, None, context)) as pool:
+        for index, count in enumerate(pool.imap_unordered(_insert_chunk, tasks)):
+            report(index, count)
+    return done
+
+
+def seed_users(db, count, password=PASSWORD, workers=1, chunk_size=5000, seed=42,
+               uri=None, log=print):
+    """
+    Insertar count usuarios (el 0 es admin). bcrypt se calcula una sola vez:
+    todos comparten la contraseña. Devuelve [(user_id, username)] para los productos.
+    """
+    user_ids = [ObjectId() for _ in range(count)]
+    context = {'user_ids': user_ids, 'password_hash': password_hasher.hash(password)}
+    _run('users', count, db, context, workers, chunk_size, seed, uri or Config.MONGODB_URI, log)
+    return [(str(user_id), 'admin_seed' if index == 0 else f'usuario{index}')
+            for index, user_id in enumerate(user_ids)]
+
+
+def seed_products(db, count, sellers, images=(), workers=1, chunk_size=5000, seed=42,
+                  uri=None, log=print):
+    """Insertar count productos repartidos entre sellers [(user_id, username)]"""
+    context = {'sellers': list(sellers), 'images': list(images)}
+    return _run('products', count, db, context, workers, chunk_size, seed, uri or Config.MONGODB_URI, log)
+
+
+def placeholder_images(count, upload_folder=None, seed=42):
+    """
+    Crear count imágenes de relleno (con sus variantes thumb/medium) en la
+    carpeta de uploads. Devuelve [(imagen_url, imagen_variants)].
+    """
+    from PIL import Image, ImageDraw
+    
+    upload_folder = upload_folder or Config.UPLOAD_FOLDER
+    os.makedirs(upload_folder, exist_ok=True)
+    rng = random.Random(seed)
+    sizes = {'thumb': Config.IMAGE_THUMB_SIZE, 'medium': Config.IMAGE_MEDIUM_SIZE}
+    images = []
+    for index in range(count):
+        filename = f"seed_{index}.jpg"
+        color = tuple(rng.randrange(60, 220) for _ in range(3))
+        image = Image.new('RGB', (1200, 1200), color)
+        ImageDraw.Draw(image).text((40, 40), f"TRADEco #{index}", fill=(255, 255, 255))
+        image.save(os.path.join(upload_folder, filename), 'JPEG', quality=85)
+        variants = process_image(upload_folder, filename, sizes, Config.IMAGE_QUALITY)
+        images.append((f"{UPLOAD_URL_PREFIX}{filename}", variants))
+    return images
+
+
+def seed(db, users, products, password=PASSWORD, images=0, workers=1, chunk_size=5000,
+         seed=42, create_indexes=True, uri=None, log=print):
+    """Cargar usuarios, productos, índices y estadísticas. Devuelve los vendedores."""
+    started = time.perf_counter()
+    sellers = seed_users(db, users, password, workers, chunk_size, seed, uri, log)
+    image_list = placeholder_images(images, seed=seed) if images else ()
+    seed_products(db, products, sellers, image_list, workers, chunk_size, seed, uri, log)
+    
+    if create_indexes:
+        index_started = time.perf_counter()
+        sync_indexes(db, replace_text=True, log=lambda message: None)
+        log(f"  índices: {time.perf_counter() - index_started:.1f} s")
+    
+    Stats(db).rebuild()
+    log(f"✅ {users} usuarios y {products} productos en {time.perf_counter() - started:.1f} s")
+    return sellers
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cargar datos sintéticos para pruebas de carga')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--password', default=PASSWORD, help='Contraseña de todos los usuarios')
+    parser.add_argument('--images', type=int, default=0, help='Imágenes de relleno a repartir entre los productos')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=5000, help='Documentos por insert_many')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla (misma semilla, mismos datos)')
+    parser.add_argument('--db', default=Config.DB_NAME)
+    parser.add_argument('--drop', action='store_true', help='Borrar usuarios, productos y estadísticas antes')
+    parser.add_argument('--no-indexes', action='store_true', help='No crear los índices al final')
+    args = parser.parse_args()
+    
+    client = MongoClient(Config.MONGODB_URI)
+    db = client[args.db]
+    if args.drop:
+        for name in ('users', 'products', 'stats'):
+            db.drop_collection(name)
+    
+    print(f"📦 Cargando en {args.db} con {args.workers} procesos")
+    seed(db, args.users, args.products, args.password, args.images, args.workers,
+         args.chunk_size, args.seed, create_indexes=not args.no_indexes)
+    print(f"🔐 Admin: {ADMIN_EMAIL} / {args.password}")
+
+
+if __name__ == '__main__':
+    main()
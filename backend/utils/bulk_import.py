@@ -0,0 +1,103 @@
+import json
+import os
+import zipfile
+from config import Config
+from utils.validators import allowed_file, sanitize_filename
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines')
+
+
+def _parse_text(text):
+    """Interpretar un texto como arreglo JSON o como NDJSON (un objeto por línea)"""
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        payload = None
+    else:
+        if isinstance(payload, list) or (isinstance(payload, dict) and 'products' in payload):
+            return _unwrap(payload)
+    
+    items = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except ValueError:
+            raise ValueError(f'Línea {number} no es JSON válido')
+    return items
+
+
+def _unwrap(payload):
+    if isinstance(payload, dict):
+        payload = payload.get('products')
+    if not isinstance(payload, list):
+        raise ValueError('Se esperaba una lista de productos')
+    return payload
+
+
+def parse_bulk_request(request):
+    """
+    Leer los productos de una carga masiva.
+    Acepta un arreglo JSON, NDJSON o multipart con un campo/archivo 'products'
+    y un zip opcional 'imagenes'. Devuelve (items, archivo_zip o None).
+    """
+    mimetype = request.mimetype
+    
+    if mimetype == 'application/json':
+        payload = request.get_json(silent=True)
+        if payload is None:
+            raise ValueError('JSON inválido')
+        return _unwrap(payload), None
+    
+    if mimetype in NDJSON_MIMETYPES:
+        return _parse_text(request.get_data(as_text=True)), None
+    
+    if mimetype == 'multipart/form-data':
+        if 'products' in request.files:
+            items = _parse_text(request.files['products'].read().decode('utf-8'))
+        elif request.form.get('products'):
+            items = _parse_text(request.form['products'])
+        else:
+            raise ValueError('Falta el campo products')
+        
+        archive = None
+        if 'imagenes' in request.files:
+            try:
+                archive = zipfile.ZipFile(request.files['imagenes'].stream)
+            except zipfile.BadZipFile:
+                raise ValueError('El archivo de imágenes no es un zip válido')
+        return items, archive
+    
+    raise ValueError('Formato no soportado (use JSON, NDJSON o multipart)')
+
+
+def index_archive(archive):
+    """Mapa nombre de archivo -> entrada del zip (ignorando carpetas)"""
+    if archive is None:
+        return {}
+    return {
+        os.path.basename(info.filename): info
+        for info in archive.infolist()
+        if not info.is_dir()
+    }
+
+
+def save_archive_image(archive, entries, name, prefix):
+    """
+    Extraer una imagen del zip a la carpeta de uploads.
+    Devuelve la URL pública o lanza ValueError si no se puede usar.
+    """
+    info = entries.get(os.path.basename(name))
+    if info is None:
+        raise ValueError(f'La imagen {name} no está en el archivo')
+    if not allowed_file(info.filename):
+        raise ValueError(f'Extensión de imagen no permitida: {name}')
+    if info.file_size > Config.MAX_FILE_SIZE:
+        raise ValueError(f'La imagen {name} supera el tamaño máximo')
+    
+    filename = f"{prefix}_{sanitize_filename(os.path.basename(name))}"
+    filepath = os.path.join(Config.UPLOAD_FOLDER, filename)
+    with archive.open(info) as source, open(filepath, 'wb') as target:
+        target.write(source.read(Config.MAX_FILE_SIZE + 1))
+    return f"/uploads/products/{filename}"
@@ -0,0 +1,63 @@
+import gzip
+from flask import request
+from config import Config
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se usa gzip
+    brotli = None
+
+
+def choose_encoding(accepted=None):
+    """
+    Elegir la codificación aceptada por el cliente (br > gzip).
+    accepted es un Accept de werkzeug; por defecto, el del request de Flask.
+    """
+    if accepted is None:
+        accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_body(body, encoding):
+    """Comprimir un cuerpo con la codificación elegida"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=Config.COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=Config.COMPRESS_GZIP_LEVEL)
+
+
+def compress_response(response):
+    """Comprimir respuestas JSON que superan el umbral configurado"""
+    if (response.direct_passthrough
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < Config.COMPRESS_MIN_SIZE:
+        return response
+    
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+    
+    response.set_data(compress_body(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    
+    # La representación comprimida necesita su propio ETag
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+    
+    return response
+
+
+def init_compression(app):
+    """Registrar la compresión de respuestas en la app"""
+    app.after_request(compress_response)
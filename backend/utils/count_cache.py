@@ -0,0 +1,75 @@
+import threading
+import time
+from utils.cache import LRUCache
+
+
+class CountCache:
+    """
+    Cache de conteos aproximados.
+    Devuelve el último valor conocido y, cuando venció, lo recalcula en
+    segundo plano para no bloquear la petición con un count costoso.
+    Las claves salen de filtros que elige el cliente, así que los valores se
+    guardan en un LRUCache acotado: maxsize entradas, que se descartan
+    del todo después de max_stale segundos sin refrescarse.
+    """
+    
+    def __init__(self, ttl, maxsize, max_stale=None):
+        self.ttl = ttl
+        # (valor, timestamp) por clave
+        self._values = LRUCache(maxsize, max_stale if max_stale is not None else ttl * 10)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+    
+    def get(self, key, compute):
+        """Obtener el conteo para key, calculándolo con compute() si hace falta"""
+        cached = self._values.get(key)
+        
+        if cached is None:
+            # Primera vez (o descartado): no hay valor previo que devolver
+            value = compute()
+            self._values.set(key, (value, time.monotonic()))
+            return value
+        
+        value, stored_at = cached
+        if time.monotonic() - stored_at > self.ttl:
+            self._refresh_async(key, compute)
+        return value
+    
+    def peek(self, key):
+        """Último valor conocido para key (aunque esté vencido) o None"""
+        cached = self._values.get(key)
+        return cached[0] if cached else None
+    
+    def put(self, key, value):
+        """Guardar un conteo calculado fuera del cache (p. ej. por el driver async)"""
+        self._values.set(key, (value, time.monotonic()))
+    
+    def _refresh_async(self, key, compute):
+        """Recalcular un conteo vencido en un hilo aparte (uno por clave)"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        
+        def worker():
+            try:
+                value = compute()
+                self._values.set(key, (value, time.monotonic()))
+            except Exception as e:
+                print(f"⚠️ Error al refrescar conteo: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def invalidate(self, key=None):
+        """Descartar un conteo (o todos si no se indica clave)"""
+        if key is None:
+            self._values.clear()
+        else:
+            self._values.invalidate(key)
+    
+    def stats(self):
+        """Contadores de uso (los del LRUCache de los valores)"""
+        return self._values.stats()
@@ -0,0 +1,89 @@
+import os
+import threading
+from datetime import datetime
+from pymongo import MongoClient
+from pymongo.database import Database
+
+
+def mongo_now():
+    """
+    datetime.utcnow() truncado a milisegundos, la precisión con la que MongoDB
+    guarda las fechas. Los documentos que se devuelven sin releerlos quedan
+    iguales a lo que se lee después (y también sus ETag y Last-Modified).
+    """
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+class MongoConnection:
+    """
+    Conexión a MongoDB creada de forma perezosa y por proceso.
+    El MongoClient se abre en el primer uso; si el proceso cambió (fork de
+    gunicorn con --preload) se abre uno nuevo en vez de reutilizar el del
+    padre, que pymongo no soporta.
+    """
+    
+    def __init__(self, uri, db_name, **client_options):
+        self.uri = uri
+        self.db_name = db_name
+        self.client_options = client_options
+        self._lock = threading.Lock()
+        self._client = None
+        self._pid = None
+    
+    def client(self):
+        """MongoClient del proceso actual"""
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                # El cliente heredado del padre no se cierra: sus sockets son del padre
+                self._client = MongoClient(self.uri, **self.client_options)
+                self._pid = os.getpid()
+            return self._client
+    
+    def database(self):
+        return self.client()[self.db_name]
+    
+    def ping(self):
+        """Verificar la conexión (lanza una excepción de pymongo si falla)"""
+        self.client().admin.command('ping')
+    
+    def close(self):
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._pid = None
+
+
+class LazyCollection:
+    """Colección que se resuelve contra el cliente del proceso en cada uso"""
+    
+    def __init__(self, connection, name):
+        self._connection = connection
+        self.name = name
+    
+    def __getattr__(self, attr):
+        return getattr(self._connection.database()[self.name], attr)
+
+
+class LazyDatabase:
+    """
+    Base de datos perezosa con la misma interfaz que la de pymongo:
+    db.products devuelve una LazyCollection y los métodos de Database
+    (command, list_collection_names...) se delegan a la base real.
+    Se puede crear y pasar a los modelos sin abrir ninguna conexión.
+    """
+    
+    def __init__(self, connection):
+        self._connection = connection
+        self.name = connection.db_name
+    
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if hasattr(Database, name):
+            return getattr(self._connection.database(), name)
+        return LazyCollection(self._connection, name)
+    
+    def __getitem__(self, name):
+        return LazyCollection(self._connection, name)
@@ -0,0 +1,47 @@
+import os
+import queue
+import threading
+from utils.image_pipeline import remove_image_files
+
+
+class FileCleanupQueue:
+    """
+    Cola de borrado de imágenes en segundo plano.
+    Las rutas encolan los archivos a eliminar y responden sin esperar al disco.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+    
+    def _get_queue(self):
+        with self._lock:
+            if self._queue is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                threading.Thread(target=self._worker, args=(self._queue,), daemon=True).start()
+            return self._queue
+    
+    def _worker(self, pending):
+        while True:
+            imagen_url, variants = pending.get()
+            try:
+                remove_image_files(imagen_url, variants)
+            except Exception as e:
+                print(f"⚠️ Error al eliminar {imagen_url}: {e}")
+            finally:
+                pending.task_done()
+    
+    def enqueue(self, imagen_url, variants=None):
+        """Encolar la eliminación de una imagen y sus variantes"""
+        if imagen_url or variants:
+            self._get_queue().put((imagen_url, variants))
+    
+    def pending(self):
+        """Cantidad de archivos esperando ser eliminados"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+
+# Instancia compartida por la aplicación
+file_cleanup = FileCleanupQueue()
@@ -0,0 +1,109 @@
+import hashlib
+from datetime import timezone
+from flask import Response, request
+from werkzeug.http import http_date, parse_date, parse_etags
+from config import Config
+
+# Sufijos que compress_response agrega al ETag de la representación comprimida
+ENCODINGS = ('br', 'gzip')
+
+
+def make_etag(*parts):
+    """ETag (débil) a partir de lo que determina la representación"""
+    raw = "|".join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+
+def catalog_validators(version, args=()):
+    """
+    (etag, last_modified) de una lectura del catálogo: versión del catálogo
+    más la query string. None si no hay versión (modelo sin Stats).
+    """
+    if version is None:
+        return None
+    number, updated_at = version
+    return make_etag('catalog', number, updated_at, sorted(args)), updated_at
+
+
+def document_validators(kind, document):
+    """(etag, last_modified) de un documento según su updated_at"""
+    updated_at = document.get('updated_at') or document.get('created_at')
+    return make_etag(kind, document['_id'], updated_at), updated_at
+
+
+def static_validators(kind, data):
+    """(etag, None) de datos que solo cambian con un deploy"""
+    return make_etag(kind, data), None
+
+
+def catalog_policy():
+    """Listados, detalle y perfiles: el navegador revalida, el proxy guarda unos segundos"""
+    return (f'public, max-age={Config.CATALOG_MAX_AGE}, '
+            f's-maxage={Config.CATALOG_SHARED_MAX_AGE}')
+
+
+def static_policy():
+    """Datos fijos (categorías)"""
+    return f'public, max-age={Config.CATEGORIES_MAX_AGE}'
+
+
+def _matching_etag(if_none_match, etag):
+    """Tag de If-None-Match que corresponde a etag o a sus variantes comprimidas"""
+    tags = parse_etags(if_none_match)
+    if tags.star_tag:
+        return etag
+    for candidate in (etag, *(f"{etag}-{encoding}" for encoding in ENCODINGS)):
+        if tags.contains_weak(candidate):
+            return candidate
+    return None
+
+
+def fresh_etag(headers, validators):
+    """
+    ETag que el cliente ya tiene (para devolverlo en el 304) o None si hay
+    que responder completo. If-None-Match manda sobre If-Modified-Since.
+    headers puede ser el de Flask o el de Starlette.
+    """
+    if validators is None:
+        return None
+    etag, last_modified = validators
+    
+    if_none_match = headers.get('If-None-Match')
+    if if_none_match:
+        return _matching_etag(if_none_match, etag)
+    
+    since = parse_date(headers.get('If-Modified-Since'))
+    if since is not None and last_modified is not None:
+        modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        if modified <= since:
+            return etag
+    return None
+
+
+def validator_headers(validators, policy, etag=None):
+    """Cabeceras ETag, Last-Modified y Cache-Control de una respuesta cacheable"""
+    if validators is None:
+        return {}
+    headers = {
+        'ETag': f'W/"{etag or validators[0]}"',
+        'Cache-Control': policy
+    }
+    if validators[1] is not None:
+        headers['Last-Modified'] = http_date(validators[1])
+    return headers
+
+
+def not_modified(validators, policy):
+    """304 si el request de Flask ya tiene esta versión; None si no"""
+    etag = fresh_etag(request.headers, validators)
+    if etag is None:
+        return None
+    response = Response(status=304, headers=validator_headers(validators, policy, etag))
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def cacheable(response, validators, policy):
+    """Agregar los validadores y la política de cache a una respuesta de Flask"""
+    response.headers.update(validator_headers(validators, policy))
+    return response
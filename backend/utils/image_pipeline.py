@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from config import Config
+
+UPLOAD_URL_PREFIX = '/uploads/products/'
+
+
+def process_image(upload_folder, filename, sizes, quality):
+    """
+    Generar las variantes de una imagen subida (se ejecuta en otro proceso).
+    Por cada tamaño crea una versión WebP y otra JPEG/PNG como respaldo.
+    Devuelve {nombre: {'webp': url, 'fallback': url}}.
+    """
+    from PIL import Image, ImageOps
+    
+    stem = os.path.splitext(filename)[0]
+    variants = {}
+    
+    with Image.open(os.path.join(upload_folder, filename)) as original:
+        image = ImageOps.exif_transpose(original)
+        has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+        
+        for name, size in sizes.items():
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.LANCZOS)
+            
+            webp_name = f"{stem}__{name}.webp"
+            resized.save(os.path.join(upload_folder, webp_name), 'WEBP', quality=quality, method=4)
+            
+            if has_alpha:
+                fallback_name = f"{stem}__{name}.png"
+                resized.save(os.path.join(upload_folder, fallback_name), 'PNG', optimize=True)
+            else:
+                fallback_name = f"{stem}__{name}.jpg"
+                resized.save(os.path.join(upload_folder, fallback_name), 'JPEG',
+                             quality=quality, optimize=True, progressive=True)
+            
+            variants[name] = {
+                'webp': f"{UPLOAD_URL_PREFIX}{webp_name}",
+                'fallback': f"{UPLOAD_URL_PREFIX}{fallback_name}"
+            }
+    
+    return variants
+
+
+def remove_image_files(imagen_url, variants=None):
+    """Eliminar del disco una imagen subida y sus variantes"""
+    urls = [imagen_url] if imagen_url else []
+    for formats in (variants or {}).values():
+        urls.extend(formats.values())
+    
+    for url in urls:
+        filename = url.replace(UPLOAD_URL_PREFIX, '')
+        filepath = os.path.join(Config.UPLOAD_FOLDER, filename)
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+
+class ImagePipeline:
+    """
+    Cola de procesamiento de imágenes en un pool de procesos.
+    El request solo guarda el original; las variantes se generan en segundo
+    plano y se registran en el producto cuando están listas.
+    """
+    
+    def __init__(self, workers):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._pid = None
+        self._executor = None
+    
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # 'spawn' evita heredar hilos y conexiones del proceso web
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._pid = os.getpid()
+            return self._executor
+    
+    def submit(self, product_model, product_id, imagen_url):
+        """Encolar la generación de variantes para la imagen de un producto"""
+        if not imagen_url or not imagen_url.startswith(UPLOAD_URL_PREFIX):
+            return None
+        
+        filename = imagen_url.replace(UPLOAD_URL_PREFIX, '')
+        sizes = {
+            'thumb': Config.IMAGE_THUMB_SIZE,
+            'medium': Config.IMAGE_MEDIUM_SIZE
+        }
+        try:
+            future = self._get_executor().submit(
+                process_image,
+                Config.UPLOAD_FOLDER,
+                filename,
+                sizes,
+                Config.IMAGE_QUALITY
+            )
+        except Exception as e:
+            # Pool roto: se recrea en el próximo envío; el original ya está guardado
+            print(f"❌ No se pudo encolar la imagen {filename}: {e}")
+            with self._lock:
+                self._executor = None
+            return None
+        
+        def done(f):
+            try:
+                variants = f.result()
+                if not product_model.set_image_variants(product_id, imagen_url, variants):
+                    # La imagen cambió o el producto se eliminó mientras tanto
+                    remove_image_files(None, variants)
+            except Exception as e:
+                print(f"❌ Error al procesar imagen {filename}: {e}")
+        
+        future.add_done_callback(done)
+        return future
+
+
+# Instancia compartida por la aplicación
+image_pipeline = ImagePipeline(Config.IMAGE_WORKERS)
@@ -0,0 +1,202 @@
+"""
+Invalidación de caches entre workers con un change stream de MongoDB.
+
+Cada worker sigue en un hilo propio los cambios de las colecciones con
+regiones registradas (products, users, stats) y llama a sus handlers, que
+descartan lo cacheado de ese documento. También recibe los cambios que hizo
+él mismo: invalidar dos veces no cuesta nada.
+
+El resume token se guarda en MongoDB (colección invalidation_tokens, uno
+por proceso) para retomar el stream después de un reinicio o una
+desconexión. El id es INVALIDATION_CONSUMER si está configurado (tiene que
+ser único por proceso, p. ej. un worker por contenedor) o hostname:pid: los
+workers de un mismo host no pueden compartir un token. Con hostname:pid un
+worker reiniciado empieza con otro id, y como también empieza con los caches
+vacíos, no pierde nada; los tokens de procesos terminados vencen solos
+(índice TTL). Si el token ya no está en el oplog se vacían todos los caches
+y se sigue desde el momento actual.
+
+Requiere un replica set; alcanza con uno local de un solo nodo.
+"""
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from pymongo.errors import OperationFailure
+from config import Config
+from utils.metrics import CACHE_INVALIDATIONS
+
+# Operaciones sobre un documento (drop y rename afectan a toda la colección)
+DOCUMENT_OPERATIONS = ('insert', 'update', 'replace', 'delete')
+
+# El resume token salió del oplog o no es válido: se perdieron eventos
+RESUME_ERRORS = (260, 280, 286)  # InvalidResumeToken, ChangeStreamFatalError, ChangeStreamHistoryLost
+# $changeStream solo existe en replica sets y clusters
+NOT_A_REPLICA_SET = 40573
+
+
+class InvalidationBus:
+    """
+    Bus de invalidación de un proceso.
+    Los handlers reciben (document_id, fields): el ID como texto y los campos
+    de primer nivel que cambió un update, o None cuando no se sabe (alta,
+    reemplazo, baja). Con document_id None hay que descartar toda la región.
+    """
+    
+    def __init__(self, db, consumer=None):
+        self.db = db
+        self._configured_consumer = consumer or Config.INVALIDATION_CONSUMER
+        self.consumer = None  # se define en ensure_started, ya en el worker
+        self._regions = {}  # colección -> [handler]
+        self._lock = threading.Lock()
+        self._pid = None
+        self._stop = None
+        self._token = None
+        self._saved_token = None
+        self.events = 0
+    
+    def register(self, collection, handler):
+        """Registrar una región de cache para los cambios de una colección"""
+        self._regions.setdefault(collection, []).append(handler)
+    
+    def ensure_started(self):
+        """
+        Arrancar el hilo del stream en este proceso. Se llama en cada request
+        (before_request) y en el lifespan ASGI: los workers de gunicorn
+        arrancan el suyo después del fork.
+        """
+        with self._lock:
+            if self._pid == os.getpid() or not self._regions:
+                return
+            self._pid = os.getpid()
+            consumer = self._consumer_id()
+            if consumer != self.consumer:
+                # Proceso nuevo: el token en memoria (si hay) era de otro consumidor
+                self.consumer = consumer
+                self._token = None
+                self._saved_token = None
+            self._stop = threading.Event()
+            threading.Thread(target=self._run, args=(self._stop,), daemon=True,
+                             name='invalidation-bus').start()
+    
+    def _consumer_id(self):
+        """Id del resume token de este proceso"""
+        return self._configured_consumer or f"{socket.gethostname()}:{os.getpid()}"
+    
+    def stop(self):
+        """Detener el hilo (guarda el último token)"""
+        with self._lock:
+            if self._stop is not None:
+                self._stop.set()
+            self._pid = None
+    
+    def _pipeline(self):
+        return [
+            {"$match": {"$or": [
+                {"ns.coll": {"$in": list(self._regions)}},
+                {"operationType": "dropDatabase"}
+            ]}},
+            # Sin fullDocument: alcanza con el ID y los nombres de los campos
+            {"$project": {"operationType": 1, "ns": 1, "documentKey": 1, "updateDescription": 1}}
+        ]
+    
+    def _run(self, stop):
+        if self._token is None:
+            self._token = self._load_token()
+        
+        while not stop.is_set():
+            try:
+                self._follow(stop)
+            except OperationFailure as e:
+                if e.code == NOT_A_REPLICA_SET:
+                    print(f"⚠️ Bus de invalidación desactivado (MongoDB no es un replica set): {e}")
+                    return
+                if e.code in RESUME_ERRORS and self._token is not None:
+                    print(f"⚠️ El resume token ya no sirve, se vacían los caches: {e}")
+                    self._token = None
+                    self._notify(None, None, None)
+                    continue
+                print(f"⚠️ Change stream interrumpido: {e}")
+                stop.wait(Config.INVALIDATION_RETRY_SECONDS)
+            except Exception as e:
+                print(f"⚠️ Change stream interrumpido: {e}")
+                stop.wait(Config.INVALIDATION_RETRY_SECONDS)
+        
+        self._save_token()
+    
+    def _follow(self, stop):
+        """Seguir el stream desde el último token hasta que se pida parar"""
+        saved_at = time.monotonic()
+        with self.db.watch(self._pipeline(), resume_after=self._token,
+                           max_await_time_ms=1000) as stream:
+            while not stop.is_set() and stream.alive:
+                change = stream.try_next()
+                if change is None:
+                    continue
+                
+                if change["operationType"] == "invalidate":
+                    # La base se eliminó: el stream termina y no se puede retomar
+                    self._token = None
+                    self._notify(None, None, None)
+                    return
+                
+                self._dispatch(change)
+                self._token = stream.resume_token
+                if time.monotonic() - saved_at >= Config.INVALIDATION_TOKEN_INTERVAL:
+                    self._save_token()
+                    saved_at = time.monotonic()
+    
+    def _dispatch(self, change):
+        operation = change["operationType"]
+        collection = change.get("ns", {}).get("coll")
+        document_id = None
+        fields = None
+        
+        if operation in DOCUMENT_OPERATIONS:
+            document_id = str(change["documentKey"]["_id"])
+        if operation == "update":
+            description = change.get("updateDescription") or {}
+            changed = [*description.get("updatedFields", {}), *description.get("removedFields", [])]
+            fields = {name.split(".")[0] for name in changed}
+        
+        self._notify(collection, document_id, fields)
+    
+    def _notify(self, collection, document_id, fields):
+        """Avisar a las regiones de una colección (o a todas si collection es None)"""
+        if collection is None:
+            targets = list(self._regions.items())
+        else:
+            targets = [(collection, self._regions.get(collection, []))]
+        
+        for name, handlers in targets:
+            CACHE_INVALIDATIONS.labels(name).inc()
+            for handler in handlers:
+                try:
+                    handler(document_id, fields)
+                except Exception as e:
+                    print(f"⚠️ Error al invalidar cache de {name}: {e}")
+        self.events += 1
+    
+    def _load_token(self):
+        try:
+            document = self.db.invalidation_tokens.find_one({"_id": self.consumer})
+        except Exception as e:
+            print(f"⚠️ No se pudo leer el resume token: {e}")
+            return None
+        self._saved_token = document.get("token") if document else None
+        return self._saved_token
+    
+    def _save_token(self):
+        token = self._token
+        if token is None or token == self._saved_token:
+            return
+        try:
+            self.db.invalidation_tokens.update_one(
+                {"_id": self.consumer},
+                {"$set": {"token": token, "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+            self._saved_token = token
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar el resume token: {e}")
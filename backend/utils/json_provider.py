@@ -0,0 +1,69 @@
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa el json estándar
+    orjson = None
+
+
+def _default(o):
+    """Serializar tipos de Mongo y fechas que json no conoce"""
+    if isinstance(o, ObjectId):
+        return str(o)
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, Decimal128):
+        return str(o.to_decimal())
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """json estándar, con ObjectId y fechas en formato ISO 8601"""
+    
+    default = staticmethod(_default)
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Proveedor JSON basado en orjson.
+    Serializa datetime de forma nativa (ISO 8601, igual que isoformat) y
+    ObjectId a través de _default, directamente a bytes.
+    """
+    
+    mimetype = "application/json"
+    option = orjson.OPT_NON_STR_KEYS if orjson else 0
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self.option).decode("utf-8")
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.option
+        if self._app.debug:
+            option |= orjson.OPT_INDENT_2
+        body = orjson.dumps(obj, default=_default, option=option)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def init_json_provider(app, name):
+    """Configurar el proveedor JSON de la app ('orjson' o 'default')"""
+    if name == "orjson" and orjson is not None:
+        app.json_provider_class = OrjsonProvider
+    else:
+        app.json_provider_class = MongoJSONProvider
+    app.json = app.json_provider_class(app)
@@ -0,0 +1,233 @@
+"""
+Métricas en formato Prometheus (GET /api/metrics).
+
+- Latencia de cada petición por blueprint y ruta (plantilla, no la URL real),
+  como histograma: p50/p99 por ruta con histogram_quantile.
+- Latencia de cada comando de MongoDB por colección y operación, con un
+  CommandListener de pymongo (sirve también para motor).
+- Conexiones del pool de MongoDB (abiertas y en uso) con un
+  ConnectionPoolListener.
+- Tamaño, hits y misses de los caches en memoria, leídos al momento del scrape.
+- Cambios recibidos por el bus de invalidación entre workers.
+
+Con varios workers de gunicorn, definir PROMETHEUS_MULTIPROC_DIR (un
+directorio vacío por despliegue) para que /api/metrics sume los de todos.
+"""
+import os
+import re
+import threading
+import time
+
+from flask import Response, g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry,
+                               Counter, Gauge, Histogram, generate_latest)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from pymongo import monitoring
+
+REQUEST_LATENCY = Histogram(
+    'tradeco_http_request_duration_seconds',
+    'Duración de las peticiones HTTP',
+    ['blueprint', 'route', 'method'],
+    buckets=(.005, .01, .025, .05, .075, .1, .25, .5, .75, 1, 2.5, 5, 10)
+)
+
+REQUESTS = Counter(
+    'tradeco_http_requests_total',
+    'Peticiones HTTP atendidas',
+    ['blueprint', 'route', 'method', 'status']
+)
+
+MONGO_COMMAND_LATENCY = Histogram(
+    'tradeco_mongo_command_duration_seconds',
+    'Duración de los comandos de MongoDB',
+    ['collection', 'command'],
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5)
+)
+
+MONGO_COMMAND_FAILURES = Counter(
+    'tradeco_mongo_command_failures_total',
+    'Comandos de MongoDB que terminaron con error',
+    ['collection', 'command']
+)
+
+MONGO_POOL_CONNECTIONS = Gauge(
+    'tradeco_mongo_pool_connections',
+    'Conexiones del pool de MongoDB (open: abiertas, in_use: prestadas)',
+    ['address', 'state'],
+    multiprocess_mode='livesum'
+)
+
+MONGO_POOL_CHECKOUT_FAILURES = Counter(
+    'tradeco_mongo_pool_checkout_failures_total',
+    'Pedidos de conexión al pool que fallaron (timeout, pool cerrado...)',
+    ['address', 'reason']
+)
+
+CACHE_INVALIDATIONS = Counter(
+    'tradeco_cache_invalidation_events_total',
+    'Cambios recibidos por el bus de invalidación (change stream)',
+    ['collection']
+)
+
+# Comandos que no van contra una colección (el valor no es su nombre)
+_NO_COLLECTION = '-'
+_PATH_PARAM = re.compile(r'\{(\w+)(?::\w+)?\}')
+
+
+def observe_request(blueprint, route, method, status, seconds):
+    """Registrar una petición atendida (Flask o rutas async)"""
+    REQUEST_LATENCY.labels(blueprint, route, method).observe(seconds)
+    REQUESTS.labels(blueprint, route, method, str(status)).inc()
+
+
+def flask_route(path):
+    """Plantilla de Starlette ({id}) en el formato de Flask (<id>), para que
+    una misma ruta tenga las mismas etiquetas en los dos modos"""
+    return _PATH_PARAM.sub(r'<\1>', path)
+
+
+def _address(event):
+    host, port = event.address
+    return f"{host}:{port}"
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Latencia de los comandos por colección y operación"""
+    
+    def __init__(self):
+        # (conexión, request_id) -> colección: los eventos de fin no traen el comando
+        self._collections = {}
+        self._lock = threading.Lock()
+    
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if event.command_name == 'getMore':
+            collection = event.command.get('collection')
+        if not isinstance(collection, str):
+            collection = _NO_COLLECTION
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = collection
+    
+    def _finish(self, event):
+        with self._lock:
+            collection = self._collections.pop((event.connection_id, event.request_id), _NO_COLLECTION)
+        return collection
+    
+    def succeeded(self, event):
+        collection = self._finish(event)
+        MONGO_COMMAND_LATENCY.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+    
+    def failed(self, event):
+        collection = self._finish(event)
+        MONGO_COMMAND_LATENCY.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(collection, event.command_name).inc()
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Conexiones abiertas y en uso de cada pool (uno por servidor)"""
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.labels(_address(event), 'open').inc()
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.labels(_address(event), 'open').dec()
+    
+    def connection_check_out_started(self, event):
+        pass
+    
+    def connection_check_out_failed(self, event):
+        MONGO_POOL_CHECKOUT_FAILURES.labels(_address(event), event.reason).inc()
+    
+    def connection_checked_out(self, event):
+        MONGO_POOL_CONNECTIONS.labels(_address(event), 'in_use').inc()
+    
+    def connection_checked_in(self, event):
+        MONGO_POOL_CONNECTIONS.labels(_address(event), 'in_use').dec()
+
+
+class CacheCollector:
+    """
+    Estado de los caches en memoria, leído de LRUCache.stats() en cada scrape.
+    Es del proceso que responde: con varios workers cada uno tiene los suyos.
+    """
+    
+    def __init__(self):
+        self.caches = {}
+    
+    def collect(self):
+        size = GaugeMetricFamily('tradeco_cache_entries', 'Entradas en el cache', labels=['cache'])
+        hits = CounterMetricFamily('tradeco_cache_hits', 'Aciertos del cache', labels=['cache'])
+        misses = CounterMetricFamily('tradeco_cache_misses', 'Fallos del cache', labels=['cache'])
+        for name, cache in self.caches.items():
+            stats = cache.stats()
+            size.add_metric([name], stats['size'])
+            hits.add_metric([name], stats['hits'])
+            misses.add_metric([name], stats['misses'])
+        yield size
+        yield hits
+        yield misses
+
+
+# Un solo collector por proceso: create_app puede llamarse más de una vez
+cache_collector = CacheCollector()
+REGISTRY.register(cache_collector)
+
+_listeners = [CommandMetrics(), PoolMetrics()]
+
+
+def mongo_listeners():
+    """event_listeners para MongoClient / AsyncIOMotorClient"""
+    return list(_listeners)
+
+
+def _registry():
+    if not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        return REGISTRY
+    # Sumar los valores de todos los workers y agregar los caches de este
+    from prometheus_client import multiprocess
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(cache_collector)
+    return registry
+
+
+def init_metrics(app, caches):
+    """
+    Medir todas las peticiones de la app y exponer /api/metrics.
+    caches: {nombre: LRUCache} que se reportan en cada scrape.
+    """
+    cache_collector.caches = dict(caches)
+    
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+    
+    @app.after_request
+    def record_request(response):
+        started = g.pop('request_started', None)
+        # Sin plantilla (404) se agrupa todo en una etiqueta para no crear una por URL
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        if started is not None and route != '/api/metrics':
+            observe_request(request.blueprint or 'app', route, request.method,
+                            response.status_code, time.perf_counter() - started)
+        return response
+    
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics():
+        """Métricas en formato de texto de Prometheus"""
+        return Response(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
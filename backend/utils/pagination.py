@@ -0,0 +1,80 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from bson import ObjectId
+from bson.errors import InvalidId
+
+EPOCH = datetime(1970, 1, 1)
+
+# Órdenes de listado: nombre -> (campo, dirección). El _id desempata en la misma dirección.
+SORTS = {
+    "newest": ("created_at", -1),
+    "price_asc": ("precio", 1),
+    "price_desc": ("precio", -1),
+}
+
+
+def _to_millis(value):
+    """Convertir un datetime a milisegundos desde epoch (precisión de BSON)"""
+    delta = value.replace(tzinfo=None) - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000 + delta.microseconds // 1000
+
+
+def sort_spec(sort="newest"):
+    """Especificación de orden de Mongo para un orden de listado"""
+    field, direction = SORTS[sort]
+    return [(field, direction), ("_id", direction)]
+
+
+def encode_cursor(document, sort="newest"):
+    """
+    Generar un cursor opaco a partir del último documento de una página.
+    El cursor guarda el orden, el valor del campo ordenado y el _id.
+    """
+    field, _ = SORTS[sort]
+    if not document or document.get(field) is None:
+        return None
+    
+    if sort == "newest":
+        payload = {"t": _to_millis(document["created_at"])}
+    else:
+        payload = {"s": sort, "v": document[field]}
+    payload["id"] = str(document["_id"])
+    
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decodificar un cursor generado por encode_cursor.
+    Devuelve (orden, valor, ObjectId) o lanza ValueError si es inválido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if "t" in payload:
+            sort = "newest"
+            value = EPOCH + timedelta(milliseconds=int(payload["t"]))
+        else:
+            sort = payload["s"]
+            if sort not in SORTS:
+                raise ValueError(sort)
+            value = float(payload["v"])
+        return sort, value, ObjectId(payload["id"])
+    except (ValueError, TypeError, KeyError, InvalidId, UnicodeError) as e:
+        raise ValueError("Cursor inválido") from e
+
+
+def cursor_query(cursor, sort="newest"):
+    """Condición de Mongo para continuar después de la posición del cursor"""
+    cursor_sort, value, last_id = decode_cursor(cursor)
+    if cursor_sort != sort:
+        raise ValueError("El cursor no corresponde al orden solicitado")
+    
+    field, direction = SORTS[sort]
+    op = "$lt" if direction < 0 else "$gt"
+    return {"$or": [
+        {field: {op: value}},
+        {field: value, "_id": {op: last_id}}
+    ]}
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from config import Config
+
+
+class HasherBusyError(Exception):
+    """La cola de hashing está llena; la petición debe reintentarse más tarde"""
+
+
+class PasswordHasher:
+    """
+    Ejecuta bcrypt en un pool de hilos acotado.
+    bcrypt libera el GIL, así que los hilos del pool no bloquean al resto de
+    las peticiones; si hay más trabajos pendientes que el límite, falla rápido
+    con HasherBusyError en lugar de encolar indefinidamente.
+    """
+    
+    def __init__(self, rounds, workers, max_queue):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._reset()
+    
+    def _reset(self):
+        """Estado por proceso (se recrea después de un fork)"""
+        self._pid = os.getpid()
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._metrics = {
+            'completed': 0,
+            'rejected': 0,
+            'hash_ms_total': 0.0,
+            'hash_ms_max': 0.0,
+            'wait_ms_total': 0.0,
+            'wait_ms_max': 0.0
+        }
+    
+    def _get_executor(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix='bcrypt'
+                )
+            return self._executor
+    
+    def _run(self, fn, *args):
+        """Ejecutar fn en el pool midiendo espera en cola y duración"""
+        executor = self._get_executor()
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self._metrics['rejected'] += 1
+            raise HasherBusyError('Demasiadas operaciones de contraseña en curso')
+        
+        submitted_at = time.perf_counter()
+        
+        def job():
+            started_at = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished_at = time.perf_counter()
+                self._record((started_at - submitted_at) * 1000, (finished_at - started_at) * 1000)
+                slots.release()
+        
+        try:
+            future = executor.submit(job)
+        except RuntimeError:
+            slots.release()
+            raise
+        return future.result()
+    
+    def _record(self, wait_ms, hash_ms):
+        with self._lock:
+            metrics = self._metrics
+            metrics['completed'] += 1
+            metrics['wait_ms_total'] += wait_ms
+            metrics['wait_ms_max'] = max(metrics['wait_ms_max'], wait_ms)
+            metrics['hash_ms_total'] += hash_ms
+            metrics['hash_ms_max'] = max(metrics['hash_ms_max'], hash_ms)
+    
+    def hash(self, password):
+        """Hashear una contraseña con el costo configurado"""
+        return self._run(
+            lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+        )
+    
+    def check(self, password, hashed):
+        """Verificar una contraseña contra su hash"""
+        if isinstance(hashed, str):
+            hashed = hashed.encode('utf-8')
+        return self._run(lambda: bcrypt.checkpw(password.encode('utf-8'), hashed))
+    
+    def needs_rehash(self, hashed):
+        """True si el hash fue generado con un costo distinto al configurado"""
+        if isinstance(hashed, str):
+            hashed = hashed.encode('utf-8')
+        try:
+            return int(hashed.split(b'$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+    
+    def stats(self):
+        """Métricas de latencia de hashing y espera en cola"""
+        with self._lock:
+            metrics = dict(self._metrics)
+        completed = metrics['completed']
+        return {
+            'rounds': self.rounds,
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'completed': completed,
+            'rejected': metrics['rejected'],
+            'hash_ms_avg': round(metrics['hash_ms_total'] / completed, 2) if completed else 0.0,
+            'hash_ms_max': round(metrics['hash_ms_max'], 2),
+            'queue_wait_ms_avg': round(metrics['wait_ms_total'] / completed, 2) if completed else 0.0,
+            'queue_wait_ms_max': round(metrics['wait_ms_max'], 2)
+        }
+
+
+# Instancia compartida por la aplicación
+password_hasher = PasswordHasher(
+    Config.BCRYPT_ROUNDS,
+    Config.BCRYPT_WORKERS,
+    Config.BCRYPT_MAX_QUEUE
+)
@@ -0,0 +1,131 @@
+"""
+Revisión de planes de ejecución (explain) de MongoDB.
+Sirve para comprobar que una consulta usa índices: ni recorre la colección
+completa (COLLSCAN) ni ordena en memoria (SORT bloqueante) y, si la forma
+lo indica, que el índice elegido es el previsto.
+"""
+
+BLOCKING_STAGES = ("COLLSCAN", "SORT")
+
+# BadValue: entre otras cosas, un hint que no corresponde a ningún índice
+BAD_VALUE = 2
+
+
+def missing_hint(error):
+    """Si un OperationFailure se debe a que el índice del hint no existe"""
+    return error.code == BAD_VALUE and "hint" in str(error)
+
+
+def _walk(node):
+    """Recorrer un árbol de plan devolviendo sus etapas"""
+    if isinstance(node, list):
+        for child in node:
+            yield from _walk(child)
+        return
+    if not isinstance(node, dict):
+        return
+    
+    if "stage" in node:
+        yield node
+    # inputStage(s): planes clásicos; queryPlan: motor SBE (MongoDB 7+)
+    for key in ("inputStage", "inputStages", "queryPlan", "thenStage", "elseStage"):
+        if key in node:
+            yield from _walk(node[key])
+
+
+def _winning_plans(explain):
+    """Planes ganadores de un explain de find o de aggregate"""
+    if "queryPlanner" in explain:
+        yield explain["queryPlanner"]["winningPlan"]
+    for stage in explain.get("stages", []):
+        if "$cursor" in stage:
+            yield stage["$cursor"]["queryPlanner"]["winningPlan"]
+
+
+def plan_stages(explain):
+    """Nombres de todas las etapas de los planes ganadores"""
+    return [node["stage"] for plan in _winning_plans(explain) for node in _walk(plan)]
+
+
+def _key_pattern(keys):
+    return [(field, int(direction) if isinstance(direction, (int, float)) else direction)
+            for field, direction in keys]
+
+
+def uses_index(explain, index):
+    """
+    ¿Algún plan ganador recorre el índice previsto? index es la lista de
+    claves [(campo, dirección)] o el nombre (p. ej. el índice de texto).
+    """
+    for plan in _winning_plans(explain):
+        for node in _walk(plan):
+            if isinstance(index, str):
+                if node.get("indexName") == index:
+                    return True
+            elif "keyPattern" in node and \
+                    _key_pattern(node["keyPattern"].items()) == _key_pattern(index):
+                return True
+    return False
+
+
+def describe_index(index):
+    if isinstance(index, str):
+        return index
+    return "_".join(f"{field}_{direction}" for field, direction in index)
+
+
+# Etapas de agregación a partir de las cuales un $sort ordena resultados
+# agrupados (pocos) y no documentos de la colección
+GROUPING_STAGES = ("$group", "$bucket", "$bucketAuto", "$facet", "$count", "$sortByCount")
+
+
+def plan_problems(explain, allow=(), index=None):
+    """
+    Problemas de un plan: etapas COLLSCAN/SORT, $sort sobre documentos que
+    quedaron en el pipeline de agregación (no resueltos por el índice) y, con
+    index, no usar ese índice. allow acepta etapas puntuales. Devuelve una
+    lista vacía si el plan es bueno.
+    """
+    problems = [
+        stage for stage in plan_stages(explain)
+        if stage in BLOCKING_STAGES and stage not in allow
+    ]
+    for stage in explain.get("stages", []):
+        if any(name in stage for name in GROUPING_STAGES):
+            break
+        if "$sort" in stage and "$sort" not in allow:
+            problems.append("$sort")
+    if index is not None and not uses_index(explain, index):
+        problems.append(f"no usa {describe_index(index)}")
+    return problems
+
+
+def explain_shape(db, shape):
+    """
+    Ejecutar explain sobre una forma de consulta:
+    {collection, filter, projection, sort, hint, limit} para find, o
+    {collection, pipeline, hint} para aggregate. index (opcional) es el
+    índice que debe elegir el planificador.
+    """
+    collection = db[shape["collection"]]
+    hint = shape.get("hint")
+    
+    if "pipeline" in shape:
+        options = {"hint": hint} if hint else {}
+        return db.command("aggregate", collection.name, pipeline=shape["pipeline"],
+                          explain=True, **options)
+    
+    cursor = collection.find(shape.get("filter", {}), shape.get("projection"))
+    if shape.get("sort"):
+        cursor = cursor.sort(shape["sort"])
+    if hint:
+        cursor = cursor.hint(hint)
+    return cursor.limit(shape.get("limit", 20)).explain()
+
+
+def check_shapes(db, shapes):
+    """Verificar una lista de formas. Devuelve [(forma, problemas)]"""
+    return [
+        (shape, plan_problems(explain_shape(db, shape), shape.get("allow", ()), shape.get("index")))
+        for shape in shapes
+    ]
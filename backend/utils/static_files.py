@@ -0,0 +1,199 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from flask import Response, jsonify, request, send_file
+from werkzeug.security import safe_join
+from config import Config
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se sirve gzip
+    brotli = None
+
+# Los archivos subidos llevan timestamp y token (YYYYMMDD_HHMMSS_xxxxxxxx_) y
+# nunca cambian. Los anteriores, solo con timestamp, pudieron pisarse entre sí:
+# esos no se sirven como inmutables.
+TIMESTAMPED_FILENAME = re.compile(r'^\d{8}_\d{6}_[0-9a-f]{8}_')
+
+ONE_YEAR = 365 * 24 * 3600
+
+
+def _not_found():
+    return jsonify({'error': 'Archivo no encontrado'}), 404
+
+
+def _apply_upload_cache_policy(response, filename):
+    response.cache_control.public = True
+    if TIMESTAMPED_FILENAME.match(filename):
+        response.cache_control.max_age = ONE_YEAR
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.max_age = Config.UPLOADS_MAX_AGE
+    return response
+
+
+def serve_upload(upload_dir, filename):
+    """
+    Servir un archivo subido con validadores (ETag/Last-Modified), respuestas
+    304 y Range. Si hay un proxy inverso configurado, delega el envío con
+    X-Accel-Redirect (nginx) o X-Sendfile (USE_X_SENDFILE).
+    """
+    path = safe_join(upload_dir, filename)
+    if path is None:
+        return _not_found()
+    
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return _not_found()
+    
+    if Config.UPLOADS_ACCEL_REDIRECT:
+        # nginx resuelve condicionales y Range sobre el archivo real
+        response = Response(status=200)
+        response.headers['X-Accel-Redirect'] = Config.UPLOADS_ACCEL_REDIRECT + filename
+        response.headers['Content-Type'] = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response.last_modified = stat.st_mtime
+        return _apply_upload_cache_policy(response, filename)
+    
+    response = send_file(path, conditional=True, etag=True, last_modified=stat.st_mtime)
+    return _apply_upload_cache_policy(response, filename)
+
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+# Referencias a assets locales dentro del HTML (href="styles.css", src="api.js")
+ASSET_REFERENCE = re.compile(r'(href|src)="([^":?#]+\.(?:css|js))"')
+
+
+class AssetManifest:
+    """
+    Manifiesto de los archivos del frontend calculado al iniciar.
+    Cada CSS/JS recibe un nombre con huella (styles.<hash>.css) que se puede
+    cachear para siempre; el HTML se reescribe para apuntar a esos nombres y
+    se sirve con revalidación. Las versiones gzip y brotli se precalculan.
+    """
+    
+    def __init__(self, root, auto_reload=False):
+        self.root = os.path.abspath(root)
+        self.auto_reload = auto_reload
+        self._lock = threading.Lock()
+        self._signature = None
+        self.build()
+    
+    def _scan(self):
+        """Listar (ruta relativa, mtime) de todos los archivos del frontend"""
+        files = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                full = os.path.join(dirpath, name)
+                rel = os.path.relpath(full, self.root).replace(os.sep, '/')
+                files.append((rel, os.stat(full).st_mtime))
+        return sorted(files)
+    
+    def build(self):
+        """Leer, fingerprintear y comprimir todos los archivos"""
+        files = self._scan()
+        contents = {}
+        for rel, _ in files:
+            with open(os.path.join(self.root, rel), 'rb') as f:
+                contents[rel] = f.read()
+        
+        # 1) Nombres con huella para todo lo que no es HTML
+        fingerprints = {}
+        for rel, body in contents.items():
+            if not rel.endswith('.html'):
+                digest = hashlib.sha256(body).hexdigest()[:12]
+                stem, ext = os.path.splitext(rel)
+                fingerprints[rel] = f"{stem}.{digest}{ext}"
+        
+        # 2) Reescribir el HTML para que use los nombres con huella
+        def rewrite(match):
+            target = fingerprints.get(match.group(2))
+            return f'{match.group(1)}="{target}"' if target else match.group(0)
+        
+        for rel, body in contents.items():
+            if rel.endswith('.html'):
+                contents[rel] = ASSET_REFERENCE.sub(rewrite, body.decode('utf-8')).encode('utf-8')
+        
+        assets = {}
+        by_fingerprint = {}
+        mtimes = dict(files)
+        for rel, body in contents.items():
+            assets[rel] = self._encode(rel, body, mtimes[rel])
+            if rel in fingerprints:
+                by_fingerprint[fingerprints[rel]] = rel
+        
+        with self._lock:
+            self.assets = assets
+            self.fingerprints = fingerprints
+            self.by_fingerprint = by_fingerprint
+            self._signature = files
+    
+    def _encode(self, rel, body, mtime):
+        """Precalcular las codificaciones de un archivo"""
+        mimetype = mimetypes.guess_type(rel)[0] or 'application/octet-stream'
+        encodings = {'identity': body}
+        
+        if mimetype.startswith(COMPRESSIBLE_TYPES):
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                encodings['gzip'] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    encodings['br'] = compressed
+        
+        return {
+            'mimetype': mimetype,
+            'etag': hashlib.sha256(body).hexdigest()[:16],
+            'mtime': mtime,
+            'encodings': encodings
+        }
+    
+    def _reload_if_changed(self):
+        if self._scan() != self._signature:
+            self.build()
+    
+    def url_for(self, rel):
+        """Nombre con huella de un asset (o el original si no tiene)"""
+        return self.fingerprints.get(rel, rel)
+    
+    def serve(self, path):
+        """Responder con la mejor codificación aceptada, o None si no existe"""
+        if self.auto_reload:
+            self._reload_if_changed()
+        
+        immutable = path in self.by_fingerprint
+        rel = self.by_fingerprint.get(path, path)
+        asset = self.assets.get(rel)
+        if asset is None:
+            return None
+        
+        encodings = asset['encodings']
+        encoding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if candidate in encodings and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        
+        response = Response(encodings[encoding], mimetype=asset['mimetype'])
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        if len(encodings) > 1:
+            response.vary.add('Accept-Encoding')
+        
+        response.set_etag(asset['etag'] if encoding == 'identity' else f"{asset['etag']}-{encoding}")
+        response.last_modified = asset['mtime']
+        
+        if immutable:
+            response.cache_control.public = True
+            response.cache_control.max_age = ONE_YEAR
+            response.cache_control.immutable = True
+        else:
+            # HTML y nombres sin huella: siempre revalidar (barato con ETag)
+            response.cache_control.no_cache = True
+        
+        return response.make_conditional(request)
@@ -0,0 +1,49 @@
+import re
+import unicodedata
+
+# Palabras vacías que no aportan al autocompletado
+STOPWORDS = {
+    'a', 'al', 'con', 'de', 'del', 'el', 'en', 'la', 'las', 'lo', 'los',
+    'para', 'por', 'sin', 'un', 'una', 'unos', 'unas', 'y', 'o'
+}
+
+PREFIX_MIN_LENGTH = 2
+PREFIX_MAX_LENGTH = 15
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def fold(text):
+    """Pasar a minúsculas y quitar tildes y diéresis (camión -> camion)"""
+    decomposed = unicodedata.normalize('NFKD', str(text or '').lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """Separar un texto normalizado en palabras"""
+    return TOKEN_PATTERN.findall(fold(text))
+
+
+def search_prefixes(text):
+    """
+    Prefijos (edge n-grams) de cada palabra para el autocompletado.
+    'Campera de cuero' -> ['ca', 'cam', ..., 'campera', 'cu', 'cue', 'cuer', 'cuero']
+    """
+    prefixes = set()
+    for token in tokenize(text):
+        if token in STOPWORDS:
+            continue
+        token = token[:PREFIX_MAX_LENGTH]
+        for size in range(PREFIX_MIN_LENGTH, len(token) + 1):
+            prefixes.add(token[:size])
+    return sorted(prefixes)
+
+
+def query_prefixes(text):
+    """Prefijos a buscar para lo que el usuario lleva escrito"""
+    tokens = [
+        token[:PREFIX_MAX_LENGTH]
+        for token in tokenize(text)
+        if len(token) >= PREFIX_MIN_LENGTH and token not in STOPWORDS
+    ]
+    return list(dict.fromkeys(tokens))
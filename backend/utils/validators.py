@@ -65,7 +65,7 @@ def validate_product_data(data):
     """Validar datos de un producto"""
     errors = []
     
-    if not data.get('nombre') or len(data['nombre'].strip()) == 0:
+    if not data.get('nombre') or len(str(data['nombre']).strip()) == 0:
         errors.append("El nombre del producto es obligatorio")
     
     if not data.get('categoria'):
@@ -7,15 +7,14 @@ db = db.getSiblingDB('tradeco_db');
 db.createCollection('users');
 db.createCollection('products');
 
-// Crear índices para users
-db.users.createIndex({ "email": 1 }, { unique: true });
-db.users.createIndex({ "username": 1 }, { unique: true });
-
-// Crear índices para products
-db.products.createIndex({ "user_id": 1 });
-db.products.createIndex({ "categoria": 1 });
-db.products.createIndex({ "created_at": -1 });
-db.products.createIndex({ "nombre": "text", "descripcion": "text" });
+// Los índices se declaran en un solo lugar, backend/models/indexes.py.
+// La app crea los faltantes al iniciar en desarrollo (CREATE_INDEXES_ON_STARTUP)
+// y en producción se aplican con:
+//   python manage_indexes.py sync
+// Los únicos de usuarios se crean ya acá para que nunca falten (mismas claves
+// que en la especificación, así sync los reconoce como presentes).
+db.users.createIndex({ email: 1 }, { unique: true });
+db.users.createIndex({ username: 1 }, { unique: true });
 
 print('✅ Base de datos tradeco_db inicializada correctamente');
-print('✅ Colecciones e índices creados');
\ No newline at end of file
+print('✅ Colecciones creadas');